@@ -37,11 +37,14 @@
 @version: 1.1.0
 
 result.py: Result of HTTP communication session (status and data)
+           and of a batch of HTTP communication sessions
 
 
 """
 
-from pybvc.common.status import OperStatus
+from collections import OrderedDict
+
+from pybvc.common.status import OperStatus, STATUS
 
 
 class Result(object):
@@ -60,3 +63,98 @@ class Result(object):
 
     def get_data(self):
         return self.data
+
+
+class BatchResult(object):
+    """ Results of a batch of operations performed by a single call
+        (one `Result` per batch item) and the batch execution time.
+    """
+
+    def __init__(self, items=None, results=None, elapsed=0.0,
+                 latencies=None):
+        """ Initializes this object properties. """
+        self.items = items if items is not None else []
+        self.results = results if results is not None else []
+        assert(len(self.items) == len(self.results))
+        self.elapsed = elapsed
+        self.latencies = latencies if latencies is not None else []
+
+    def get_items(self):
+        return self.items
+
+    def get_results(self):
+        """ Returns list of `Result` objects in the order of items """
+        return self.results
+
+    def get_elapsed_time(self):
+        """ Returns batch execution time (in seconds) """
+        return self.elapsed
+
+    def get_rate(self):
+        """ Returns number of processed items per second """
+        if self.elapsed > 0:
+            return len(self.items) / self.elapsed
+        return 0.0
+
+    def get_results_map(self):
+        """ Returns ordered mapping of items to their `Result` objects """
+        return OrderedDict(zip(self.items, self.results))
+
+    def get_latency_stats(self):
+        """ Returns statistics of the per-item execution times (in seconds):
+            'min', 'max', 'avg', 'p50' and 'p95' (empty if not measured)
+        """
+        stats = {}
+        if self.latencies:
+            l = sorted(self.latencies)
+            n = len(l)
+            stats['min'] = l[0]
+            stats['max'] = l[-1]
+            stats['avg'] = sum(l) / n
+            stats['p50'] = l[int(0.50 * (n - 1))]
+            stats['p95'] = l[int(0.95 * (n - 1))]
+        return stats
+
+    def get_succeeded(self):
+        """ Returns list of items whose operation completed successfully """
+        return [item for item, r in zip(self.items, self.results)
+                if r.get_status().eq(STATUS.OK)]
+
+    def get_failed(self):
+        """ Returns list of (item, `Result`) pairs for the items whose
+            operation failed (e.g. to retry them)
+        """
+        return [(item, r) for item, r in zip(self.items, self.results)
+                if not r.get_status().eq(STATUS.OK)]
+
+    def get_status(self):
+        """ Returns aggregate status of the batch: STATUS.OK if all
+            operations succeeded, status of the first failure otherwise
+        """
+        for r in self.results:
+            if not r.get_status().eq(STATUS.OK):
+                return r.get_status()
+        return OperStatus(STATUS.OK)
+
+
+class LayeredBatchResult(BatchResult):
+    """ Results of a batch of operations performed in dependency layers
+        (operations of a layer are performed concurrently, the next layer
+        is started when all of them are completed). In addition to the
+        results of the whole batch provides `BatchResult` of every layer.
+    """
+
+    def __init__(self, items=None, results=None, elapsed=0.0, layers=None):
+        """ Initializes this object properties. """
+        super(LayeredBatchResult, self).__init__(items, results, elapsed)
+        self.layers = layers if layers is not None else []
+
+    def get_layers(self):
+        """ Returns list of `BatchResult` objects of the layers (with the
+            operations actually performed in every layer)
+        """
+        return self.layers
+
+    def get_layers_rates(self):
+        """ Returns number of processed items per second in every layer """
+        return [layer.get_rate() for layer in self.layers]
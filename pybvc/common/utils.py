@@ -42,11 +42,18 @@ utils.py: Helper utilities
 """
 
 import os
+import re
 import sys
+import json
 import time
 import yaml
 import inspect
 
+from multiprocessing.pool import ThreadPool
+from json.encoder import encode_basestring_ascii
+from operator import attrgetter
+from types import FunctionType
+
 
 def remove_empty_from_dict(d):
     if type(d) is dict:
@@ -166,8 +173,9 @@ def dict_keys_underscored_to_dashed(d):
             if isinstance(v, dict):
                 v = dict_keys_underscored_to_dashed(v)
             elif isinstance(v, list):
-                v = [dict_keys_underscored_to_dashed(i) for i in v if i
-                     and dict_keys_underscored_to_dashed(i)]
+                # convert each item once, then drop empty results
+                v = [j for j in (dict_keys_underscored_to_dashed(i)
+                                 for i in v if i) if j]
             new_dict[k.replace('_', '-')] = v
     else:
         return d
@@ -182,8 +190,9 @@ def dict_keys_dashed_to_underscored(d):
             if isinstance(v, dict):
                 v = dict_keys_dashed_to_underscored(v)
             elif isinstance(v, list):
-                v = [dict_keys_dashed_to_underscored(i) for i in v if i
-                     and dict_keys_dashed_to_underscored(i)]
+                # convert each item once, then drop empty results
+                v = [j for j in (dict_keys_dashed_to_underscored(i)
+                                 for i in v if i) if j]
             new_dict[k.replace('-', '_')] = v
     else:
         return d
@@ -191,6 +200,77 @@ def dict_keys_dashed_to_underscored(d):
     return new_dict
 
 
+_yang_names = {}
+
+
+def yang_name(name, keep=()):
+    """
+    Returns YANG model name for the 'underscored' attribute name (all
+    underscores replaced with dashes). Names listed in 'keep' are
+    exceptions from that rule and preserve their underscores wherever
+    they appear in the result (e.g. 'table_id').
+    """
+    names = _yang_names.setdefault(keep, {})
+    try:
+        return names[name]
+    except KeyError:
+        res = name.replace('_', '-')
+        for k in keep:
+            res = res.replace(k.replace('_', '-'), k)
+        names[name] = res
+        return res
+
+
+def obj_to_yang_dict(obj, keep=(), strip=False):
+    """
+    Converts object (with nested objects, dictionaries and lists) into
+    a dictionary with the YANG model names as keys in a single pass.
+    Only the keys are renamed, values are never modified.
+    Attributes having None value are omitted when 'strip' is True.
+    """
+    names = _yang_names.setdefault(keep, {})
+
+    def convert(o):
+        if isinstance(o, dict):
+            items = o.iteritems()
+        elif isinstance(o, (list, tuple)):
+            return [convert(i) for i in o if not (strip and i is None)]
+        elif isinstance(o, CompactObject) or hasattr(o, '__dict__'):
+            items = obj_vars(o).iteritems()
+        else:
+            return o
+        res = {}
+        for k, v in items:
+            if strip and v is None:
+                continue
+            if isinstance(k, basestring):
+                n = names.get(k)
+                k = n if n is not None else yang_name(k, keep)
+            res[k] = convert(v)
+        return res
+
+    return convert(obj)
+
+
+def dict_is_subset(sub, d):
+    """
+    Checks whether every key of the 'sub' dictionary (with nested
+    dictionaries) is present in the 'd' dictionary with the same value.
+    String values are compared case-insensitively.
+    """
+    if isinstance(sub, dict):
+        if not isinstance(d, dict):
+            return False
+        for k, v in sub.iteritems():
+            if k not in d or not dict_is_subset(v, d[k]):
+                return False
+        return True
+    elif isinstance(sub, basestring) and isinstance(d, basestring):
+        return sub.lower() == d.lower()
+    else:
+        return sub == d
+
+
 def dict_unicode_to_string(d):
     if isinstance(d, dict):
         return {dict_unicode_to_string(key): dict_unicode_to_string(value)
@@ -203,6 +283,424 @@ def dict_unicode_to_string(d):
         return d
 
 
+class CompactObject(object):
+    """
+    Base class for objects kept in large numbers (e.g. flow entries).
+    Attributes declared in '__slots__' of the subclasses are stored without
+    a per-instance dictionary. Any other attributes (e.g. unknown keys
+    received from the Controller) are set with '_setattr' and kept in the
+    '_extra' dictionary, which is only allocated when needed.
+    """
+
+    __slots__ = ('_extra',)
+
+    def __getattr__(self, name):
+        # invoked only when the regular attribute lookup has failed
+        extra = _get_extra(self)
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError("'%s' object has no attribute '%s'"
+                             % (type(self).__name__, name))
+
+    def _setattr(self, name, value):
+        try:
+            setattr(self, name, value)
+        except AttributeError:
+            if _get_extra(self) is None:
+                self._extra = {}
+            self._extra[name] = value
+
+    def __getstate__(self):
+        return obj_vars(self)
+
+    def __setstate__(self, state):
+        for k, v in state.iteritems():
+            self._setattr(k, v)
+
+
+def _get_extra(obj):
+    try:
+        return _extra_slot.__get__(obj, CompactObject)
+    except AttributeError:
+        return None
+
+
+_extra_slot = CompactObject.__dict__['_extra']
+_slot_names = {}
+
+
+def obj_vars(obj):
+    """
+    Returns dictionary of the object's attributes, including the ones
+    stored in '__slots__' of CompactObject instances.
+    Intended to be used as 'default' function for JSON encoding.
+    """
+    if not isinstance(obj, CompactObject):
+        return vars(obj)
+    cls = type(obj)
+    slots = _slot_names.get(cls)
+    if slots is None:
+        names = []
+        for c in reversed(cls.__mro__):
+            for n in c.__dict__.get('__slots__', ()):
+                if not n.startswith('_'):
+                    names.append((n, c.__dict__[n]))
+        # names + a single getter for all of them are used for the objects
+        # having all slots assigned (the common case)
+        getter = attrgetter(*[n for n, _ in names] + ['__class__'])
+        slots = _slot_names[cls] = (tuple(n for n, _ in names), getter,
+                                    tuple(names))
+    names, getter, descriptors = slots
+    try:
+        d = dict(zip(names, getter(obj)))
+    except AttributeError:
+        # reading an unassigned slot via its descriptor fails without
+        # falling back to '__getattr__'
+        d = {}
+        for n, slot in descriptors:
+            try:
+                d[n] = slot.__get__(obj, cls)
+            except AttributeError:
+                pass
+    extra = _get_extra(obj)
+    if extra:
+        d.update(extra)
+    return d
+
+
+def public_vars(obj):
+    """
+    Returns dictionary of the object's attributes excluding the private
+    ('_' prefixed) ones, e.g. HTTP sessions and caches of a Controller.
+    Intended to be used as 'default' function for JSON encoding.
+    """
+    return dict((k, v) for k, v in obj_vars(obj).iteritems()
+                if not k.startswith('_'))
+
+
+_canonical_keys = {}
+
+
+def canonical_form(o, skip=()):
+    """
+    Returns canonical string form of the data (dictionaries, lists and
+    objects, with nested ones) or None for the empty data. Dictionary keys
+    and list items are sorted, None values, empty lists and containers
+    having nothing but such values are omitted and numeric strings are
+    treated as numbers, so semantically equal data have equal canonical
+    forms regardless of the items order and encoding. Empty dictionaries
+    are kept ('{}') as they mark data-less YANG containers (e.g.
+    'pop-vlan-action') and nested 'CanonicalObject' forms are prefixed
+    with the class name, so objects of different types never collide.
+    Names listed in 'skip' are omitted from the top level dictionary.
+    """
+    t = type(o)
+    # scalars are checked first as the most frequent ones
+    if t is str or t is unicode:
+        if o.isdigit():
+            return str(int(o))
+        return encode_basestring_ascii(o)
+    elif t is int or t is long:
+        return str(o)
+    elif o is None:
+        return None
+    elif t is bool:
+        return 'true' if o else 'false'
+    elif t is dict:
+        if not o:
+            return '{}'
+        items = o.iteritems()
+    elif t is list or t is tuple:
+        items = [i for i in (canonical_form(v) for v in o) if i is not None]
+        if items:
+            items.sort()
+            return '[' + ','.join(items) + ']'
+        return None
+    elif isinstance(o, CanonicalObject):
+        s = o._get_canonical()
+        return type(o).__name__ + s if s else None
+    elif isinstance(o, CompactObject) or hasattr(o, '__dict__'):
+        items = obj_vars(o).iteritems()
+    elif isinstance(o, dict):
+        if not o:
+            return '{}'
+        items = o.iteritems()
+    elif isinstance(o, (list, tuple)):
+        return canonical_form(list(o))
+    elif isinstance(o, basestring):
+        return canonical_form(unicode(o))
+    else:
+        return json.dumps(o)
+    res = []
+    for k, v in items:
+        if k in skip:
+            continue
+        v = canonical_form(v)
+        if v is not None:
+            ek = _canonical_keys.get(k)
+            if ek is None:
+                ek = _canonical_keys[k] = json.dumps(k) + ':'
+            res.append(ek + v)
+    if res:
+        res.sort()
+        return '{' + ','.join(res) + '}'
+    return None
+
+
+# Incremented by every change made to a 'CanonicalObject' through its
+# mutating methods, cached canonical forms of an older generation are stale
+_canonical_generation = [0]
+
+
+def _mutator(method):
+    """ Wraps mutating method of 'CanonicalObject' class """
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _canonical_generation[0] += 1
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class _CanonicalType(type):
+    """ Metaclass of 'CanonicalObject' classes, their mutating methods
+        ('set_*' and 'add_*') drop the cached canonical forms
+    """
+
+    def __new__(mcs, name, bases, d):
+        for k, v in d.items():
+            if (isinstance(v, FunctionType) and
+               k.startswith(('set_', 'add_'))):
+                d[k] = _mutator(v)
+        return super(_CanonicalType, mcs).__new__(mcs, name, bases, d)
+
+
+class CanonicalObject(CompactObject):
+    """
+    CompactObject compared and hashed by its canonical form (see
+    'canonical_form'), so equal objects are equal regardless of the order
+    of list items (actions, instructions, buckets) and the encoding of
+    numbers. Instances can be used as dictionary keys and set members.
+    The canonical form (and hash) is computed once and cached per object
+    (nested objects included), any change made through the 'set_*' and
+    'add_*' methods of any 'CanonicalObject' drops the cached forms.
+    Attributes assigned directly or containers modified in place require
+    'reset_canonical' to be called. Objects used as dictionary keys or
+    set members must not be modified.
+    Attributes listed in '_canonical_skip' (e.g. statistics) are ignored.
+    """
+
+    __metaclass__ = _CanonicalType
+
+    __slots__ = ('_canonical',)
+
+    _canonical_skip = ()
+
+    def _get_cached(self):
+        """ Returns (generation, canonical form, hash) of the object """
+        generation = _canonical_generation[0]
+        try:
+            cached = _canonical_slot.__get__(self, CanonicalObject)
+            if cached[0] == generation:
+                return cached
+        except AttributeError:
+            pass
+        s = canonical_form(obj_vars(self), self._canonical_skip) or ''
+        cached = self._canonical = (generation, s,
+                                    hash((type(self).__name__, s)))
+        return cached
+
+    def _get_canonical(self):
+        return self._get_cached()[1]
+
+    def reset_canonical(self):
+        """ Drops cached canonical forms (after the object was changed
+            other way than through its 'set_*' and 'add_*' methods)
+        """
+        _canonical_generation[0] += 1
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return NotImplemented
+        a = self._get_cached()
+        b = other._get_cached()
+        return a[2] == b[2] and a[1] == b[1]
+
+    def __ne__(self, other):
+        res = self.__eq__(other)
+        return res if res is NotImplemented else not res
+
+    def __hash__(self):
+        return self._get_cached()[2]
+
+
+_canonical_slot = CanonicalObject.__dict__['_canonical']
+
+
+def concurrent_map(func, items, max_workers=10):
+    """
+    Applies function to every item of the list using a bounded pool of
+    worker threads and returns list of the results in the order of items.
+    Items are processed sequentially if 'max_workers' is not above 1.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    pool = ThreadPool(min(max_workers, len(items)))
+    try:
+        return pool.map(func, items, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def dependency_layers(nodes, dependencies):
+    """
+    Splits nodes into layers so that every node depends only on the nodes
+    of the preceding layers (nodes of a layer are independent of each
+    other). 'dependencies' maps node to the nodes it depends on, the ones
+    that are not in 'nodes' are ignored. Returns list of layers and list
+    of the nodes that can not be ordered due to circular dependencies.
+    """
+    nodes = list(nodes)
+    known = set(nodes)
+    pending = {}
+    users = {}
+    for n in nodes:
+        deps = set(d for d in dependencies.get(n, ()) if d in known)
+        deps.discard(n)
+        pending[n] = len(deps)
+        for d in deps:
+            users.setdefault(d, []).append(n)
+    layers = []
+    layer = [n for n in nodes if pending[n] == 0]
+    while layer:
+        layers.append(layer)
+        following = []
+        for n in layer:
+            for u in users.get(n, ()):
+                pending[u] -= 1
+                if pending[u] == 0:
+                    following.append(u)
+        layer = following
+    cyclic = [n for n in nodes if pending[n] > 0]
+    return layers, cyclic
+
+
+_json_token_re = re.compile(r'\s*(?:("(?:[^"\\]|\\.)*")|([{}\[\]:,])|'
+                            r'([^\s{}\[\]:,"]+))')
+_json_struct_re = re.compile(r'[{}\[\]"]')
+_json_string_re = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+def iter_json_array(chunks, path):
+    """
+    Incrementally decodes JSON document supplied as a sequence of text
+    chunks (e.g. HTTP response body read off the socket) and yields
+    decoded elements of the array located at the given path of object
+    keys, one by one as soon as they are complete. Keys of enclosing
+    arrays' elements are not part of the path, e.g. ('nodes', 'node')
+    for '{"nodes": {"node": [...]}}' or ('table', 'flow') for
+    '{"table": [{"id": 0, "flow": [...]}]}'.
+    Only the array element being decoded is kept in memory.
+    ValueError is raised if the document is malformed or truncated.
+    """
+    path = list(path)
+    chunks = iter(chunks)
+    eof = False
+    # the top level value has been decoded
+    done = False
+    buf = ''
+    pos = 0
+    # stack of containers: [is_object, name, current_key, expect_key]
+    stack = []
+    # stack depth of the matching array, start and nesting level of
+    # its element being decoded
+    target = None
+    start = None
+    depth = 0
+    while True:
+        more = False
+        if depth > 0:
+            # inside an element of the matching array, only its nesting
+            # level is tracked until the element ends
+            m = _json_struct_re.search(buf, pos)
+            if m is None:
+                more = True
+            elif m.group() == '"':
+                m = _json_string_re.match(buf, m.start())
+                if m is None:
+                    more = True
+                else:
+                    pos = m.end()
+            else:
+                pos = m.end()
+                depth += 1 if m.group() in '{[' else -1
+                if depth == 0:
+                    yield json.loads(buf[start:pos])
+                    start = None
+        else:
+            m = _json_token_re.match(buf, pos)
+            if m is None or (m.end() == len(buf) and not eof):
+                # token may be incomplete
+                more = True
+            else:
+                string, punct, literal = m.groups()
+                pos = m.end()
+                if (target is not None and len(stack) == target and
+                   punct not in (',', ']')):
+                    # element of the matching array
+                    start = m.start(m.lastindex)
+                    if punct is None:
+                        yield json.loads(buf[start:pos])
+                        start = None
+                    else:
+                        depth = 1
+                elif punct is None:
+                    if string is not None and stack and stack[-1][3]:
+                        stack[-1][2] = json.loads(string)
+                        stack[-1][3] = False
+                    elif not stack:
+                        done = True
+                elif punct == '{' or punct == '[':
+                    name = stack[-1][2] if stack and stack[-1][0] else None
+                    stack.append([punct == '{', name, None, punct == '{'])
+                    if (target is None and punct == '[' and
+                       [f[1] for f in stack if f[1] is not None] == path):
+                        target = len(stack)
+                elif punct == '}' or punct == ']':
+                    if not stack:
+                        raise ValueError("unexpected '%s' in JSON document"
+                                         % punct)
+                    stack.pop()
+                    done = not stack
+                    if target is not None and len(stack) < target:
+                        target = None
+                elif punct == ',':
+                    if stack and stack[-1][0]:
+                        stack[-1][3] = True
+
+        if more:
+            if eof:
+                if not done or buf[pos:].strip():
+                    raise ValueError("truncated or malformed JSON document")
+                break
+            keep = start if start is not None else pos
+            buf = buf[keep:]
+            pos -= keep
+            if start is not None:
+                start = 0
+            try:
+                buf += next(chunks)
+            except StopIteration:
+                eof = True
+
+
 def progress_wait_secs(msg=None, waitTime=None, sym="."):
     if (waitTime is not None):
         # sys.stdout.write ("(waiting for %s seconds) " % waitTime)
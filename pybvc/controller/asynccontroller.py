@@ -0,0 +1,172 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+asynccontroller.py: Controller with concurrent (non-blocking) operations
+
+
+"""
+
+from multiprocessing import TimeoutError
+from multiprocessing.pool import ThreadPool
+
+from pybvc.controller.controller import Controller
+from pybvc.common.result import Result
+from pybvc.common.status import OperStatus, STATUS
+
+
+class AsyncController(Controller):
+    """ Class that represents a Controller device whose RESTCONF operations
+        can be run without blocking the caller.
+
+        Every operation of the Controller itself or of a device object
+        attached to it (:class:`pybvc.openflowdev.ofswitch.OFSwitch`,
+        :class:`pybvc.netconfdev.vrouter.vrouter5600.VRouter5600`, etc.)
+        can be started in the background via an :class:`AsyncProxy`
+        returned by the 'async_ops' method. Started operation returns
+        a pending handle whose 'get' method yields the same
+        :class:`pybvc.common.result.Result` object as the blocking call.
+
+        Python 2 has no 'asyncio', so operations are executed on a bounded
+        pool of worker threads sharing the Controller's HTTP connection
+        pool (one keep-alive connection per worker).
+
+        Example::
+
+            actrl = AsyncController(ip, port, user, password, max_workers=50)
+            pending = [actrl.async_ops(OFSwitch(actrl, n)).get_switch_info()
+                       for n in node_ids]
+            results = actrl.wait_all(pending)
+    """
+
+    def __init__(self, ipAddr, portNum, adminName, adminPassword, timeout=5,
+                 max_workers=10, pool_connections=10, pool_block=False,
+                 validators_max_entries=None):
+        """Initializes this object properties.
+
+        :param int max_workers: Maximum number of operations that are
+                                executed simultaneously (also used as
+                                the Controller's 'pool_maxsize').
+        :param int pool_connections: See :class:`pybvc.controller.
+                                     controller.Controller`.
+        :param bool pool_block: See :class:`pybvc.controller.controller.
+                                Controller`.
+        :param int validators_max_entries: See :class:`pybvc.controller.
+                                           controller.Controller`.
+        """
+        Controller.__init__(self, ipAddr, portNum, adminName, adminPassword,
+                            timeout, pool_connections=pool_connections,
+                            pool_maxsize=max_workers, pool_block=pool_block,
+                            validators_max_entries=validators_max_entries)
+        self.max_workers = max_workers
+        self._workers = None
+
+    def _get_workers(self):
+        """ Returns pool of worker threads (created on first use). """
+        if self._workers is None:
+            self._workers = ThreadPool(self.max_workers)
+        return self._workers
+
+    def submit(self, func, *args, **kwargs):
+        """ Starts execution of the given function in the background.
+
+        :param func: Callable to be executed (typically a bound method of
+                     this Controller or of a device object attached to it).
+        :return: Pending operation handle, call its 'get([timeout])' method
+                 to wait for and obtain the value returned by 'func'.
+        :rtype: `multiprocessing.pool.AsyncResult`
+        """
+        return self._get_workers().apply_async(func, args, kwargs)
+
+    def async_ops(self, obj=None):
+        """ Returns proxy object that starts methods of 'obj' in the
+            background (proxy for this Controller if 'obj' is None).
+
+        :rtype: :class:`pybvc.controller.asynccontroller.AsyncProxy`
+        """
+        return AsyncProxy(self if obj is None else obj, self)
+
+    def wait_all(self, pending, timeout=None):
+        """ Waits for completion of the given pending operations.
+
+        :param list pending: Handles returned by 'submit' or by methods
+                             of an :class:`AsyncProxy`.
+        :param float timeout: Maximum time (in seconds) to wait for each
+                              operation, no limit if None.
+        :return: List of operation results in the order of 'pending'.
+                 Operation that did not complete in time is reported as
+                 `Result` with STATUS.CONN_ERROR.
+        :rtype: list
+        """
+        results = []
+        for p in pending:
+            try:
+                results.append(p.get(timeout))
+            except TimeoutError:
+                results.append(Result(OperStatus(STATUS.CONN_ERROR), None))
+        return results
+
+    def close(self):
+        """ Stops worker threads and closes all pooled connections to
+            the Controller.
+        """
+        if self._workers is not None:
+            self._workers.close()
+            self._workers.join()
+            self._workers = None
+        Controller.close(self)
+
+
+class AsyncProxy(object):
+    """ Helper class of the 'AsyncController' class.
+        Wraps an object so that invocation of any of its methods is
+        started in the background and returns a pending operation handle
+        instead of the method's return value.
+    """
+
+    def __init__(self, obj, actrl):
+        self._obj = obj
+        self._actrl = actrl
+
+    def __getattr__(self, name):
+        attr = getattr(self._obj, name)
+        if not callable(attr):
+            return attr
+
+        def start(*args, **kwargs):
+            return self._actrl.submit(attr, *args, **kwargs)
+
+        return start
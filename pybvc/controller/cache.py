@@ -0,0 +1,236 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+cache.py: Caches of HTTP responses received from Controller
+
+
+"""
+
+import re
+import json
+import time
+import threading
+
+from collections import OrderedDict
+
+_datastore_re = re.compile(r'/restconf/(config|operational)/')
+
+
+def _split_url(url):
+    """ Splits URL into (datastore, path) parts, datastore is None for
+        URLs that do not refer to a RESTCONF data store.
+    """
+    m = _datastore_re.search(url)
+    if m is None:
+        return None, url
+    return m.group(1), url[m.end():]
+
+
+class ResponseCache(object):
+    """ Read-through cache of the Controller's responses to HTTP GET
+        requests with per-path time-to-live and LRU size bound.
+        Entries are keyed by the request URL (the URL includes the data
+        store name) and request headers.
+    """
+
+    def __init__(self, ttl=1.0, path_ttls=None, max_entries=1024):
+        """Initializes this object properties.
+
+        :param float ttl: Default time (in seconds) cached response stays
+                          valid.
+        :param dict path_ttls: Time-to-live values for specific data tree
+                               paths, the longest path that is a prefix of
+                               a request path wins (e.g. {'network-topology:
+                               network-topology': 10}).
+        :param int max_entries: Maximum number of cached responses, least
+                                recently used entries are evicted first.
+        """
+        self.ttl = ttl
+        self.path_ttls = path_ttls if path_ttls is not None else {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_ttl(self, url):
+        path = _split_url(url)[1]
+        ttl = self.ttl
+        best = -1
+        for p, v in self.path_ttls.iteritems():
+            if path.startswith(p) and len(p) > best:
+                ttl = v
+                best = len(p)
+        return ttl
+
+    def get(self, key):
+        """ Returns cached response or None if there is no valid entry """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[0] > time.time():
+                self._entries[key] = entry
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, url, resp):
+        """ Stores response received for the given URL """
+        ttl = self._get_ttl(url)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl, resp, url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, url=None):
+        """ Removes cached responses for the data tree path referred by the
+            URL, i.e. for the path itself, its ancestors and descendants in
+            both data stores (everything if URL is None).
+        """
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                return
+            path = _split_url(url)[1].rstrip('/')
+            for key, entry in self._entries.items():
+                p = _split_url(entry[2])[1].rstrip('/')
+                if (p == path or
+                   path.startswith(p + '/') or
+                   p.startswith(path + '/')):
+                    del self._entries[key]
+
+    def get_stats(self):
+        """ Returns dictionary with cache hit/miss counters """
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'entries': len(self._entries)}
+
+
+class ValidatorStore(object):
+    """ Store of HTTP cache validators ('ETag', 'Last-Modified') of the
+        Controller's responses along with the responses themselves,
+        used to send conditional HTTP GET requests and to serve the
+        stored response when the Controller replies '304 Not Modified'.
+        Decoded JSON body of a stored response is kept with it, so the
+        body is not decoded again while the data is not modified.
+        Responses without validators are not stored.
+    """
+
+    def __init__(self, max_entries=128):
+        """Initializes this object properties.
+
+        :param int max_entries: Maximum number of stored responses, least
+                                recently used entries are evicted first.
+        """
+        self.max_entries = max_entries
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    def get_conditional_headers(self, key, headers):
+        """ Returns request headers extended with the validators stored
+            for the given key (original headers if there are none).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return headers
+        h = dict(headers) if headers else {}
+        etag, last_modified = entry[0], entry[1]
+        if etag is not None:
+            h['If-None-Match'] = etag
+        if last_modified is not None:
+            h['If-Modified-Since'] = last_modified
+        return h
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._decoded.pop(id(entry[2]), None)
+
+    def update(self, key, resp):
+        """ Processes response to a (conditional) HTTP GET request and
+            returns the response to be handed to the caller (the stored
+            one if the Controller replied '304 Not Modified').
+        """
+        if resp.status_code == 304:
+            with self._lock:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._entries[key] = entry
+                    self.not_modified += 1
+                    return entry[2]
+            return resp
+
+        with self._lock:
+            self._remove(key)
+            if resp.status_code != 200:
+                return resp
+            rh = getattr(resp, 'headers', None) or {}
+            etag = rh.get('ETag')
+            last_modified = rh.get('Last-Modified')
+            if etag is None and last_modified is None:
+                return resp
+            self._entries[key] = (etag, last_modified, resp)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return resp
+
+    def decode_json(self, resp):
+        """ Returns decoded JSON body of the response, body of a stored
+            response is decoded once and the same object is returned for
+            the following calls (it must not be modified by the caller).
+        """
+        with self._lock:
+            item = self._decoded.get(id(resp))
+        if item is not None and item[0] is resp:
+            return item[1]
+        d = json.loads(resp.content)
+        with self._lock:
+            for entry in self._entries.itervalues():
+                if entry[2] is resp:
+                    self._decoded[id(resp)] = (resp, d)
+                    break
+        return d
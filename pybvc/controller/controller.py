@@ -41,32 +41,139 @@ controller.py: Controller's properties and communication methods
 """
 
 import json
+import time
+import urllib
 import xmltodict
 import requests
 
+from multiprocessing.pool import ThreadPool
+
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import ConnectionError, Timeout
-from pybvc.common.result import Result
+from pybvc.common.result import Result, BatchResult
 from pybvc.common.status import OperStatus, STATUS
 from pybvc.common.utils import (find_key_values_in_dict,
                                 dbg_print,
-                                find_key_value_in_dict)
-from pybvc.controller.topology import Topology
+                                public_vars,
+                                iter_json_array,
+                                find_key_value_in_dict,
+                                dict_keys_dashed_to_underscored)
+from pybvc.controller.cache import ResponseCache, ValidatorStore
+from pybvc.controller.topology import Topology, Node, Link
 from pybvc.controller.inventory import (Inventory,
                                         OpenFlowCapableNode,
                                         NetconfCapableNode,
                                         NetconfConfigModule)
+from pybvc.openflowdev.ofswitch import OFSwitch
 
 
 class Controller():
     """ Class that represents a Controller device. """
-    def __init__(self, ipAddr, portNum, adminName, adminPassword, timeout=5):
-        """Initializes this object properties."""
+
+    ''' Size of the chunks streamed responses are read in (bytes) '''
+    stream_chunk_size = 65536
+
+    def __init__(self, ipAddr, portNum, adminName, adminPassword, timeout=5,
+                 pool_connections=10, pool_maxsize=10, pool_block=False,
+                 validators_max_entries=None):
+        """Initializes this object properties.
+
+        :param int pool_connections: Number of per-host connection pools
+                                     to keep cached.
+        :param int pool_maxsize: Maximum number of keep-alive connections
+                                 to save in each per-host pool.
+        :param bool pool_block: If True then 'pool_maxsize' is a hard limit
+                                on the number of simultaneous connections
+                                to a host (callers wait for a free one).
+        :param int validators_max_entries: Maximum number of responses kept
+                                           for conditional HTTP GET requests
+                                           (see 'enable_conditional_get'),
+                                           conditional requests are
+                                           disabled if 0 or None.
+        """
         self.ipAddr = ipAddr
         self.portNum = portNum
         self.adminName = adminName
         self.adminPassword = adminPassword
         self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._session = self._create_session()
+        self._cache = None
+        self._validators = None
+        if validators_max_entries:
+            self.enable_conditional_get(validators_max_entries)
+
+    def _create_session(self):
+        """ Returns HTTP session object that keeps connections to the
+            Controller alive and reuses them across requests.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """ Closes all pooled connections to the Controller. """
+        self._session.close()
+        self._session = self._create_session()
+
+    def enable_cache(self, ttl=1.0, path_ttls=None, max_entries=1024):
+        """ Enables caching of the Controller's responses to HTTP GET
+            requests. Cached responses are served until they expire or
+            are invalidated by a HTTP PUT/POST/DELETE request to the
+            same data tree path (see
+            :class:`pybvc.controller.cache.ResponseCache`).
+
+        :param float ttl: Default time (in seconds) cached response stays
+                          valid.
+        :param dict path_ttls: Time-to-live values for specific data tree
+                               paths (e.g. {'opendaylight-inventory:nodes':
+                               0.5}).
+        :param int max_entries: Maximum number of cached responses.
+        """
+        self._cache = ResponseCache(ttl, path_ttls, max_entries)
+
+    def disable_cache(self):
+        """ Disables caching of the Controller's responses. """
+        self._cache = None
+
+    def invalidate_cache(self, url=None):
+        """ Removes cached responses for the data tree path referred by
+            the URL (all cached responses if URL is None).
+        """
+        if self._cache is not None:
+            self._cache.invalidate(url)
+
+    def get_cache_stats(self):
+        """ Returns dictionary with cache hit/miss counters
+            (None if caching is disabled).
+        """
+        if self._cache is not None:
+            return self._cache.get_stats()
+        return None
+
+    def enable_conditional_get(self, max_entries=128):
+        """ Enables conditional HTTP GET requests: validators (ETag/
+            Last-Modified) of the Controller's responses are kept and sent
+            with the next request to the same URL, the stored response is
+            returned when the Controller replies 'Not Modified' (see
+            :class:`pybvc.controller.cache.ValidatorStore`).
+            NOTE: while enabled, 'decode_json' returns data shared between
+                  the callers, it must not be modified.
+
+        :param int max_entries: Maximum number of stored responses.
+        """
+        self._validators = ValidatorStore(max_entries)
+
+    def disable_conditional_get(self):
+        """ Disables conditional HTTP GET requests. """
+        self._validators = None
 
     def to_string(self):
         """ Returns string representation of this object. """
@@ -74,7 +181,7 @@ class Controller():
 
     def to_json(self):
         """ Returns JSON representation of this object. """
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True,
+        return json.dumps(self, default=public_vars, sort_keys=True,
                           indent=4)
 
     def brief_json(self):
@@ -86,7 +193,8 @@ class Controller():
         return json.dumps(d, default=lambda o: o.__dict__, sort_keys=True,
                           indent=4)
 
-    def http_get_request(self, url, data, headers, timeout=None):
+    def http_get_request(self, url, data, headers, timeout=None,
+                         stream=False):
         """ Sends HTTP GET request to a remote server
             and returns the response.
 
@@ -96,7 +204,13 @@ class Controller():
                             Typically set to None.
         :param dict headers: The headers to include in the request.
         :param string timeout: Pass a timeout for longlived queries
-        :return: The response from the http request.
+        :param bool stream: If True then the response body is not read
+                            in advance (see 'iter_json_items'), such
+                            requests bypass response caching.
+        :return: The response from the http request. If the Controller
+                 provided 'ETag'/'Last-Modified' validators for the URL the
+                 request is conditional, and previously received response
+                 is returned when the Controller replies 'Not Modified'.
         :rtype: None or `requests.response`
             <http://docs.python-requests.org/en/latest/api/#requests.Response>
 
@@ -106,16 +220,70 @@ class Controller():
         if timeout is None:
             timeout = self.timeout
 
+        cache = self._cache
+        validators = self._validators
+        key = None
+        if data is None and not stream:
+            key = (url, repr(sorted(headers.items())) if headers else None)
+            if cache is not None:
+                resp = cache.get(key)
+                if resp is not None:
+                    return resp
+            # Conditional request if the Controller provided validators
+            # (ETag/Last-Modified) for the previous response
+            if validators is not None:
+                headers = validators.get_conditional_headers(key, headers)
+
         try:
-            resp = requests.get(url,
-                                auth=HTTPBasicAuth(self.adminName,
-                                                   self.adminPassword),
-                                data=data, headers=headers, timeout=timeout)
+            resp = self._session.get(url,
+                                     auth=HTTPBasicAuth(self.adminName,
+                                                        self.adminPassword),
+                                     data=data, headers=headers,
+                                     timeout=timeout, stream=stream)
         except (ConnectionError, Timeout) as e:
             print "Error: " + repr(e)
 
+        if key is not None and resp is not None:
+            # '304 Not Modified' is replaced with the stored response
+            if validators is not None:
+                resp = validators.update(key, resp)
+            if cache is not None and resp.status_code == 200:
+                cache.put(key, url, resp)
+
         return (resp)
 
+    def decode_json(self, resp):
+        """ Returns decoded JSON body of a response to HTTP GET request.
+            If conditional requests are enabled (see
+            'enable_conditional_get'), body of the stored response is
+            decoded once and the decoded data is reused while the
+            Controller replies 'Not Modified', so the returned data must
+            not be modified.
+        """
+        validators = self._validators
+        if validators is not None:
+            return validators.decode_json(resp)
+        return json.loads(resp.content)
+
+    def iter_json_items(self, resp, path):
+        """ Returns iterator over elements of the JSON array located at the
+            given path of object keys in the body of a streamed response
+            (see 'http_get_request'). The body is read off the socket and
+            decoded incrementally, so memory usage does not depend on
+            the number of the array elements.
+
+        :param resp: `requests.response` of a streamed request.
+        :param tuple path: Object keys leading to the array, e.g.
+                           ('nodes', 'node'), see
+                           :func:`pybvc.common.utils.iter_json_array`.
+        """
+        try:
+            chunks = resp.iter_content(chunk_size=self.stream_chunk_size)
+            for item in iter_json_array(chunks, path):
+                yield item
+        finally:
+            resp.close()
+
     def http_post_request(self, url, data, headers):
         """ Sends HTTP POST request to a remote server
             and returns the response.
@@ -134,14 +302,16 @@ class Controller():
         resp = None
 
         try:
-            resp = requests.post(url,
-                                 auth=HTTPBasicAuth(self.adminName,
-                                                    self.adminPassword),
-                                 data=data, headers=headers,
-                                 timeout=self.timeout)
+            resp = self._session.post(url,
+                                      auth=HTTPBasicAuth(self.adminName,
+                                                         self.adminPassword),
+                                      data=data, headers=headers,
+                                      timeout=self.timeout)
         except (ConnectionError, Timeout) as e:
             print "Error: " + repr(e)
 
+        self.invalidate_cache(url)
+
         return (resp)
 
     def http_put_request(self, url, data, headers):
@@ -162,14 +332,16 @@ class Controller():
         resp = None
 
         try:
-            resp = requests.put(url,
-                                auth=HTTPBasicAuth(self.adminName,
-                                                   self.adminPassword),
-                                data=data, headers=headers,
-                                timeout=self.timeout)
+            resp = self._session.put(url,
+                                     auth=HTTPBasicAuth(self.adminName,
+                                                        self.adminPassword),
+                                     data=data, headers=headers,
+                                     timeout=self.timeout)
         except (ConnectionError, Timeout) as e:
             print "Error: " + repr(e)
 
+        self.invalidate_cache(url)
+
         return (resp)
 
     def http_delete_request(self, url, data, headers):
@@ -189,14 +361,16 @@ class Controller():
         resp = None
 
         try:
-            resp = requests.delete(url,
-                                   auth=HTTPBasicAuth(self.adminName,
-                                                      self.adminPassword),
-                                   data=data, headers=headers,
-                                   timeout=self.timeout)
+            resp = self._session.delete(url,
+                                        auth=HTTPBasicAuth(self.adminName,
+                                                           self.adminPassword),
+                                        data=data, headers=headers,
+                                        timeout=self.timeout)
         except (ConnectionError, Timeout) as e:
             print "Error: " + repr(e)
 
+        self.invalidate_cache(url)
+
         return (resp)
 
     def get_nodes_operational_list(self):
@@ -1287,6 +1461,81 @@ class Controller():
 
         return Result(status, sorted(nlist))
 
+    def fan_out(self, nodes, operation, args=(), kwargs=None,
+                max_workers=10, timeout=None):
+        """ Runs the same operation on a set of nodes concurrently.
+
+        :param list nodes: Node identifiers (OpenFlow switches) or device
+                           objects attached to this Controller
+                           (:class:`pybvc.openflowdev.ofswitch.OFSwitch`,
+                           :class:`pybvc.netconfdev.vrouter.vrouter5600.VRouter5600`,
+                           etc.)
+        :param operation: Name of the device object method or callable
+                          taking the device object as first argument
+                          (e.g. 'get_flows' or OFSwitch.get_flows).
+        :param tuple args: Positional arguments for the operation.
+        :param dict kwargs: Keyword arguments for the operation.
+        :param int max_workers: Maximum number of nodes processed
+                                simultaneously.
+        :param float timeout: Maximum execution time (in seconds) of the
+                              operation on a single node, no limit if None.
+                              Node that did not complete in time is
+                              reported with STATUS.CONN_ERROR.
+        :return: Aggregate status, ordered mapping of node identifiers to
+                 their `Result` objects (see 'get_results_map') and
+                 per-node latency statistics (see 'get_latency_stats').
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.common.result.BatchResult` data
+        """
+        kwargs = kwargs if kwargs is not None else {}
+        devices = [OFSwitch(self, n) if isinstance(n, basestring) else n
+                   for n in nodes]
+        started = {}
+
+        def run(idx):
+            device = devices[idx]
+            started[idx] = time.time()
+            try:
+                if isinstance(operation, basestring):
+                    res = getattr(device, operation)(*args, **kwargs)
+                else:
+                    res = operation(device, *args, **kwargs)
+                if not isinstance(res, Result):
+                    res = Result(OperStatus(STATUS.OK), res)
+            except(Exception) as e:
+                dbg_print("Error: " + repr(e))
+                res = Result(OperStatus(STATUS.UNKNOWN), e)
+            return res, time.time() - started[idx]
+
+        t0 = time.time()
+        results = []
+        latencies = []
+        workers = ThreadPool(max(1, min(max_workers, len(devices))))
+        try:
+            pending = [workers.apply_async(run, (i,))
+                       for i in range(len(devices))]
+            for i, p in enumerate(pending):
+                while not p.ready():
+                    p.wait(0.01)
+                    if (timeout is not None and i in started and
+                       not p.ready() and
+                       time.time() - started[i] > timeout):
+                        break
+                if p.ready():
+                    res, latency = p.get()
+                else:
+                    res = Result(OperStatus(STATUS.CONN_ERROR), None)
+                    latency = time.time() - started[i]
+                results.append(res)
+                latencies.append(latency)
+        finally:
+            # worker threads stuck on timed out nodes are not waited for
+            workers.close()
+
+        batch = BatchResult([d.name for d in devices], results,
+                            time.time() - t0, latencies)
+        return Result(batch.get_status(), batch)
+
     def get_openflow_operational_flows_total_cnt(self):
         status = OperStatus()
         templateUrl = ("http://{}:{}/restconf/operational/"
@@ -1386,7 +1635,80 @@ class Controller():
 
         return Result(status, topo_obj)
 
-    def build_inventory_object(self, operational=True):
+    def get_inventory_operational_url(self):
+        templateUrl = ("http://{}:{}/restconf/operational/"
+                       "opendaylight-inventory:nodes")
+        url = templateUrl.format(self.ipAddr, self.portNum)
+        return url
+
+    def get_topology_operational_url(self, topo_name):
+        templateUrl = ("http://{}:{}/restconf/operational/"
+                       "network-topology:network-topology/topology/{}")
+        url = templateUrl.format(self.ipAddr, self.portNum, topo_name)
+        return url
+
+    def get_topology_node(self, topo_name, node_id):
+        """ Returns node of the network topology as
+            :class:`pybvc.controller.topology.Node` object.
+        """
+        result = self._get_topology_element(topo_name, 'node', node_id)
+        obj = result.get_data()
+        return Result(result.get_status(),
+                      Node(obj) if obj is not None else None)
+
+    def get_topology_link(self, topo_name, link_id):
+        """ Returns link of the network topology as
+            :class:`pybvc.controller.topology.Link` object.
+        """
+        result = self._get_topology_element(topo_name, 'link', link_id)
+        obj = result.get_data()
+        return Result(result.get_status(),
+                      Link(obj) if obj is not None else None)
+
+    def _get_topology_element(self, topo_name, kind, element_id):
+        status = OperStatus()
+        obj = None
+        url = "{}/{}/{}".format(self.get_topology_operational_url(topo_name),
+                                kind, urllib.quote(element_id, safe=':'))
+        resp = self.http_get_request(url, data=None, headers=None)
+        if(resp is None):
+            status.set_status(STATUS.CONN_ERROR)
+        elif(resp.content is None):
+            status.set_status(STATUS.CTRL_INTERNAL_ERROR)
+        elif(resp.status_code == 200):
+            l = json.loads(resp.content).get(kind)
+            if isinstance(l, list) and l and isinstance(l[0], dict):
+                obj = dict_keys_dashed_to_underscored(l[0])
+            status.set_status(STATUS.OK if obj is not None
+                              else STATUS.DATA_NOT_FOUND)
+        elif(resp.status_code == 404):
+            status.set_status(STATUS.DATA_NOT_FOUND)
+        else:
+            status.set_status(STATUS.HTTP_ERROR, resp)
+        return Result(status, obj)
+
+    def build_inventory_object(self, operational=True, stream=False):
+        """ Returns object representing the Controller's inventory.
+
+        :param bool operational: Refer to operational (True) or
+                                 configuration (False) data store.
+        :param bool stream: If True then the inventory data is decoded
+                            incrementally as it arrives off the socket
+                            (see 'iter_inventory_nodes'), which keeps
+                            memory usage flat for huge inventories.
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.controller.inventory.Inventory` data
+        """
+        if stream:
+            result = self.iter_inventory_nodes(operational)
+            status = result.get_status()
+            inv_obj = None
+            if(status.eq(STATUS.OK)):
+                inv_obj = Inventory()
+                for item in result.get_data():
+                    inv_obj.add_node_dict(item)
+            return Result(status, inv_obj)
+
         status = OperStatus()
         templateUrl = "http://{}:{}/restconf/{}/opendaylight-inventory:nodes"
         inv_obj = None
@@ -1404,9 +1726,9 @@ class Controller():
             p1 = 'nodes'
             p2 = 'node'
             try:
-                d = json.loads(resp.content)
+                d = self.decode_json(resp)
                 v = d[p1][p2]
-                inv_obj = Inventory(inv_json=json.dumps(v))
+                inv_obj = Inventory(inv_list=v)
                 status.set_status(STATUS.OK)
             except(Exception):
                 msg = "TODO (unexpected data format in response)"
@@ -1417,6 +1739,33 @@ class Controller():
 
         return Result(status, inv_obj)
 
+    def iter_inventory_nodes(self, operational=True):
+        """ Returns iterator over the nodes (dictionaries) of the
+            Controller's inventory, nodes are decoded one by one as they
+            arrive off the socket.
+
+        :param bool operational: Refer to operational (True) or
+                                 configuration (False) data store.
+        :rtype: :class:`pybvc.common.result.Result` with iterator data
+        """
+        status = OperStatus()
+        templateUrl = "http://{}:{}/restconf/{}/opendaylight-inventory:nodes"
+        nodes = None
+
+        inv_type = "operational" if operational else "config"
+        url = templateUrl.format(self.ipAddr, self.portNum, inv_type)
+        resp = self.http_get_request(url, data=None, headers=None,
+                                     stream=True)
+        if(resp is None):
+            status.set_status(STATUS.CONN_ERROR)
+        elif(resp.status_code == 200):
+            nodes = self.iter_json_items(resp, ('nodes', 'node'))
+            status.set_status(STATUS.OK)
+        else:
+            status.set_status(STATUS.HTTP_ERROR, resp)
+
+        return Result(status, nodes)
+
     def build_openflow_node_inventory_object(self, node_id, operational=True):
         status = OperStatus()
         templateUrl = ("http://{}:{}/restconf/{}/"
@@ -1438,7 +1787,7 @@ class Controller():
                 p1 = 'node'
                 d = json.loads(resp.content)
                 v = d[p1][0]
-                inv_obj = OpenFlowCapableNode(inv_json=json.dumps(v))
+                inv_obj = OpenFlowCapableNode(inv_dict=v)
                 status.set_status(STATUS.OK)
             except(Exception):
                 msg = "TODO (unexpected data format in response)"
@@ -42,8 +42,14 @@ inventory.py: Controller's inventory parser
 
 import re
 import json
-
-from pybvc.common.utils import dict_keys_dashed_to_underscored
+import time
+import random
+import threading
+
+from pybvc.common.result import Result
+from pybvc.common.status import OperStatus, STATUS
+from pybvc.common.utils import dict_keys_dashed_to_underscored, dbg_print
+from pybvc.controller.notification import InventoryChangeNotification
 from pybvc.openflowdev.ofswitch import (GroupFeatures,
                                         GroupInfo,
                                         MeterFeatures)
@@ -54,12 +60,15 @@ class Inventory():
         the Controller's inventory store.
     """
 
-    def __init__(self, inv_json=None):
+    def __init__(self, inv_json=None, inv_list=None):
         self.openflow_nodes = []
         self.netconf_nodes = []
         if (inv_json is not None):
             self.__init_from_json__(inv_json)
             return
+        if (inv_list is not None):
+            self.__init_from_list__(inv_list)
+            return
 
     def add_openflow_node(self, node):
         assert(isinstance(node, OpenFlowCapableNode))
@@ -71,43 +80,51 @@ class Inventory():
 
     def __init_from_json__(self, s):
         if (isinstance(s, basestring)):
-            l = json.loads(s)
-            assert(isinstance(l, list))
-            p1 = 'id'
-            p2 = 'openflow'
-            p3 = 'netconf_node_inventory:initial_capability'
-            filter1 = 'brocade-interface-ext?revision=2014-04-01'
-            filter2 = 'vyatta-interfaces?revision=2014-12-02'
-            filter3 = 'controller:netty:eventexecutor?revision=2013-11-12'
-            devices = [{'clazz': 'NOS', 'filter': filter1},
-                       {'clazz': 'VRouter5600', 'filter': filter2},
-                       {'clazz': 'controller', 'filter': filter3}]
-            for item in l:
-                if isinstance(item, dict):
-                    d = dict_keys_dashed_to_underscored(item)
-                    if p1 in d and isinstance(d[p1], basestring):
-                        if (d[p1].startswith(p2)):
-                            node = OpenFlowCapableNode(inv_dict=d)
-                            self.add_openflow_node(node)
-                    if p3 in d:
-                        # Netconf
-                        capabilities = d.get(p3)
-                        nodes = [[d, dev['clazz']] for c in capabilities for
-                                 dev in devices if dev['filter'] in c]
-                        for node in nodes:
-                            if node is not None:
-                                node = NetconfCapableNode(clazz=node[1],
-                                                          inv_dict=node[0])
-                                self.add_netconf_node(node)
-                                break
-                            else:
-                                node = NetconfCapableNode(clazz='unknown',
-                                                          inv_dict=d)
-                                self.add_netconf_node(node)
+            self.__init_from_list__(json.loads(s))
         else:
             raise TypeError("[Inventory] wrong argument type '%s'"
                             " (JSON 'string' is expected)" % type(s))
 
+    def __init_from_list__(self, l):
+        assert(isinstance(l, list))
+        for item in l:
+            self.add_node_dict(item)
+
+    def add_node_dict(self, item):
+        """ Adds inventory node given as a dictionary (one element of the
+            'node' list of the Controller's inventory data tree).
+        """
+        p1 = 'id'
+        p2 = 'openflow'
+        p3 = 'netconf_node_inventory:initial_capability'
+        filter1 = 'brocade-interface-ext?revision=2014-04-01'
+        filter2 = 'vyatta-interfaces?revision=2014-12-02'
+        filter3 = 'controller:netty:eventexecutor?revision=2013-11-12'
+        devices = [{'clazz': 'NOS', 'filter': filter1},
+                   {'clazz': 'VRouter5600', 'filter': filter2},
+                   {'clazz': 'controller', 'filter': filter3}]
+        if isinstance(item, dict):
+            d = dict_keys_dashed_to_underscored(item)
+            if p1 in d and isinstance(d[p1], basestring):
+                if (d[p1].startswith(p2)):
+                    node = OpenFlowCapableNode(inv_dict=d)
+                    self.add_openflow_node(node)
+            if p3 in d:
+                # Netconf
+                capabilities = d.get(p3)
+                nodes = [[d, dev['clazz']] for c in capabilities for
+                         dev in devices if dev['filter'] in c]
+                for node in nodes:
+                    if node is not None:
+                        node = NetconfCapableNode(clazz=node[1],
+                                                  inv_dict=node[0])
+                        self.add_netconf_node(node)
+                        break
+                    else:
+                        node = NetconfCapableNode(clazz='unknown',
+                                                  inv_dict=d)
+                        self.add_netconf_node(node)
+
     def get_openflow_node_ids(self):
         ids = []
         for item in self.openflow_nodes:
@@ -145,6 +162,375 @@ class Inventory():
         return node
 
 
+class InventoryView(object):
+    """ Point-in-time view of the OpenFlow nodes and flows mirrored by
+        'InventoryMirror' (not affected by the later changes).
+    """
+
+    def __init__(self, nodes, flows, counts, version, timestamp):
+        self.nodes = nodes
+        self.flows = flows
+        self.counts = counts
+        self.version = version
+        self.timestamp = timestamp
+
+    def get_version(self):
+        """ Returns number of the changes applied to the mirror before
+            this view was taken
+        """
+        return self.version
+
+    def get_time(self):
+        return self.timestamp
+
+    def get_openflow_node_ids(self):
+        return sorted(self.nodes)
+
+    def get_openflow_node(self, node_id):
+        """ Returns 'OpenFlowCapableNode' object (flows of the node are
+            only available as identifiers, see 'get_flow_ids')
+        """
+        return self.nodes.get(node_id)
+
+    def get_flows_cnt(self, node_id=None):
+        """ Returns number of flows on the node (on all nodes if node is
+            not specified)
+        """
+        if node_id is None:
+            return sum(self.counts.itervalues())
+        return self.counts.get(node_id, 0)
+
+    def get_table_ids(self, node_id):
+        """ Returns ids of the node's flow tables that have flows """
+        tables = self.flows.get(node_id, {})
+        return sorted(t for t, ids in tables.iteritems() if ids)
+
+    def get_flows_in_table_cnt(self, node_id, table_id):
+        return len(self.flows.get(node_id, {}).get(int(table_id), ()))
+
+    def get_flow_ids(self, node_id, table_id):
+        return sorted(self.flows.get(node_id, {}).get(int(table_id), ()))
+
+    def has_flow(self, node_id, table_id, flow_id):
+        return flow_id in self.flows.get(node_id, {}).get(int(table_id), ())
+
+
+class InventoryMirror(object):
+    """ Copy of the OpenFlow part of the Controller's operational
+        inventory (nodes and identifiers of their flows) kept up to date
+        by applying the changes reported by the Controller's inventory
+        change notifications (see :class:`pybvc.controller.notification.
+        InventoryChangeNotification`) to a single snapshot of it. Only
+        the added nodes are retrieved from the Controller, flow changes
+        just update the per-node flow indexes and counters.
+        Reads are done on point-in-time views ('get_view'), that share
+        unchanged data with the mirror (per-node copy on write).
+        The mirror is reloaded from the Controller (anti-entropy resync)
+        periodically by a background thread ('start'/'stop'), when a gap
+        in the notifications is detected (flow of an unknown node, added
+        node could not be retrieved) or after 'invalidate' is called.
+        Notifications applied while a resync is in progress are replayed
+        on the reloaded data.
+
+        Example::
+
+            mirror = InventoryMirror(ctrl, resync_interval=600)
+            mirror.resync()
+            mirror.start()
+            ...
+            # for every message received from the notification stream
+            mirror.apply_notification(message)
+            ...
+            view = mirror.get_view()
+            for node_id in view.get_openflow_node_ids():
+                print node_id, view.get_flows_cnt(node_id)
+    """
+
+    def __init__(self, ctrl, resync_interval=300.0, jitter=0.1):
+        """Initializes this object properties.
+
+        :param Controller ctrl: Controller the inventory is retrieved from.
+        :param float resync_interval: Interval (in seconds) of the
+                                      background resyncs.
+        :param float jitter: Maximum deviation of the resync interval
+                             (fraction of the interval).
+        """
+        self.ctrl = ctrl
+        self.resync_interval = resync_interval
+        self.jitter = jitter
+        self.version = 0
+        self.resyncs = 0
+        # number of differences between the mirror and the Controller's
+        # inventory found by the last resync
+        self.divergence = 0
+        self._nodes = {}
+        # node id -> {table id -> set of flow ids}
+        self._flows = {}
+        self._counts = {}
+        # nodes which flow indexes are shared with the last view
+        self._shared = set()
+        self._view = None
+        self._loaded = False
+        self._stale = True
+        self._journal = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_stale(self):
+        return self._stale
+
+    def get_version(self):
+        return self.version
+
+    def get_resyncs_cnt(self):
+        return self.resyncs
+
+    def get_divergence(self):
+        return self.divergence
+
+    def invalidate(self):
+        """ Marks the mirror as missing changes, it is reloaded on the next
+            notification (or 'resync' call)
+        """
+        self._stale = True
+
+    def get_view(self):
+        """ Returns 'InventoryView' of the current state of the mirror """
+        with self._lock:
+            if self._view is None:
+                self._view = InventoryView(dict(self._nodes),
+                                           dict(self._flows),
+                                           dict(self._counts),
+                                           self.version, time.time())
+                self._shared = set(self._flows)
+            return self._view
+
+    def _node_flows(self, node_id):
+        """ Returns flow index of the node to be changed """
+        tables = self._flows.get(node_id)
+        if tables is None:
+            tables = self._flows[node_id] = {}
+            self._counts[node_id] = 0
+        elif node_id in self._shared:
+            tables = dict((t, set(ids)) for t, ids in tables.iteritems())
+            self._flows[node_id] = tables
+            self._shared.discard(node_id)
+        return tables
+
+    def _set_node(self, node, tables):
+        """ Adds (replaces) the node given as 'OpenFlowCapableNode' object
+            along with the index of its flows (see '_index_node')
+        """
+        node_id = node.get_id()
+        self._remove_node(node_id)
+        self._nodes[node_id] = node
+        self._flows[node_id] = tables
+        self._counts[node_id] = sum(len(ids) for ids in tables.itervalues())
+
+    def _remove_node(self, node_id):
+        self._nodes.pop(node_id, None)
+        self._flows.pop(node_id, None)
+        self._counts.pop(node_id, None)
+        self._shared.discard(node_id)
+
+    def _fetch_nodes(self, node_ids):
+        """ Retrieves the nodes from the Controller (called without the
+            lock held), returns dictionary of (node, flows index) pairs
+            by node id or None if a node could not be retrieved (node
+            already gone from the Controller is skipped, its removal is
+            reported by a later notification)
+        """
+        ctrl = self.ctrl
+        nodes = {}
+        for node_id in node_ids:
+            ctrl.invalidate_cache(ctrl.get_node_operational_url(node_id))
+            result = ctrl.build_openflow_node_inventory_object(node_id)
+            status = result.get_status()
+            if status.eq(STATUS.OK):
+                node = result.get_data()
+                nodes[node_id] = (node, _index_node(node))
+            elif not status.eq(STATUS.DATA_NOT_FOUND):
+                return None
+        return nodes
+
+    def _apply(self, notification, nodes):
+        """ Applies the notification using nodes retrieved for it (see
+            '_fetch_nodes'), returns False if a gap is detected
+        """
+        for node_id in notification.nodes_removed():
+            self._remove_node(node_id)
+        for flow in notification.flows_removed():
+            tables = self._flows.get(flow.node_id)
+            if tables is None or flow.table_id is None:
+                continue
+            ids = tables.get(int(flow.table_id))
+            if ids and flow.flow_id in ids:
+                self._node_flows(flow.node_id)[int(flow.table_id)].discard(
+                    flow.flow_id)
+                self._counts[flow.node_id] -= 1
+        for node_id in notification.nodes_added():
+            if (not node_id.startswith('openflow') or
+               node_id in self._nodes):
+                continue
+            if nodes is None or node_id not in nodes:
+                # the node could not be retrieved
+                return False
+            node, tables = nodes[node_id]
+            # the index may be applied again when the journal is replayed
+            self._set_node(node, dict((t, set(ids))
+                                      for t, ids in tables.iteritems()))
+        for flow in notification.flows_added():
+            if flow.table_id is None:
+                continue
+            if flow.node_id not in self._nodes:
+                return False
+            ids = self._node_flows(flow.node_id).setdefault(
+                int(flow.table_id), set())
+            if flow.flow_id not in ids:
+                ids.add(flow.flow_id)
+                self._counts[flow.node_id] += 1
+        return True
+
+    def apply_notification(self, notification):
+        """ Applies changes reported by the notification (either
+            'InventoryChangeNotification' object or the notification
+            message itself) to the mirror, returns 'Result' with the
+            version of the updated mirror (the mirror is reloaded if a gap
+            in the notifications is detected). Added nodes are retrieved
+            from the Controller without the lock held, so reads are not
+            blocked by the network I/O.
+        """
+        if isinstance(notification, basestring):
+            notification = InventoryChangeNotification(notification)
+        with self._lock:
+            stale = self._stale and self._journal is None
+            node_ids = [node_id for node_id in notification.nodes_added()
+                        if node_id.startswith('openflow') and
+                        node_id not in self._nodes]
+        if stale:
+            return self.resync()
+        nodes = self._fetch_nodes(node_ids)
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((notification, nodes))
+            if not self._apply(notification, nodes):
+                # changes are replayed on the data being reloaded if a
+                # resync is in progress
+                stale = self._journal is None
+                self._stale = True
+            if not stale:
+                self.version += 1
+                self._view = None
+                return Result(OperStatus(STATUS.OK), self.version)
+        return self.resync()
+
+    def resync(self):
+        """ Reloads the mirror from the Controller, returns 'Result' with
+            the version of the reloaded mirror
+        """
+        with self._lock:
+            if self._journal is not None:
+                # resync is already in progress
+                return Result(OperStatus(STATUS.OK), self.version)
+            self._journal = []
+        try:
+            ctrl = self.ctrl
+            ctrl.invalidate_cache(ctrl.get_inventory_operational_url())
+            result = ctrl.build_inventory_object(operational=True)
+            status = result.get_status()
+            if status.eq(STATUS.OK):
+                loaded = [(node, _index_node(node))
+                          for node in result.get_data().openflow_nodes]
+            with self._lock:
+                journal = self._journal
+                self._journal = None
+                if not status.eq(STATUS.OK):
+                    self._stale = True
+                    return Result(status, self.version)
+                old = self._flows
+                self._nodes = {}
+                self._flows = {}
+                self._counts = {}
+                self._shared = set()
+                for node, tables in loaded:
+                    self._set_node(node, tables)
+                self._stale = False
+                for notification, nodes in journal:
+                    if not self._apply(notification, nodes):
+                        self._stale = True
+                if self._loaded:
+                    self.divergence = _flows_difference(old, self._flows)
+                self._loaded = True
+                self.resyncs += 1
+                self.version += 1
+                self._view = None
+                return Result(status, self.version)
+        finally:
+            with self._lock:
+                self._journal = None
+
+    def start(self):
+        """ Starts periodic resyncs in background thread """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='InventoryMirror')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """ Stops background resyncs (waits up to 'timeout' seconds for
+            the ongoing resync to complete)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            delay = self.resync_interval * random.uniform(1 - self.jitter,
+                                                          1 + self.jitter)
+            self._stop.wait(delay)
+            if self._stop.is_set():
+                break
+            try:
+                self.resync()
+            except Exception as e:
+                dbg_print("InventoryMirror: resync failed (%r)" % e)
+
+
+def _index_node(node):
+    """ Returns index of the flows of the 'OpenFlowCapableNode' object
+        ({table id -> set of flow ids}), flows are moved from the node
+        object to the index
+    """
+    tables = {}
+    p = 'flow_node_inventory:table'
+    for table in getattr(node, p, []):
+        if isinstance(table, dict) and 'id' in table:
+            flows = table.pop('flow', [])
+            ids = tables.setdefault(int(table['id']), set())
+            ids.update(f['id'] for f in flows if 'id' in f)
+    return tables
+
+
+def _flows_difference(a, b):
+    """ Returns number of flows present in one of the flow indexes only """
+    cnt = 0
+    for node_id in set(a) | set(b):
+        ta = a.get(node_id, {})
+        tb = b.get(node_id, {})
+        for t in set(ta) | set(tb):
+            cnt += len(ta.get(t, set()) ^ tb.get(t, set()))
+    return cnt
+
+
 class OpenFlowCapableNode():
     """ Class that represents current state of an OpenFlow
         capable node in the Controller's inventory store.
@@ -170,8 +556,11 @@ class OpenFlowCapableNode():
 
     def __init_from_json__(self, s):
         assert(isinstance(s, basestring))
-        obj = json.loads(s)
-        d = dict_keys_dashed_to_underscored(obj)
+        self.__init_from_dict__(json.loads(s))
+
+    def __init_from_dict__(self, d):
+        assert(isinstance(d, dict))
+        d = dict_keys_dashed_to_underscored(d)
         p1 = 'node_connector'
         p2 = 'opendaylight_group_statistics:group_features'
         p3 = 'flow_node_inventory:group'
@@ -192,11 +581,6 @@ class OpenFlowCapableNode():
             else:
                 setattr(self, k, v)
 
-    def __init_from_dict__(self, d):
-        assert(isinstance(d, dict))
-        js = json.dumps(d)
-        self.__init_from_json__(js)
-
     def to_string(self):
         """ Returns string representation of this object. """
         return str(vars(self))
@@ -543,15 +927,13 @@ class NetconfCapableNode():
 
     def __init_from_json__(self, s):
         assert(isinstance(s, basestring))
-        obj = json.loads(s)
-        d = dict_keys_dashed_to_underscored(obj)
-        for k, v in d.items():
-            setattr(self, k, v)
+        self.__init_from_dict__(json.loads(s))
 
     def __init_from_dict__(self, d):
         assert(isinstance(d, dict))
-        js = json.dumps(d)
-        self.__init_from_json__(js)
+        d = dict_keys_dashed_to_underscored(d)
+        for k, v in d.items():
+            setattr(self, k, v)
 
     def to_string(self):
         """ Returns string representation of this object. """
@@ -0,0 +1,357 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+listener.py: Listener of the Controller's data change notifications
+
+
+"""
+
+import Queue
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from websocket import create_connection, WebSocketTimeoutException
+from pybvc.common.status import STATUS
+from pybvc.common.utils import dbg_print
+from pybvc.controller.notification import (NetworkTopologyChangeNotification,
+                                           InventoryChangeNotification)
+
+# Policies applied when the queue of the received notifications is full:
+# wait for the consumer (the Controller waits for the socket to be read),
+# discard the received notification or discard the oldest queued one
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+
+_overflow_policies = (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST,
+                      OVERFLOW_DROP_OLDEST)
+
+# Marks the end of the received messages for the delivery thread
+_end = object()
+
+
+class NotificationListener(object):
+    """ Receives the Controller's data change notifications for a data tree
+        path and hands them over to the consumer as parsed notification
+        objects (:class:`pybvc.controller.notification.
+        NetworkTopologyChangeNotification` or :class:`pybvc.controller.
+        notification.InventoryChangeNotification`) via a bounded queue.
+
+        The listener creates the data change event subscription, subscribes
+        to its stream and reads the stream's websocket in a background
+        thread. Lost connection is re-established (with the subscription
+        created again) after a delay growing up to 'max_reconnect_delay'.
+        Messages are decoded on a pool of worker threads and delivered in
+        the order of arrival; when the queue is full the 'overflow' policy
+        is applied ('block', 'drop_newest' or 'drop_oldest').
+        Notifications may be missed while the listener reconnects, drops
+        notifications or fails to decode one; the functions registered by
+        'add_gap_handler' are called then (e.g. 'LiveTopology.invalidate').
+
+        Example::
+
+            listener = NotificationListener.for_topology(ctrl, 'flow:1')
+            listener.add_gap_handler(live_topo.invalidate)
+            listener.start()
+            for notification in listener:
+                live_topo.apply_notification(notification)
+    """
+
+    def __init__(self, ctrl, path, datastore='OPERATIONAL', scope='SUBTREE',
+                 decoder=None, queue_size=1000, overflow=OVERFLOW_BLOCK,
+                 workers=2, reconnect_delay=1.0, max_reconnect_delay=30.0,
+                 recv_timeout=1.0):
+        """Initializes this object properties.
+
+        :param Controller ctrl: Controller to receive notifications from.
+        :param string path: YANG data tree path of the changes (e.g.
+                            'ctrl.get_network_topology_yang_schema_path()').
+        :param string datastore: 'OPERATIONAL' or 'CONFIGURATION'.
+        :param string scope: 'BASE', 'ONE' or 'SUBTREE'.
+        :param decoder: Function (class) parsing notification message,
+                        chosen from the path if not specified.
+        :param int queue_size: Maximum number of the queued notifications.
+        :param string overflow: Policy applied when the queue is full.
+        :param int workers: Number of threads decoding messages.
+        :param float reconnect_delay: Initial delay (in seconds) before
+                                      reconnecting to the Controller.
+        :param float max_reconnect_delay: Maximum reconnect delay.
+        :param float recv_timeout: Interval (in seconds) the listener
+                                   checks for the stop request while
+                                   waiting for messages.
+        """
+        if overflow not in _overflow_policies:
+            raise ValueError("unknown overflow policy '%s'" % overflow)
+        self.ctrl = ctrl
+        self.path = path
+        self.datastore = datastore
+        self.scope = scope
+        if decoder is None:
+            inventory = ctrl.get_inventory_nodes_yang_schema_path()
+            if path.startswith(inventory):
+                decoder = InventoryChangeNotification
+            else:
+                decoder = NetworkTopologyChangeNotification
+        self.decoder = decoder
+        self.overflow = overflow
+        self.workers = workers
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.recv_timeout = recv_timeout
+        self.stream_location = None
+        self.stats = {'connects': 0, 'received': 0, 'enqueued': 0,
+                      'dropped': 0, 'decode_errors': 0}
+        self._queue = Queue.Queue(queue_size)
+        # decoding in progress, in the order of arrival
+        self._pending = Queue.Queue(max(1, workers) * 4)
+        self._gap_handlers = []
+        self._stop = threading.Event()
+        self._threads = []
+        self._pool = None
+
+    @classmethod
+    def for_topology(cls, ctrl, topo_id='flow:1', **kwargs):
+        """ Returns listener of the network topology changes """
+        path = ctrl.get_network_topology_yang_schema_path(topo_id)
+        return cls(ctrl, path, **kwargs)
+
+    @classmethod
+    def for_inventory(cls, ctrl, **kwargs):
+        """ Returns listener of the inventory changes """
+        path = ctrl.get_inventory_nodes_yang_schema_path()
+        return cls(ctrl, path, **kwargs)
+
+    def add_gap_handler(self, handler):
+        """ Registers function (called without arguments) to be invoked
+            when notifications may have been missed
+        """
+        self._gap_handlers.append(handler)
+
+    def get_stats(self):
+        """ Returns dictionary with the counters of connections, received,
+            enqueued (put on the queue) and dropped notifications and
+            decoding errors, and the number of notifications waiting in
+            the queue ('queued')
+        """
+        stats = dict(self.stats)
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+    def get_stream_location(self):
+        return self.stream_location
+
+    def start(self):
+        """ Starts receiving notifications in background threads """
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._pool = ThreadPool(max(1, self.workers))
+        self._threads = [
+            threading.Thread(target=self._receive,
+                             name='NotificationListener-receive'),
+            threading.Thread(target=self._deliver,
+                             name='NotificationListener-deliver')]
+        for t in self._threads:
+            t.daemon = True
+            t.start()
+
+    def stop(self, timeout=None):
+        """ Stops receiving notifications (the already queued ones can
+            still be retrieved)
+        """
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def is_running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def get(self, block=True, timeout=None):
+        """ Returns the next notification (None if there is none within
+            the timeout)
+        """
+        try:
+            return self._queue.get(block, timeout)
+        except Queue.Empty:
+            return None
+
+    def __iter__(self):
+        """ Yields notifications until the listener is stopped and its
+            queue is drained
+        """
+        while True:
+            notification = self.get(timeout=self.recv_timeout)
+            if notification is not None:
+                yield notification
+            elif not self.is_running():
+                break
+
+    def _gap(self):
+        for handler in self._gap_handlers:
+            try:
+                handler()
+            except Exception as e:
+                dbg_print("NotificationListener: gap handler failed (%r)"
+                          % e)
+
+    def _subscribe(self):
+        """ Creates the subscription, returns location of its stream
+            (None if the Controller failed to provide it)
+        """
+        ctrl = self.ctrl
+        result = ctrl.create_data_change_event_subscription(
+            self.datastore, self.scope, self.path)
+        if not result.get_status().eq(STATUS.OK):
+            return None
+        result = ctrl.subscribe_to_stream(result.get_data())
+        if not result.get_status().eq(STATUS.OK):
+            return None
+        return result.get_data()
+
+    def _connect(self):
+        location = self._subscribe()
+        if location is None:
+            return None
+        try:
+            ws = create_connection(location, timeout=self.recv_timeout)
+        except Exception as e:
+            dbg_print("NotificationListener: failed to connect to '%s' (%r)"
+                      % (location, e))
+            return None
+        self.stream_location = location
+        self.stats['connects'] += 1
+        return ws
+
+    def _receive(self):
+        delay = self.reconnect_delay
+        try:
+            while not self._stop.is_set():
+                ws = self._connect()
+                if ws is None:
+                    self._stop.wait(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+                    continue
+                delay = self.reconnect_delay
+                if self.stats['connects'] > 1:
+                    # changes made while disconnected were not reported
+                    self._gap()
+                try:
+                    self._read(ws)
+                except Exception as e:
+                    dbg_print("NotificationListener: connection lost (%r)"
+                              % e)
+                finally:
+                    ws.close()
+        finally:
+            self._pending.put(_end)
+
+    def _read(self, ws):
+        while not self._stop.is_set():
+            try:
+                message = ws.recv()
+            except WebSocketTimeoutException:
+                continue
+            if not message:
+                # connection closed by the Controller
+                break
+            self.stats['received'] += 1
+            pending = self._pool.apply_async(self._decode, (message,))
+            while not self._stop.is_set():
+                try:
+                    self._pending.put(pending, timeout=self.recv_timeout)
+                    break
+                except Queue.Full:
+                    pass
+
+    def _decode(self, message):
+        try:
+            return self.decoder(message)
+        except Exception as e:
+            dbg_print("NotificationListener: failed to decode (%r)" % e)
+            return None
+
+    def _deliver(self):
+        while True:
+            pending = self._pending.get()
+            if pending is _end:
+                break
+            notification = pending.get()
+            if notification is None:
+                self.stats['decode_errors'] += 1
+                self._gap()
+            else:
+                self._put(notification)
+
+    def _put(self, notification):
+        """ Queues the notification according to the overflow policy """
+        queue = self._queue
+        if self.overflow == OVERFLOW_BLOCK:
+            while not self._stop.is_set():
+                try:
+                    queue.put(notification, timeout=self.recv_timeout)
+                    self.stats['enqueued'] += 1
+                    return
+                except Queue.Full:
+                    pass
+            # stopped with the consumer not keeping up
+            self._dropped()
+            return
+        while True:
+            try:
+                queue.put_nowait(notification)
+                self.stats['enqueued'] += 1
+                return
+            except Queue.Full:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    self._dropped()
+                    return
+            try:
+                queue.get_nowait()
+                self._dropped()
+            except Queue.Empty:
+                pass
+
+    def _dropped(self):
+        self.stats['dropped'] += 1
+        self._gap()
@@ -42,6 +42,8 @@ netconfnode.py: Controller's NETCONF node specific properties
 
 import json
 
+from pybvc.common.utils import public_vars
+
 
 class NetconfNode(object):
     """ Class that represents a NETCONF capable server device.
@@ -78,5 +80,5 @@ class NetconfNode(object):
 
     def to_json(self):
         """ Returns JSON representation of this object. """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=public_vars,
                           sort_keys=True, indent=4)
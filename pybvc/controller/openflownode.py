@@ -42,6 +42,8 @@ openflownode.py: Controller's OpenFlow node specific properties
 
 import json
 
+from pybvc.common.utils import public_vars
+
 
 class OpenflowNode(object):
     """ Class that represents a NETCONF capable server device. """
@@ -57,5 +59,5 @@ class OpenflowNode(object):
 
     def to_json(self):
         """ Returns JSON representation of this object. """
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True,
+        return json.dumps(self, default=public_vars, sort_keys=True,
                           indent=4)
@@ -0,0 +1,493 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+pathfinder.py: Shortest paths and multipaths between the nodes of
+               a Controller's network topology
+
+
+"""
+
+import heapq
+
+from array import array
+from collections import deque
+
+_inf = float('inf')
+
+# Tolerance used to decide that two weighted path costs are equal
+_eps = 1e-9
+
+
+def _tp_port(node_id, tp_id):
+    """ Returns port number of the node's termination point id
+        (None if the termination point does not belong to the node)
+    """
+    if tp_id is not None:
+        prefix = node_id + ":"
+        if tp_id.startswith(prefix):
+            return tp_id[len(prefix):]
+    return None
+
+
+class PathHop(object):
+    """ Switch on a path with the ports the traffic enters and leaves the
+        switch through (None for the ends of a path starting or ending on
+        a switch), i.e. everything needed to build the switch's flow entry
+        ('in_port' match and output action).
+    """
+
+    __slots__ = ('node_id', 'in_port', 'out_port')
+
+    def __init__(self, node_id, in_port, out_port):
+        self.node_id = node_id
+        self.in_port = in_port
+        self.out_port = out_port
+
+    def __repr__(self):
+        return "PathHop(%r, %r, %r)" % (self.node_id, self.in_port,
+                                        self.out_port)
+
+    def get_node_id(self):
+        return self.node_id
+
+    def get_in_port(self):
+        return self.in_port
+
+    def get_out_port(self):
+        return self.out_port
+
+
+class Path(object):
+    """ Path in the topology: sequence of nodes, links connecting them and
+        the path cost (number of links for unweighted paths). 'is_host'
+        flags the nodes of the sequence that are hosts (all other nodes
+        are switches), as classified by the 'TopologyGraph'.
+    """
+
+    __slots__ = ('node_ids', 'links', 'cost', 'is_host')
+
+    def __init__(self, node_ids, links, cost, is_host):
+        self.node_ids = node_ids
+        self.links = links
+        self.cost = cost
+        self.is_host = is_host
+
+    def __len__(self):
+        return len(self.links)
+
+    def __repr__(self):
+        return "Path(%r, cost=%r)" % (self.node_ids, self.cost)
+
+    def get_node_ids(self):
+        return self.node_ids
+
+    def get_switch_ids(self):
+        """ Returns ids of the switches on the path (in the order of
+            traversal)
+        """
+        return [node_id for node_id, host in zip(self.node_ids,
+                                                 self.is_host)
+                if not host]
+
+    def get_links(self):
+        return self.links
+
+    def get_link_ids(self):
+        return [link.get_id() for link in self.links]
+
+    def get_cost(self):
+        return self.cost
+
+    def get_hops(self):
+        """ Returns list of 'PathHop' objects for the switches on the path
+            (in the order of traversal)
+        """
+        hops = []
+        links = self.links
+        last = len(links)
+        is_host = self.is_host
+        for i, node_id in enumerate(self.node_ids):
+            if is_host[i]:
+                continue
+            in_port = out_port = None
+            if i > 0:
+                in_port = _tp_port(node_id, links[i - 1].get_dst_tp_id())
+            if i < last:
+                out_port = _tp_port(node_id, links[i].get_src_tp_id())
+            hops.append(PathHop(node_id, in_port, out_port))
+        return hops
+
+
+class PathTree(object):
+    """ Shortest paths from a node to all nodes reachable from it
+        (see 'TopologyGraph.shortest_path_tree')
+    """
+
+    def __init__(self, graph, source, dist, preds, weighted):
+        self.graph = graph
+        self.source = source
+        self.dist = dist
+        self.preds = preds
+        self.weighted = weighted
+
+    def _resolve(self, i):
+        """ Returns distance to the node, distances to hosts are computed
+            on demand from the distances to the switches they attach to
+        """
+        dist = self.dist
+        graph = self.graph
+        if dist[i] == _inf and graph.is_host[i]:
+            for e in graph.host_in.get(i, ()):
+                u = graph.sources[e]
+                if graph.is_host[u] or dist[u] == _inf:
+                    continue
+                d = dist[u] + (graph.weights[e] if self.weighted else 1)
+                if d < dist[i]:
+                    dist[i] = d
+                    self.preds[i] = e
+        return dist[i]
+
+    def get_source_id(self):
+        return self.graph.node_ids[self.source]
+
+    def get_distance(self, node_id):
+        """ Returns cost of the shortest path to the node (None if the
+            node is not reachable)
+        """
+        i = self.graph.index.get(node_id)
+        if i is None or self._resolve(i) == _inf:
+            return None
+        return self.dist[i]
+
+    def get_distances(self):
+        """ Returns dictionary mapping ids of the reachable nodes to the
+            costs of the shortest paths to them
+        """
+        node_ids = self.graph.node_ids
+        return dict((node_ids[i], self.dist[i])
+                    for i in xrange(len(node_ids))
+                    if self._resolve(i) != _inf)
+
+    def get_path(self, node_id):
+        """ Returns 'Path' to the node (None if it is not reachable) """
+        i = self.graph.index.get(node_id)
+        if i is None or self._resolve(i) == _inf:
+            return None
+        edges = self.graph._edges_to(self.preds, self.source, i)
+        return self.graph._make_path(self.source, edges, self.dist[i])
+
+
+class TopologyGraph(object):
+    """ Directed graph of a 'Topology' (nodes are switches and hosts, edges
+        are links) kept as integer indexed compressed adjacency arrays,
+        with path algorithms: BFS (fewest links) and Dijkstra (weighted)
+        shortest paths, all equal-cost shortest paths (ECMP), k shortest
+        paths (Yen's algorithm) and single-source shortest path trees for
+        all-pairs queries.
+        Hosts are only used as path ends, traffic never transits them.
+        The graph is a snapshot, it does not follow later changes of the
+        topology.
+    """
+
+    def __init__(self, topology, weight=None):
+        """Initializes this object properties.
+
+        :param Topology topology: Topology to build the graph of.
+        :param weight: Function returning the link weight (non-negative
+                       number) for 'Link' object, each link weights 1 if
+                       not specified.
+        """
+        nodes = (topology.get_switches() +
+                 sorted(topology.get_hosts(), key=lambda n: n.get_id()))
+        self.node_ids = [n.get_id() for n in nodes]
+        self.index = dict((node_id, i)
+                          for i, node_id in enumerate(self.node_ids))
+        self.is_host = bytearray(1 if n.is_host() else 0 for n in nodes)
+
+        index = self.index
+        out = [[] for _ in nodes]
+        for link in topology.get_links():
+            u = index.get(link.get_src_node_id())
+            v = index.get(link.get_dst_node_id())
+            if u is None or v is None or u == v:
+                continue
+            w = 1.0 if weight is None else float(weight(link))
+            if w < 0:
+                raise ValueError("negative weight %r of link '%s'"
+                                 % (w, link.get_id()))
+            out[u].append((v, w, link))
+
+        # edges leaving node 'u' are in range [offsets[u], offsets[u + 1]),
+        # edges to switches precede edges to hosts ([offsets[u], core[u]))
+        self.offsets = array('l', [0])
+        self.core = array('l')
+        self.sources = array('l')
+        self.targets = array('l')
+        self.weights = array('d')
+        self.links = []
+        is_host = self.is_host
+        for u, edges in enumerate(out):
+            edges.sort(key=lambda e: is_host[e[0]])
+            for v, w, link in edges:
+                self.sources.append(u)
+                self.targets.append(v)
+                self.weights.append(w)
+                self.links.append(link)
+            self.core.append(self.offsets[-1] +
+                             sum(1 for e in edges if not is_host[e[0]]))
+            self.offsets.append(len(self.links))
+
+        # host -> edges to the host
+        self.host_in = {}
+        for e, v in enumerate(self.targets):
+            if is_host[v]:
+                self.host_in.setdefault(v, []).append(e)
+
+    def get_node_ids(self):
+        return self.node_ids
+
+    def get_switch_ids(self):
+        return [node_id for i, node_id in enumerate(self.node_ids)
+                if not self.is_host[i]]
+
+    def get_nodes_cnt(self):
+        return len(self.node_ids)
+
+    def get_links_cnt(self):
+        return len(self.links)
+
+    def _node_index(self, node_id):
+        i = self.index.get(node_id)
+        if i is None:
+            raise ValueError("unknown node '%s'" % node_id)
+        return i
+
+    def _target_edges(self, t):
+        """ Returns dictionary mapping switches to their edges to the host
+            't' (empty if 't' is not a host): edges to hosts are only
+            followed when the host is the target of the search.
+        """
+        res = {}
+        if t is not None and self.is_host[t]:
+            sources = self.sources
+            for e in self.host_in.get(t, ()):
+                res.setdefault(sources[e], []).append(e)
+        return res
+
+    def _bfs(self, s, t=None):
+        dist = [_inf] * len(self.node_ids)
+        preds = [-1] * len(self.node_ids)
+        offsets, core, targets = self.offsets, self.core, self.targets
+        host_edges = self._target_edges(t)
+        dist[s] = 0
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            if u == t:
+                break
+            if u != s and self.is_host[u]:
+                continue
+            d = dist[u] + 1
+            edges = xrange(offsets[u], core[u])
+            if u in host_edges:
+                edges = list(edges) + host_edges[u]
+            for e in edges:
+                v = targets[e]
+                if dist[v] == _inf:
+                    dist[v] = d
+                    preds[v] = e
+                    queue.append(v)
+        return dist, preds
+
+    def _dijkstra(self, s, t=None, weighted=True, banned_nodes=None,
+                  banned_edges=None, all_preds=False):
+        dist = [_inf] * len(self.node_ids)
+        preds = [-1] * len(self.node_ids)
+        done = bytearray(len(self.node_ids))
+        offsets, core, targets = self.offsets, self.core, self.targets
+        weights = self.weights
+        is_host = self.is_host
+        host_edges = self._target_edges(t)
+        heappush, heappop = heapq.heappush, heapq.heappop
+        dist[s] = 0
+        if all_preds:
+            preds[s] = []
+        heap = [(0, s)]
+        while heap:
+            d, u = heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            if u == t:
+                break
+            if u != s and is_host[u]:
+                continue
+            edges = xrange(offsets[u], core[u])
+            if u in host_edges:
+                edges = list(edges) + host_edges[u]
+            for e in edges:
+                if banned_edges and e in banned_edges:
+                    continue
+                v = targets[e]
+                if done[v] or (banned_nodes and v in banned_nodes):
+                    continue
+                nd = d + weights[e] if weighted else d + 1
+                dv = dist[v]
+                if nd < dv - _eps:
+                    dist[v] = nd
+                    preds[v] = [e] if all_preds else e
+                    heappush(heap, (nd, v))
+                elif all_preds and nd <= dv + _eps:
+                    preds[v].append(e)
+        return dist, preds
+
+    def _edges_to(self, preds, s, t):
+        """ Returns tuple of edges of the path from 's' to 't' """
+        edges = []
+        sources = self.sources
+        v = t
+        while v != s:
+            e = preds[v]
+            edges.append(e)
+            v = sources[e]
+        edges.reverse()
+        return tuple(edges)
+
+    def _cost(self, edges, weighted):
+        if weighted:
+            return sum(self.weights[e] for e in edges)
+        return len(edges)
+
+    def _make_path(self, s, edges, cost):
+        node_ids = self.node_ids
+        targets = self.targets
+        nodes = [s]
+        nodes.extend(targets[e] for e in edges)
+        is_host = self.is_host
+        return Path([node_ids[i] for i in nodes],
+                    [self.links[e] for e in edges], cost,
+                    bytearray(is_host[i] for i in nodes))
+
+    def bfs_path(self, src_id, dst_id):
+        """ Returns 'Path' with the fewest links between the nodes (None
+            if the destination is not reachable)
+        """
+        s, t = self._node_index(src_id), self._node_index(dst_id)
+        dist, preds = self._bfs(s, t)
+        if dist[t] == _inf:
+            return None
+        return self._make_path(s, self._edges_to(preds, s, t), dist[t])
+
+    def shortest_path(self, src_id, dst_id, weighted=True):
+        """ Returns the lowest cost 'Path' between the nodes (None if the
+            destination is not reachable)
+        """
+        s, t = self._node_index(src_id), self._node_index(dst_id)
+        dist, preds = self._dijkstra(s, t, weighted)
+        if dist[t] == _inf:
+            return None
+        return self._make_path(s, self._edges_to(preds, s, t), dist[t])
+
+    def ecmp_paths(self, src_id, dst_id, max_paths=16, weighted=True):
+        """ Returns list of (up to 'max_paths') equal-cost shortest paths
+            between the nodes
+        """
+        s, t = self._node_index(src_id), self._node_index(dst_id)
+        dist, preds = self._dijkstra(s, t, weighted, all_preds=True)
+        if dist[t] == _inf:
+            return []
+        paths = []
+        sources = self.sources
+        stack = [(t, ())]
+        while stack and len(paths) < max_paths:
+            v, suffix = stack.pop()
+            if v == s:
+                paths.append(self._make_path(s, suffix, dist[t]))
+                continue
+            for e in reversed(preds[v]):
+                stack.append((sources[e], (e,) + suffix))
+        return paths
+
+    def k_shortest_paths(self, src_id, dst_id, k, weighted=True):
+        """ Returns list of (up to 'k') loopless paths between the nodes
+            in the order of increasing cost (Yen's algorithm)
+        """
+        s, t = self._node_index(src_id), self._node_index(dst_id)
+        dist, preds = self._dijkstra(s, t, weighted)
+        if dist[t] == _inf or k < 1:
+            return []
+        found = [(dist[t], self._edges_to(preds, s, t))]
+        candidates = []
+        seen = set(p for c, p in found)
+        targets = self.targets
+        while len(found) < k:
+            prev = found[-1][1]
+            nodes = [s] + [targets[e] for e in prev]
+            for i in xrange(len(prev)):
+                root = prev[:i]
+                banned_edges = set(p[i] for c, p in found
+                                   if len(p) > i and p[:i] == root)
+                banned_nodes = set(nodes[:i])
+                dist, preds = self._dijkstra(nodes[i], t, weighted,
+                                             banned_nodes, banned_edges)
+                if dist[t] == _inf:
+                    continue
+                edges = root + self._edges_to(preds, nodes[i], t)
+                if edges not in seen:
+                    seen.add(edges)
+                    heapq.heappush(candidates,
+                                   (self._cost(edges, weighted), edges))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+        return [self._make_path(s, p, cost) for cost, p in found]
+
+    def shortest_path_tree(self, src_id, weighted=True):
+        """ Returns 'PathTree' of the shortest paths from the node to all
+            the nodes reachable from it. Trees of all the switches answer
+            all-pairs queries, e.g.::
+
+                for switch_id in graph.get_switch_ids():
+                    tree = graph.shortest_path_tree(switch_id)
+        """
+        s = self._node_index(src_id)
+        if weighted:
+            dist, preds = self._dijkstra(s)
+        else:
+            dist, preds = self._bfs(s)
+        return PathTree(self, s, dist, preds, weighted)
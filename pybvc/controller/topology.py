@@ -41,12 +41,20 @@ topology.py: Controller's topology parser
 """
 
 import json
+import threading
 
+from pybvc.controller.notification import NetworkTopologyChangeNotification
+from pybvc.controller.pathfinder import TopologyGraph
+from pybvc.common.result import Result
+from pybvc.common.status import OperStatus, STATUS
 from pybvc.common.utils import dict_keys_dashed_to_underscored
 
 
 class Topology():
     """ Class that represents Controller's view on a Network Topology instance.
+        Nodes and links are indexed as they are added (or removed), so that
+        lookups of nodes by id, of links by their end points and of the
+        per-node adjacency do not depend on the topology size.
     """
     def __init__(self, topo_json=None, topo_dict=None):
         self.topology_id = None
@@ -54,6 +62,18 @@ class Topology():
         self.links = []
         self.switches = []
         self.hosts = []
+        self._nodes_by_id = {}
+        self._links_by_id = {}
+        # (destination node id, destination termination point id) -> links
+        self._links_by_dst_tp = {}
+        # node id -> links with the node as source (destination)
+        self._out_links = {}
+        self._in_links = {}
+        self._inter_switch_links = 0
+        # sorted views of nodes and the graph of the topology with unit
+        # link weights, rebuilt on first use after a change
+        self._sorted = {}
+        self._graph = None
 
         assert_msg = "[Topology] either '%s' or '%s' should be used, " \
                      "not both" % ('topo_json', 'topo_dict')
@@ -69,8 +89,14 @@ class Topology():
 
     def __init_from_json__(self, s):
         if (isinstance(s, basestring)):
-            obj = json.loads(s)
-            d = dict_keys_dashed_to_underscored(obj)
+            self.__init_from_dict__(json.loads(s))
+        else:
+            raise TypeError("[Topology] wrong argument type '%s'"
+                            " (JSON 'string' is expected)" % type(s))
+
+    def __init_from_dict__(self, d):
+        if (isinstance(d, dict)):
+            d = dict_keys_dashed_to_underscored(d)
             for k, v in d.items():
                 if ('topology_id' == k):
                     self.topology_id = v
@@ -86,14 +112,6 @@ class Topology():
                             self.add_link(link)
                 else:
                     assert(False)
-        else:
-            raise TypeError("[Topology] wrong argument type '%s'"
-                            " (JSON 'string' is expected)" % type(s))
-
-    def __init_from_dict__(self, d):
-        if (isinstance(d, dict)):
-            js = json.dumps(d)
-            self.__init_from_json__(js)
         else:
             raise TypeError("[Topology] wrong argument type '%s'"
                             " ('dict' is expected)" % type(d))
@@ -103,33 +121,98 @@ class Topology():
         return str(vars(self))
 
     def add_node(self, node):
+        """ Adds node to the topology (replaces node with the same id) """
         assert(isinstance(node, Node))
+        node_id = node.get_id()
+        if node_id in self._nodes_by_id:
+            self._discard_node(self._nodes_by_id[node_id])
+        self._nodes_by_id[node_id] = node
+        self._sorted.clear()
+        self._graph = None
         self.nodes.append(node)
         if (node.is_switch()):
             self.switches.append(node)
         elif (node.is_host()):
             self.hosts.append(node)
 
+    def remove_node(self, node_id):
+        """ Removes node with the given id along with the links attached
+            to it, returns the removed node (None if there is no such node)
+        """
+        node = self._nodes_by_id.pop(node_id, None)
+        if node is not None:
+            self._discard_node(node)
+            links = (self._out_links.get(node_id, []) +
+                     self._in_links.get(node_id, []))
+            for link in links:
+                self.remove_link(link.get_id())
+        return node
+
+    def _discard_node(self, node):
+        self._sorted.clear()
+        self._graph = None
+        self.nodes.remove(node)
+        if node in self.switches:
+            self.switches.remove(node)
+        elif node in self.hosts:
+            self.hosts.remove(node)
+
     def add_link(self, link):
+        """ Adds link to the topology (replaces link with the same id) """
         assert(isinstance(link, Link))
+        link_id = link.get_id()
+        if link_id in self._links_by_id:
+            self.remove_link(link_id)
+        self._links_by_id[link_id] = link
+        self._graph = None
         self.links.append(link)
+        src = link.get_src_node_id()
+        dst = link.get_dst_node_id()
+        self._out_links.setdefault(src, []).append(link)
+        self._in_links.setdefault(dst, []).append(link)
+        key = (dst, link.get_dst_tp_id())
+        self._links_by_dst_tp.setdefault(key, []).append(link)
+        if link.is_switch_to_switch():
+            self._inter_switch_links += 1
+
+    def remove_link(self, link_id):
+        """ Removes link with the given id, returns the removed link
+            (None if there is no such link)
+        """
+        link = self._links_by_id.pop(link_id, None)
+        if link is not None:
+            self._graph = None
+            self.links.remove(link)
+            src = link.get_src_node_id()
+            dst = link.get_dst_node_id()
+            key = (dst, link.get_dst_tp_id())
+            for index, k in ((self._out_links, src),
+                             (self._in_links, dst),
+                             (self._links_by_dst_tp, key)):
+                l = index[k]
+                l.remove(link)
+                if not l:
+                    del index[k]
+            if link.is_switch_to_switch():
+                self._inter_switch_links -= 1
+        return link
+
+    def _get_sorted(self, name, nodes):
+        l = self._sorted.get(name)
+        if l is None:
+            l = sorted(nodes, key=lambda n: n.get_id())
+            self._sorted[name] = l
+        return l
 
     def get_id(self):
         return self.topology_id
 
     def get_switch_ids(self):
-        snames = []
-        for n in self.nodes:
-            if (n.is_switch()):
-                snames.append(n.node_id)
-        return sorted(snames)
+        return [n.node_id for n in self._get_sorted('switches',
+                                                    self.switches)]
 
     def get_host_ids(self):
-        snames = []
-        for n in self.nodes:
-            if (n.is_host()):
-                snames.append(n.node_id)
-        return sorted(snames)
+        return [n.node_id for n in self._get_sorted('hosts', self.hosts)]
 
     def get_switches_cnt(self):
         return len(self.switches)
@@ -138,10 +221,7 @@ class Topology():
         return len(self.hosts)
 
     def get_inter_switch_links_cnt(self):
-        cnt = 0
-        for l in self.links:
-            if(l.is_switch_to_switch()):
-                cnt += 1
+        cnt = self._inter_switch_links
         assert(cnt % 2 == 0)
         return cnt / 2
 
@@ -149,42 +229,196 @@ class Topology():
         return self.nodes
 
     def get_switches(self):
-        return sorted(self.switches, key=lambda n: n.get_id())
+        return list(self._get_sorted('switches', self.switches))
 
     def get_switch(self, switch_id):
-        for item in self.switches:
-            if(item.get_id() == switch_id):
-                return item
+        node = self._nodes_by_id.get(switch_id)
+        if node is not None and node.is_switch():
+            return node
 
     def get_hosts(self):
         return self.hosts
 
+    def get_links(self):
+        return self.links
+
+    def get_link_by_id(self, link_id):
+        return self._links_by_id.get(link_id)
+
+    def get_links_from_node(self, node_id):
+        """ Returns list of links with the given node as source """
+        return list(self._out_links.get(node_id, []))
+
+    def get_links_to_node(self, node_id):
+        """ Returns list of links with the given node as destination """
+        return list(self._in_links.get(node_id, []))
+
+    def get_neighbor_ids(self, node_id):
+        """ Returns ids of the nodes the given node has links to """
+        return sorted(set(l.get_dst_node_id()
+                          for l in self._out_links.get(node_id, [])))
+
     def get_peer_list_for_node(self, node):
-        plist = []
-        print node.get_id()
-        for link in self.links:
-            if(link.is_dst_node(node)):
-                plist.append(link)
-        return plist
+        return list(self._in_links.get(node.get_id(), []))
 
     def get_peer_list_for_node_port_(self, node, pnum):
         plist = []
-        for link in self.links:
-            if(link.is_dst_node_port(node, pnum)):
-                src_node_id = link.get_src_node_id()
-                if(src_node_id):
-                    src_node = self.get_node_by_id(src_node_id)
-                    if(src_node):
-                        plist.append(src_node)
+        node_id = node.get_id()
+        key = (node_id, node_id + ":" + pnum)
+        for link in self._links_by_dst_tp.get(key, []):
+            src_node_id = link.get_src_node_id()
+            if(src_node_id):
+                src_node = self.get_node_by_id(src_node_id)
+                if(src_node):
+                    plist.append(src_node)
         return plist
 
     def get_node_by_id(self, node_id):
-        node = None
-        for item in self.nodes:
-            if item.get_id() == node_id:
-                node = item
-                break
-        return node
+        return self._nodes_by_id.get(node_id)
+
+    def get_path_graph(self, weight=None):
+        """ Returns :class:`pybvc.controller.pathfinder.TopologyGraph` of
+            this topology for the shortest paths and multipaths queries
+            (see the class for the 'weight' argument). Graph with unit link
+            weights is kept until the topology changes.
+        """
+        if weight is not None:
+            return TopologyGraph(self, weight)
+        if self._graph is None:
+            self._graph = TopologyGraph(self)
+        return self._graph
+
+    def get_shortest_path(self, src_id, dst_id, weight=None):
+        """ Returns the lowest cost path between the nodes as
+            :class:`pybvc.controller.pathfinder.Path` (None if there is no
+            path), see 'get_path_graph'
+        """
+        return self.get_path_graph(weight).shortest_path(src_id, dst_id)
+
+
+class LiveTopology(object):
+    """ Network topology kept up to date by applying the changes reported
+        by the Controller's topology change notifications (see
+        :class:`pybvc.controller.notification.
+        NetworkTopologyChangeNotification`) to a single snapshot of it.
+        Removed switches, hosts and links are removed in place, only the
+        added ones are retrieved from the Controller (one request per
+        element), queries are answered by the local 'Topology' object.
+        The topology is reloaded from the Controller when a gap in the
+        notifications is detected: a link refers to a node that is not
+        known, an added element could not be retrieved or 'invalidate'
+        was called (e.g. when the notification stream was reconnected).
+
+        Example::
+
+            live = LiveTopology(ctrl, 'flow:1')
+            live.resync()
+            ...
+            # for every message received from the notification stream
+            live.apply_notification(message)
+            topo = live.get_topology()
+    """
+
+    def __init__(self, ctrl, topo_id='flow:1'):
+        """Initializes this object properties.
+
+        :param Controller ctrl: Controller the topology is retrieved from.
+        :param string topo_id: Identifier of the network topology.
+        """
+        self.ctrl = ctrl
+        self.topo_id = topo_id
+        self.topology = None
+        self.updates = 0
+        self.resyncs = 0
+        self._stale = True
+        self._lock = threading.RLock()
+
+    def get_topology(self):
+        """ Returns current 'Topology' object (None if it has not been
+            loaded yet), the object is changed in place by the subsequent
+            notifications and replaced by resynchronization.
+        """
+        return self.topology
+
+    def is_stale(self):
+        return self._stale
+
+    def get_updates_cnt(self):
+        return self.updates
+
+    def get_resyncs_cnt(self):
+        return self.resyncs
+
+    def invalidate(self):
+        """ Marks the topology as missing changes, it is reloaded on the
+            next notification (or 'resync' call)
+        """
+        self._stale = True
+
+    def resync(self):
+        """ Reloads the topology from the Controller, returns 'Result'
+            with the new 'Topology' object
+        """
+        with self._lock:
+            ctrl = self.ctrl
+            ctrl.invalidate_cache(ctrl.get_topology_operational_url(
+                self.topo_id))
+            result = ctrl.build_topology_object(self.topo_id)
+            status = result.get_status()
+            if status.eq(STATUS.OK) and result.get_data() is not None:
+                self.topology = result.get_data()
+                self._stale = False
+                self.resyncs += 1
+            else:
+                self._stale = True
+            return Result(status, self.topology)
+
+    def apply_notification(self, notification):
+        """ Applies changes reported by the notification (either
+            'NetworkTopologyChangeNotification' object or the notification
+            message itself) to the topology, returns 'Result' with the
+            'Topology' object (the topology is reloaded if a gap in the
+            notifications is detected).
+        """
+        if isinstance(notification, basestring):
+            notification = NetworkTopologyChangeNotification(notification)
+        with self._lock:
+            if self._stale or self.topology is None:
+                return self.resync()
+            topo = self.topology
+            for node_id in (notification.switches_removed() +
+                            notification.hosts_removed()):
+                topo.remove_node(node_id)
+            for link_id in notification.links_removed():
+                topo.remove_link(link_id)
+            for node_id in (notification.switches_added() +
+                            notification.hosts_added()):
+                result = self.ctrl.get_topology_node(self.topo_id, node_id)
+                if not self._add_element(topo.add_node, result):
+                    return self.resync()
+            for link_id in notification.links_added():
+                result = self.ctrl.get_topology_link(self.topo_id, link_id)
+                link = result.get_data()
+                if link is not None:
+                    ends = (link.get_src_node_id(), link.get_dst_node_id())
+                    if None in [topo.get_node_by_id(n) for n in ends]:
+                        return self.resync()
+                if not self._add_element(topo.add_link, result):
+                    return self.resync()
+            self.updates += 1
+            return Result(OperStatus(STATUS.OK), topo)
+
+    def _add_element(self, add, result):
+        """ Adds retrieved topology element, returns False if it could not
+            be retrieved (elements already gone from the Controller are
+            skipped, their removal is reported by a later notification)
+        """
+        status = result.get_status()
+        if status.eq(STATUS.OK):
+            add(result.get_data())
+        elif not status.eq(STATUS.DATA_NOT_FOUND):
+            return False
+        return True
 
 
 class Node():
@@ -354,6 +588,39 @@ class Link():
 
         return src_node_id
 
+    def get_dst_node_id(self):
+        dst_node_id = None
+        p1 = 'destination'
+        p2 = 'dest_node'
+        if(hasattr(self, p1)):
+            attr = getattr(self, p1)
+            if(isinstance(attr, dict) and p2 in attr):
+                dst_node_id = attr[p2]
+
+        return dst_node_id
+
+    def get_src_tp_id(self):
+        src_tp_id = None
+        p1 = 'source'
+        p2 = 'source_tp'
+        if(hasattr(self, p1)):
+            attr = getattr(self, p1)
+            if(isinstance(attr, dict) and p2 in attr):
+                src_tp_id = attr[p2]
+
+        return src_tp_id
+
+    def get_dst_tp_id(self):
+        dst_tp_id = None
+        p1 = 'destination'
+        p2 = 'dest_tp'
+        if(hasattr(self, p1)):
+            attr = getattr(self, p1)
+            if(isinstance(attr, dict) and p2 in attr):
+                dst_tp_id = attr[p2]
+
+        return dst_tp_id
+
     def get_id(self):
         p = 'link_id'
         if(hasattr(self, p)):
@@ -45,6 +45,7 @@ import json
 from pybvc.controller.netconfnode import NetconfNode
 from pybvc.common.result import Result
 from pybvc.common.status import OperStatus, STATUS
+from pybvc.common.utils import public_vars
 from pybvc.netconfdev.vrouter.vpn import Vpn
 from pybvc.netconfdev.vrouter.interfaces import OpenVpnInterface
 from pybvc.netconfdev.vrouter.protocols import StaticRoute
@@ -80,7 +81,7 @@ class VRouter5600(NetconfNode):
 
     def to_json(self):
         """ Returns JSON representation of this object. """
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True,
+        return json.dumps(self, default=public_vars, sort_keys=True,
                           indent=4)
 
     def get_schemas(self):
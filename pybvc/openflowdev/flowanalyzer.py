@@ -0,0 +1,400 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+flowanalyzer.py: Detection of shadowed, redundant and conflicting
+                 OpenFlow flow table entries
+
+
+"""
+
+import socket
+
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+from pybvc.common.utils import CompactObject, canonical_form, obj_vars
+from pybvc.openflowdev.flowindex import _norm_port, _parse_prefix
+
+# Priority of the flows that have no priority set (OpenFlow default)
+DEFAULT_PRIORITY = 0x8000
+
+# Match attributes compared as address prefixes
+_prefix_attrs = {'ipv4_source': socket.AF_INET,
+                 'ipv4_destination': socket.AF_INET,
+                 'ipv6_source': socket.AF_INET6,
+                 'ipv6_destination': socket.AF_INET6,
+                 'arp_source_transport_address': socket.AF_INET,
+                 'arp_target_transport_address': socket.AF_INET}
+
+# Match attributes holding port identifiers
+_port_attrs = ('in_port', 'in_phy_port')
+
+_address_bits = {socket.AF_INET: 32, socket.AF_INET6: 128}
+
+
+def _leaves(path, v, out):
+    """ Appends (path, value) pairs of the nested match fields to 'out' """
+    if isinstance(v, dict):
+        items = v.iteritems()
+    elif isinstance(v, CompactObject) or hasattr(v, '__dict__'):
+        items = obj_vars(v).iteritems()
+    else:
+        if isinstance(v, (list, tuple)):
+            v = canonical_form(v)
+        elif isinstance(v, basestring):
+            v = int(v) if v.isdigit() else v.lower()
+        if v is not None:
+            out.append(((path, None), v))
+        return
+    for k, x in items:
+        if x is not None:
+            _leaves(path + '.' + k, x, out)
+
+
+class _Rule(object):
+    """ Flow entry prepared for the analysis: its match is reduced to the
+        'pattern' (constrained fields and prefix lengths of the address
+        fields) and the 'values' of these fields. Every field nested in
+        the match (e.g. 'ethernet_match.ethernet_type.type') is a separate
+        field compared for equality, except the addresses compared as
+        prefixes and ports.
+    """
+
+    __slots__ = ('flow', 'order', 'priority', 'actions', 'pattern',
+                 'values')
+
+    def __init__(self, flow, actions):
+        self.flow = flow
+        priority = flow.get_flow_priority()
+        self.priority = (DEFAULT_PRIORITY if priority is None
+                         else int(priority))
+        self.actions = actions
+        fields = []
+        match = flow.get_match_fields()
+        if match is not None:
+            for name, v in obj_vars(match).iteritems():
+                if v is None:
+                    continue
+                family = _prefix_attrs.get(name)
+                res = None
+                if family is not None:
+                    res = _parse_prefix(v, family)
+                if res is not None:
+                    net, plen = res
+                    fields.append(((name, (plen, _address_bits[family])),
+                                   net))
+                elif family is not None:
+                    # not an address, can only be compared for equality
+                    fields.append(((name, None), str(v)))
+                elif name in _port_attrs:
+                    fields.append(((name, None), _norm_port(v)))
+                else:
+                    _leaves(name, v, fields)
+        fields.sort()
+        self.pattern = tuple(f for f, _ in fields)
+        self.values = tuple(v for _, v in fields)
+
+
+def _projector(projection):
+    """ Returns function building a hash key out of the rule values:
+        projection is a list of (value index, number of the address bits
+        to clear or None) pairs.
+    """
+    if not projection:
+        return lambda values: ()
+    index = [p[0] for p in projection]
+    if len(projection) == 1:
+        i, shift = projection[0]
+        if shift:
+            return lambda values: (values[i] >> shift << shift,)
+        return lambda values: (values[i],)
+    if any(p[1] for p in projection):
+        def project(values):
+            return tuple(values[i] >> shift << shift if shift else values[i]
+                         for i, shift in projection)
+        return project
+    return itemgetter(*index)
+
+
+class _Pattern(object):
+    """ Rules having the same pattern, hashed by the field values
+        (tuple space search). Rules of every hash bucket are sorted by
+        the decreasing priority.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.rules = []
+        self.buckets = None
+        # overlap projection -> {key -> bucket}
+        self.overlaps = {}
+
+    def add_rule(self, rule):
+        self.rules.append(rule)
+
+    def build(self):
+        self.buckets = self._hash((r.values, r) for r in self.rules)
+
+    @staticmethod
+    def _hash(items):
+        # rules are added in the order of decreasing priority
+        res = {}
+        for key, rule in items:
+            bucket = res.get(key)
+            if bucket is None:
+                res[key] = ([-rule.priority], [rule])
+            else:
+                bucket[0].append(-rule.priority)
+                bucket[1].append(rule)
+        return res
+
+    def lookups(self, pattern):
+        """ Returns functions that return buckets of the rules of this
+            pattern covering (matching every packet matched by) and
+            overlapping with (matching some of the packets matched by)
+            a rule of the given pattern. The first one is None if no rule
+            of this pattern can cover such rule.
+        """
+        position = dict((name, (i, spec))
+                        for i, (name, spec) in enumerate(pattern))
+        cover = []
+        mine = []
+        theirs = []
+        for j, (name, spec) in enumerate(self.fields):
+            i, other = position.get(name, (None, None))
+            if i is None:
+                # wildcarded by the rule, so it is not covered
+                cover = None
+                continue
+            shift = None
+            if spec is not None and other is not None:
+                # prefixes overlap if equal up to the shortest length
+                plen, bits = spec
+                shift = bits - min(plen, other[0])
+                if other[0] < plen:
+                    cover = None
+            elif spec is not other:
+                # address and non-address values are never equal
+                cover = None
+            if cover is not None:
+                cover.append((i, shift))
+            mine.append((j, shift))
+            theirs.append((i, shift))
+
+        covering = None
+        if cover is not None:
+            buckets = self.buckets
+            project = _projector(cover)
+
+            def covering(values):
+                return buckets.get(project(values))
+
+        mine = tuple(mine)
+        project = _projector(theirs)
+
+        def overlapping(values):
+            buckets = self.overlaps.get(mine)
+            if buckets is None:
+                key = _projector(mine)
+                buckets = self.overlaps[mine] = self._hash(
+                    (key(r.values), r) for r in self.rules)
+            return buckets.get(project(values))
+
+        return covering, overlapping
+
+
+def _in_range(bucket, high, low):
+    """ Returns rules of the bucket with priority in [low, high] range """
+    prios, rules = bucket
+    return rules[bisect_left(prios, -high):bisect_right(prios, -low)]
+
+
+class FlowsAnalysis(object):
+    """ Results of the flows analysis, lists of (flow, other flow) pairs:
+        - shadowed:    flow never matches any packets as they are all
+                       matched by the higher priority other flow having
+                       different instructions
+        - redundant:   flow can be removed without changing the switch
+                       behavior as the other flow (of higher, equal or
+                       lower priority) covers it with the same instructions
+        - conflicting: flows of equal priority match some common packets
+                       but have different instructions (which one is
+                       applied is undefined by OpenFlow)
+    """
+
+    def __init__(self):
+        self.shadowed = []
+        self.redundant = []
+        self.conflicting = []
+
+    def get_shadowed(self):
+        return self.shadowed
+
+    def get_redundant(self):
+        return self.redundant
+
+    def get_conflicting(self):
+        return self.conflicting
+
+    def is_empty(self):
+        """ Returns True if no anomalies have been found """
+        return not (self.shadowed or self.redundant or self.conflicting)
+
+
+def analyze_flows(flows):
+    """ Finds shadowed, redundant and conflicting 'FlowEntry' objects
+        (see 'FlowsAnalysis') among the flows of each flow table.
+
+        The flows are hashed by their match values in tables of the same
+        match pattern (constrained fields and prefix lengths), so finding
+        the flows that cover or overlap a flow costs one lookup per pattern
+        instead of comparing it with every other flow.
+    """
+    analysis = FlowsAnalysis()
+    tables = {}
+    for flow in flows:
+        tables.setdefault(flow.get_flow_table_id(), []).append(flow)
+    for table_id in sorted(tables):
+        _analyze_table(tables[table_id], analysis)
+    return analysis
+
+
+def _analyze_table(flows, analysis):
+    actions_ids = {}
+    rules = []
+    for flow in flows:
+        actions = canonical_form(obj_vars(flow).get('instructions'))
+        rules.append(_Rule(flow, actions_ids.setdefault(actions,
+                                                        len(actions_ids))))
+    rules.sort(key=lambda r: (-r.priority, str(r.flow.get_flow_id())))
+    patterns = {}
+    # priorities of rules with different actions (that may conflict)
+    actions = {}
+    for i, rule in enumerate(rules):
+        rule.order = i
+        p = patterns.get(rule.pattern)
+        if p is None:
+            p = patterns[rule.pattern] = _Pattern(rule.pattern)
+        p.add_rule(rule)
+        actions.setdefault(rule.priority, set()).add(rule.actions)
+    for p in patterns.itervalues():
+        p.build()
+
+    shadowed = []
+    redundant = []
+    conflicting = []
+    for pattern in patterns.itervalues():
+        lookups = [p.lookups(pattern.fields) for p in patterns.itervalues()]
+        coverings = [c for c, _ in lookups if c is not None]
+        overlappings = [o for _, o in lookups]
+        for rule in pattern.rules:
+            values = rule.values
+            covering = [b for b in (c(values) for c in coverings) if b]
+            # the highest priority rule covering this one
+            top = None
+            for prios, bucket in covering:
+                r = bucket[0]
+                if r is rule:
+                    if len(bucket) == 1:
+                        continue
+                    r = bucket[1]
+                if top is None or r.order < top.order:
+                    top = r
+            overlapping = None
+            if top is not None and top.priority > rule.priority:
+                if top.actions == rule.actions:
+                    redundant.append((rule.order, rule.flow, top.flow))
+                else:
+                    shadowed.append((rule.order, rule.flow, top.flow))
+            else:
+                other = _find_covering(rule, covering)
+                if other is not None and other.priority != rule.priority:
+                    overlapping = [b for b in (o(values)
+                                               for o in overlappings) if b]
+                    if _is_blocked(rule, other, overlapping):
+                        other = None
+                if other is not None:
+                    redundant.append((rule.order, rule.flow, other.flow))
+
+            if len(actions[rule.priority]) > 1:
+                if overlapping is None:
+                    overlapping = [b for b in (o(values)
+                                               for o in overlappings) if b]
+                for bucket in overlapping:
+                    for r in _in_range(bucket, rule.priority, rule.priority):
+                        if r.order > rule.order and \
+                                r.actions != rule.actions:
+                            conflicting.append((rule.order, rule.flow, r.flow))
+
+    # report in the order of the decreasing flows priority
+    for found, res in ((shadowed, analysis.shadowed),
+                       (redundant, analysis.redundant),
+                       (conflicting, analysis.conflicting)):
+        found.sort(key=itemgetter(0))
+        res.extend((flow, other) for _, flow, other in found)
+
+
+def _find_covering(rule, covering):
+    """ Returns the highest priority rule with the same actions that
+        covers the given rule and has equal or lower priority (or None).
+    """
+    other = None
+    for prios, bucket in covering:
+        for r in bucket[bisect_left(prios, -rule.priority):]:
+            if r is rule or r.actions != rule.actions:
+                continue
+            if r.priority == rule.priority and r.order > rule.order and \
+                    r.pattern == rule.pattern:
+                # identical flows, only the later one is redundant
+                continue
+            if other is None or r.order < other.order:
+                other = r
+            break
+    return other
+
+
+def _is_blocked(rule, other, overlapping):
+    """ Checks whether there are rules with priority between the given
+        ones that overlap the first one and have different actions
+        (so removing the first rule would change the switch behavior).
+    """
+    for bucket in overlapping:
+        for r in _in_range(bucket, rule.priority, other.priority):
+            if r.actions != rule.actions:
+                return True
+    return False
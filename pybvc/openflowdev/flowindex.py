@@ -0,0 +1,314 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+flowindex.py: In-memory index of OpenFlow flow table entries
+
+
+"""
+
+import socket
+import struct
+
+
+def _norm_int(v):
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return v
+
+
+def _norm_port(v):
+    # 'openflow:1:3' and '3' both refer to the port number 3
+    return str(v).rsplit(':', 1)[-1]
+
+
+def _norm_mac(v):
+    return str(v).lower()
+
+
+def _parse_prefix(v, family):
+    """ Parses IPv4/IPv6 address with optional prefix length (or IPv4
+        network mask) into (network, prefix length) integers pair.
+        Returns None if the value is not a valid address.
+    """
+    try:
+        addr, sep, plen = str(v).partition('/')
+        if family == socket.AF_INET:
+            bits = 32
+            n = struct.unpack('!I', socket.inet_aton(addr))[0]
+            if '.' in plen:
+                mask = struct.unpack('!I', socket.inet_aton(plen))[0]
+                plen = bin(mask).count('1')
+        else:
+            bits = 128
+            hi, lo = struct.unpack('!QQ', socket.inet_pton(family, addr))
+            n = (hi << 64) | lo
+        plen = int(plen) if sep else bits
+        if plen < 0 or plen > bits:
+            return None
+        return (n >> (bits - plen) << (bits - plen), plen)
+    except (socket.error, ValueError, struct.error):
+        return None
+
+
+def _norm_ipv4(v):
+    res = _parse_prefix(v, socket.AF_INET)
+    return res if res is not None else v
+
+
+def _norm_ipv6(v):
+    res = _parse_prefix(v, socket.AF_INET6)
+    return res if res is not None else v
+
+
+# Indexed fields: (field name, FlowEntry/Match getter, normalizer)
+_flow_fields = (('table_id', 'get_flow_table_id', _norm_int),
+                ('cookie', 'get_flow_cookie', _norm_int),
+                ('priority', 'get_flow_priority', _norm_int))
+
+_match_fields = (('in_port', 'get_in_port', _norm_port),
+                 ('eth_type', 'get_eth_type', _norm_int),
+                 ('eth_src', 'get_eth_src', _norm_mac),
+                 ('eth_dst', 'get_eth_dst', _norm_mac),
+                 ('vlan_id', 'get_vlan_id', _norm_int),
+                 ('ip_proto', 'get_ip_proto', _norm_int),
+                 ('ipv4_src', 'get_ipv4_src', _norm_ipv4),
+                 ('ipv4_dst', 'get_ipv4_dst', _norm_ipv4),
+                 ('ipv6_src', 'get_ipv6_src', _norm_ipv6),
+                 ('ipv6_dst', 'get_ipv6_dst', _norm_ipv6),
+                 ('tcp_src', 'get_tcp_src', _norm_int),
+                 ('tcp_dst', 'get_tcp_dst', _norm_int),
+                 ('udp_src', 'get_udp_src', _norm_int),
+                 ('udp_dst', 'get_udp_dst', _norm_int))
+
+_normalizers = dict((f, n) for f, _, n in _flow_fields + _match_fields)
+
+# Fields additionally indexed by prefix (for longest prefix match)
+_prefix_fields = {'ipv4_dst': socket.AF_INET, 'ipv6_dst': socket.AF_INET6}
+
+
+class FlowTableIndex(object):
+    """ In-memory index of 'FlowEntry' objects of one or more flow tables.
+        Flows are identified by (table_id, flow id) pair and indexed by
+        cookie, priority and the main match fields (see 'find_flows').
+        IPv4/IPv6 destination prefixes are additionally indexed for the
+        longest prefix lookups (see 'lookup_ipv4_dst', 'lookup_ipv6_dst').
+        The index is updated incrementally by 'add_flow'/'remove_flow'.
+    """
+
+    def __init__(self, flows=None):
+        self._flows = {}
+        # field name -> {normalized value -> set of flow keys}
+        self._fields = {}
+        # field name -> {prefix length -> {network -> set of flow keys}}
+        self._prefixes = {}
+        # flow key -> list of the index entries of that flow
+        self._entries = {}
+        if flows is not None:
+            self.add_flows(flows)
+
+    def __len__(self):
+        return len(self._flows)
+
+    def __iter__(self):
+        return self._flows.itervalues()
+
+    def __contains__(self, key):
+        return self._key(*key) in self._flows
+
+    def _key(self, table_id, flow_id):
+        return (_norm_int(table_id), str(flow_id))
+
+    def add_flow(self, flow):
+        """ Adds 'FlowEntry' to the index, replaces the indexed flow
+            having the same table and flow identifiers (if any).
+        """
+        if flow.get_flow_id() is None or flow.get_flow_table_id() is None:
+            raise ValueError("[FlowTableIndex] flow entry without "
+                             "'table_id' or 'id' can not be indexed")
+        key = self._key(flow.get_flow_table_id(), flow.get_flow_id())
+        if key in self._flows:
+            self._unindex(key)
+        self._flows[key] = flow
+        entries = []
+        for name, getter, norm in _flow_fields:
+            v = getattr(flow, getter)()
+            if v is not None:
+                entries.append((name, norm(v)))
+        match = flow.get_match_fields()
+        if match is not None:
+            for name, getter, norm in _match_fields:
+                v = getattr(match, getter)()
+                if v is not None:
+                    entries.append((name, norm(v)))
+        for name, v in entries:
+            self._fields.setdefault(name, {}).setdefault(v, set()).add(key)
+            if name in _prefix_fields and isinstance(v, tuple):
+                net, plen = v
+                p = self._prefixes.setdefault(name, {}).setdefault(plen, {})
+                p.setdefault(net, set()).add(key)
+        self._entries[key] = entries
+
+    def add_flows(self, flows):
+        for flow in flows:
+            self.add_flow(flow)
+
+    def remove_flow(self, table_id, flow_id):
+        """ Removes flow from the index, returns removed 'FlowEntry'
+            or None if there was no such flow.
+        """
+        key = self._key(table_id, flow_id)
+        flow = self._flows.pop(key, None)
+        if flow is not None:
+            self._unindex(key)
+        return flow
+
+    def _unindex(self, key):
+        for name, v in self._entries.pop(key, ()):
+            _discard(self._fields[name], v, key)
+            if name in _prefix_fields and isinstance(v, tuple):
+                net, plen = v
+                nets = self._prefixes[name][plen]
+                _discard(nets, net, key)
+                if not nets:
+                    del self._prefixes[name][plen]
+
+    def clear(self):
+        self._flows.clear()
+        self._fields.clear()
+        self._prefixes.clear()
+        self._entries.clear()
+
+    def get_flow(self, table_id, flow_id):
+        """ Returns 'FlowEntry' identified by the table and flow
+            identifiers, None if there is no such flow in the index.
+        """
+        return self._flows.get(self._key(table_id, flow_id))
+
+    def get_flows(self, table_id=None):
+        """ Returns list of the indexed flows (of the given table) """
+        if table_id is None:
+            return self._sorted(self._flows.keys())
+        return self.find_flows(table_id=table_id)
+
+    def find_flows(self, table_id=None, **fields):
+        """ Returns list of the flows having all the given fields equal
+            to the given values, higher priority flows first.
+            Supported fields: cookie, priority, in_port, eth_type, eth_src,
+            eth_dst, vlan_id, ip_proto, ipv4_src, ipv4_dst, ipv6_src,
+            ipv6_dst, tcp_src, tcp_dst, udp_src, udp_dst.
+            Flows not matching on some of the given fields are not
+            returned (e.g. find_flows(in_port=1) skips the flows matching
+            packets from any port).
+        """
+        if table_id is not None:
+            fields['table_id'] = table_id
+        keys = self._find_keys(fields)
+        return self._sorted(keys) if keys is not None else self.get_flows()
+
+    def get_flows_by_cookie(self, cookie, table_id=None):
+        return self.find_flows(table_id=table_id, cookie=cookie)
+
+    def get_flows_by_priority(self, priority, table_id=None):
+        return self.find_flows(table_id=table_id, priority=priority)
+
+    def lookup_ipv4_dst(self, address, table_id=None, **fields):
+        """ Returns list of the flows whose IPv4 destination prefix contains
+            the given address (and having all the other given fields
+            equal to the given values), the longest prefix first and
+            higher priority first for the same prefix length.
+        """
+        return self._lookup_prefix('ipv4_dst', address, table_id, fields)
+
+    def lookup_ipv6_dst(self, address, table_id=None, **fields):
+        """ IPv6 counterpart of 'lookup_ipv4_dst' """
+        return self._lookup_prefix('ipv6_dst', address, table_id, fields)
+
+    def _lookup_prefix(self, name, address, table_id, fields):
+        q = _parse_prefix(address, _prefix_fields[name])
+        if q is None:
+            raise ValueError("[FlowTableIndex] invalid address '%s'"
+                             % address)
+        if table_id is not None:
+            fields['table_id'] = table_id
+        keys = self._find_keys(fields)
+        bits = 32 if _prefix_fields[name] == socket.AF_INET else 128
+        addr, qlen = q
+        res = []
+        prefixes = self._prefixes.get(name, {})
+        for plen in sorted(prefixes, reverse=True):
+            if plen > qlen:
+                continue
+            found = prefixes[plen].get(addr >> (bits - plen) << (bits - plen))
+            if found:
+                if keys is not None:
+                    found = found & keys
+                res.extend(self._sorted(found))
+        return res
+
+    def _find_keys(self, fields):
+        """ Returns set of keys of the flows matching all the fields,
+            None if no fields were given.
+        """
+        keys = None
+        for name, v in fields.iteritems():
+            if name not in _normalizers:
+                raise ValueError("[FlowTableIndex] unsupported field '%s'"
+                                 % name)
+            found = self._fields.get(name, {}).get(_normalizers[name](v))
+            if not found:
+                return set()
+            keys = set(found) if keys is None else keys & found
+            if not keys:
+                break
+        return keys
+
+    def _sorted(self, keys):
+        flows = self._flows
+        return [flows[k] for k in sorted(keys, key=self._sort_key)]
+
+    def _sort_key(self, key):
+        p = _norm_int(self._flows[key].get_flow_priority())
+        return (-p if isinstance(p, int) else 0, key)
+
+
+def _discard(d, v, key):
+    keys = d.get(v)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del d[v]
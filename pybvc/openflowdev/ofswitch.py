@@ -41,21 +41,86 @@ ofswitch.py: OpenFlow switch properties and methods
 """
 
 import json
+import time
 import urllib2
 
 from collections import OrderedDict
+from contextlib import contextmanager
 
 from pybvc.controller.openflownode import OpenflowNode
-from pybvc.common.result import Result
+from pybvc.openflowdev.flowindex import FlowTableIndex
+from pybvc.openflowdev.reconcile import diff_flows
+from pybvc.common.result import Result, BatchResult, LayeredBatchResult
 from pybvc.common.status import OperStatus, STATUS
 from pybvc.common.utils import (find_key_values_in_dict,
+                                CompactObject,
+                                CanonicalObject,
+                                obj_vars,
+                                obj_to_yang_dict,
                                 replace_str_value_in_dict,
                                 find_key_value_in_dict,
                                 find_dict_in_list,
                                 strip_none,
                                 dict_keys_dashed_to_underscored,
+                                dict_is_subset,
+                                public_vars,
+                                concurrent_map,
+                                dependency_layers,
                                 dbg_print)
 
+# Group identifier meaning 'any group' or 'no group' (OFPG_ANY)
+OFPG_ANY = 0xffffffff
+
+# Counters of the OpenFlow statistics reported by 'get_statistics_counters'
+# (counter name -> path of the counter in the Controller's statistics data)
+PORT_COUNTERS = (('rx_packets', ('packets', 'received')),
+                 ('tx_packets', ('packets', 'transmitted')),
+                 ('rx_bytes', ('bytes', 'received')),
+                 ('tx_bytes', ('bytes', 'transmitted')),
+                 ('rx_dropped', ('receive-drops',)),
+                 ('tx_dropped', ('transmit-drops',)),
+                 ('rx_errors', ('receive-errors',)),
+                 ('tx_errors', ('transmit-errors',)))
+QUEUE_COUNTERS = (('tx_packets', ('transmitted-packets',)),
+                  ('tx_bytes', ('transmitted-bytes',)),
+                  ('tx_errors', ('transmission-errors',)))
+FLOW_COUNTERS = (('packets', ('packet-count',)),
+                 ('bytes', ('byte-count',)))
+GROUP_COUNTERS = (('packets', ('packet-count',)),
+                  ('bytes', ('byte-count',)))
+
+
+def _stats_counters(stats, counters):
+    """ Returns (duration, {counter name: value}) for the statistics
+        data, duration (in seconds) is None if it is not reported.
+    """
+    values = {}
+    for name, path in counters:
+        v = stats
+        for p in path:
+            v = v.get(p) if isinstance(v, dict) else None
+        if isinstance(v, (int, long)):
+            values[name] = v
+    duration = None
+    d = stats.get('duration')
+    if isinstance(d, dict) and 'second' in d:
+        duration = d['second'] + d.get('nanosecond', 0) / 1000000000.0
+    return duration, values
+
+
+def _batch_item(func):
+    """ Returns function that calls 'func' for an item of a batch and
+        reports an exception raised by it as the item's failed result
+        (so the other items of the batch are not affected).
+    """
+    def call(item):
+        try:
+            return func(item)
+        except(Exception) as e:
+            dbg_print("Error: " + repr(e))
+            return Result(OperStatus(STATUS.UNKNOWN), e)
+    return call
+
 
 class OFSwitch(OpenflowNode):
     """ Class that represents an instance of 'OpenFlow Switch'
@@ -66,6 +131,7 @@ class OFSwitch(OpenflowNode):
         super(OFSwitch, self).__init__(ctrl, name)
         self.dpid = dpid
         self.ports = []
+        self._snapshot = None
 
     def to_string(self):
         """ Returns string representation of this object. """
@@ -73,22 +139,69 @@ class OFSwitch(OpenflowNode):
 
     def to_json(self):
         """ Returns JSON representation of this object. """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=public_vars,
                           sort_keys=True, indent=4)
 
+    @contextmanager
+    def snapshot(self, operational=True):
+        """ Context in which the switch information getters
+            ('get_switch_info', 'get_features_info', 'get_ports_list',
+            'get_ports_brief_info', 'get_group_ids', 'get_groups' and
+            their derivatives) are answered from a single copy of this
+            node's document retrieved from the Controller (one HTTP
+            request and one decoding instead of one per getter call).
+
+            Example::
+
+                with switch.snapshot():
+                    info = switch.get_switch_info()
+                    ports = switch.get_ports_brief_info()
+        """
+        ctrl = self.ctrl
+        if (operational):
+            url = ctrl.get_node_operational_url(self.name)
+        else:
+            url = ctrl.get_node_config_url(self.name)
+        resp = ctrl.http_get_request(url, data=None, headers=None)
+        self._snapshot = {'url': url, 'resp': resp, 'data': None}
+        try:
+            yield self
+        finally:
+            self._snapshot = None
+
+    def _get_node_doc(self, url):
+        """ Returns the Controller's response for this node's document
+            (taken from the snapshot if there is one for the URL)
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot['url'] == url:
+            return snapshot['resp']
+        return self.ctrl.http_get_request(url, data=None, headers=None)
+
+    def _decode_node_doc(self, resp):
+        """ Returns decoded content of this node's document
+            (decoded only once for the snapshot)
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot['resp'] is resp:
+            if snapshot['data'] is None:
+                snapshot['data'] = json.loads(resp.content)
+            return snapshot['data']
+        return json.loads(resp.content)
+
     def get_switch_info(self):
         status = OperStatus()
         info = {}
         ctrl = self.ctrl
         myname = self.name
         url = ctrl.get_node_operational_url(myname)
-        resp = ctrl.http_get_request(url, data=None, headers=None)
+        resp = self._get_node_doc(url)
         if(resp is None):
             status.set_status(STATUS.CONN_ERROR)
         elif(resp.content is None):
             status.set_status(STATUS.CTRL_INTERNAL_ERROR)
         elif (resp.status_code == 200):
-            dictionary = json.loads(resp.content)
+            dictionary = self._decode_node_doc(resp)
             p1 = 'node'
             if (p1 in dictionary):
                 p2 = 'flow-node-inventory:manufacturer'
@@ -125,13 +238,13 @@ class OFSwitch(OpenflowNode):
         ctrl = self.ctrl
         myname = self.name
         url = ctrl.get_node_operational_url(myname)
-        resp = ctrl.http_get_request(url, data=None, headers=None)
+        resp = self._get_node_doc(url)
         if(resp is None):
             status.set_status(STATUS.CONN_ERROR)
         elif(resp.content is None):
             status.set_status(STATUS.CTRL_INTERNAL_ERROR)
         elif (resp.status_code == 200):
-            dictionary = json.loads(resp.content)
+            dictionary = self._decode_node_doc(resp)
             p2 = 'flow-node-inventory:switch-features'
             vlist = find_key_values_in_dict(dictionary, p2)
             if (len(vlist) != 0 and (type(vlist[0]) is dict)):
@@ -150,13 +263,13 @@ class OFSwitch(OpenflowNode):
         ctrl = self.ctrl
         myname = self.name
         url = ctrl.get_node_operational_url(myname)
-        resp = ctrl.http_get_request(url, data=None, headers=None)
+        resp = self._get_node_doc(url)
         if(resp is None):
             status.set_status(STATUS.CONN_ERROR)
         elif(resp.content is None):
             status.set_status(STATUS.CTRL_INTERNAL_ERROR)
         elif (resp.status_code == 200):
-            obj = json.loads(resp.content)
+            obj = self._decode_node_doc(resp)
             p1 = 'node'
             if(p1 in obj and isinstance(obj[p1], list)):
                 vlist = obj[p1]
@@ -246,13 +359,13 @@ class OFSwitch(OpenflowNode):
         ctrl = self.ctrl
         myname = self.name
         url = ctrl.get_node_operational_url(myname)
-        resp = ctrl.http_get_request(url, data=None, headers=None)
+        resp = self._get_node_doc(url)
         if(resp is None):
             status.set_status(STATUS.CONN_ERROR)
         elif(resp.content is None):
             status.set_status(STATUS.CTRL_INTERNAL_ERROR)
         elif (resp.status_code == 200):
-            dictionary = json.loads(resp.content)
+            dictionary = self._decode_node_doc(resp)
             p1 = 'node-connector'
             vlist = find_key_values_in_dict(dictionary, p1)
             if (len(vlist) != 0 and (type(vlist[0]) is list)):
@@ -289,7 +402,7 @@ class OFSwitch(OpenflowNode):
             urlext = templateUrlExt.format(flow_entry.get_flow_table_id(),
                                            flow_entry.get_flow_id())
             url += urlext
-            payload = flow_entry.get_payload()
+            payload = flow_entry.get_payload(indent=None)
             resp = ctrl.http_put_request(url, payload, headers)
             if(resp is None):
                 status.set_status(STATUS.CONN_ERROR)
@@ -331,6 +444,91 @@ class OFSwitch(OpenflowNode):
             status.set_status(STATUS.MALFORM_DATA)
         return Result(status, resp)
 
+    def add_modify_flows(self, flow_entries, max_workers=10):
+        """ Create new or modify existing flows in the configuration
+            data store of the Controller (batch of flows per call, one
+            HTTP request per flow). Other flows are left intact.
+
+        :param flow_entries: Iterable of :class:`FlowEntry` objects.
+        :param int max_workers: Maximum number of HTTP requests sent to the
+                                Controller simultaneously (Controller's
+                                'pool_maxsize' should not be less).
+        :return: Aggregate status of the batch and per-flow results.
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.common.result.BatchResult` data
+        """
+        flows = list(flow_entries)
+        t0 = time.time()
+        results = concurrent_map(_batch_item(self.add_modify_flow),
+                                 flows, max_workers)
+        batch = BatchResult(flows, results, time.time() - t0)
+        return Result(batch.get_status(), batch)
+
+    def replace_table_flows(self, flow_entries, max_workers=10):
+        """ Replace content of the flow tables in the configuration data
+            store of the Controller with the given flows. All flows of the
+            same table are sent in a single HTTP request, flows of the
+            table that are not in 'flow_entries' are REMOVED from it
+            (tables without flows in 'flow_entries' are not changed).
+
+        :param flow_entries: Iterable of :class:`FlowEntry` objects.
+        :param int max_workers: Maximum number of HTTP requests sent to the
+                                Controller simultaneously (Controller's
+                                'pool_maxsize' should not be less).
+        :return: Aggregate status of the batch and per-flow results (the
+                 result of a flow is the result of its table request).
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.common.result.BatchResult` data
+        """
+        flows = list(flow_entries)
+        t0 = time.time()
+        tables = OrderedDict()
+        for fe in flows:
+            if isinstance(fe, FlowEntry):
+                tid = fe.get_flow_table_id()
+                tables.setdefault(tid, []).append(fe)
+
+        table_results = dict(zip(tables.keys(),
+                                 concurrent_map(
+                                     _batch_item(self._put_flows_table),
+                                     tables.items(),
+                                     max_workers)))
+        results = []
+        for fe in flows:
+            if isinstance(fe, FlowEntry):
+                r = table_results[fe.get_flow_table_id()]
+            else:
+                r = Result(OperStatus(STATUS.MALFORM_DATA), None)
+            results.append(r)
+
+        batch = BatchResult(flows, results, time.time() - t0)
+        return Result(batch.get_status(), batch)
+
+    def _put_flows_table(self, table_flows):
+        """ Replace content of the flow table in the configuration data
+            store with the given flows (single HTTP request).
+        """
+        table_id, flows = table_flows
+        status = OperStatus()
+        model_ref = "flow-node-inventory:table"
+        templateUrlExt = "/table/{}"
+        headers = {'content-type': 'application/yang.data+json'}
+        ctrl = self.ctrl
+        url = ctrl.get_node_config_url(self.name)
+        url += templateUrlExt.format(table_id)
+        flist = [fe.to_yang_dict() for fe in flows]
+        payload = {model_ref: [{'id': table_id, 'flow': flist}]}
+        resp = ctrl.http_put_request(url, json.dumps(payload), headers)
+        if(resp is None):
+            status.set_status(STATUS.CONN_ERROR)
+        elif(resp.content is None):
+            status.set_status(STATUS.CTRL_INTERNAL_ERROR)
+        elif (resp.status_code == 200):
+            status.set_status(STATUS.OK)
+        else:
+            status.set_status(STATUS.HTTP_ERROR, resp)
+        return Result(status, resp)
+
     def delete_flow(self, table_id, flow_id):
         status = OperStatus()
         templateUrlExt = "/table/{}/flow/{}"
@@ -369,6 +567,63 @@ class OFSwitch(OpenflowNode):
             status.set_status(STATUS.HTTP_ERROR, resp)
         return Result(status, None)
 
+    def delete_flows_where(self, table_id, cookie=None, cookie_mask=None,
+                           priority_min=None, priority_max=None, match=None,
+                           max_workers=10):
+        """ Remove flows selected by the given criteria from the flow table
+            in the configuration data store of the Controller.
+            Flows are selected from a single snapshot of the configured
+            table and removed concurrently.
+
+        :param int table_id: Identifier of the flow table.
+        :param int cookie: Select flows whose cookie (masked with
+                           'cookie_mask') equals this value.
+        :param int cookie_mask: Bits of the cookie that must match
+                                (all bits if None).
+        :param int priority_min: Select flows with priority not less than.
+        :param int priority_max: Select flows with priority not greater than.
+        :param match: Select flows whose match fields include all fields
+                      set in this :class:`Match` object.
+        :param int max_workers: Maximum number of HTTP requests sent to the
+                                Controller simultaneously.
+        :return: Aggregate status and per-flow results of removal of the
+                 selected flows (:class:`FlowEntry` objects).
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.common.result.BatchResult` data
+        """
+        result = self.get_configured_FlowEntries(table_id)
+        status = result.get_status()
+        if(not status.eq(STATUS.OK)):
+            return Result(status, BatchResult())
+
+        match_dict = match.to_dict() if match is not None else None
+        selected = []
+        for fe in result.get_data():
+            if (cookie is not None):
+                v = fe.get_flow_cookie()
+                mask = (cookie_mask if cookie_mask is not None
+                        else 0xffffffffffffffff)
+                if (v is None or (int(v) & mask) != (int(cookie) & mask)):
+                    continue
+            if (priority_min is not None or priority_max is not None):
+                v = fe.get_flow_priority()
+                if (v is None or
+                   (priority_min is not None and v < priority_min) or
+                   (priority_max is not None and v > priority_max)):
+                    continue
+            if (match_dict is not None):
+                m = fe.get_match_fields()
+                if (m is None or not dict_is_subset(match_dict, m.to_dict())):
+                    continue
+            selected.append(fe)
+
+        t0 = time.time()
+        results = concurrent_map(
+            lambda fe: self.delete_flow(table_id, fe.get_flow_id()),
+            selected, max_workers)
+        batch = BatchResult(selected, results, time.time() - t0)
+        return Result(batch.get_status(), batch)
+
     def get_flow(self, tableid, flowid, operational=True):
         status = OperStatus()
         flow = None
@@ -440,6 +695,48 @@ class OFSwitch(OpenflowNode):
             status.set_status(STATUS.HTTP_ERROR, resp)
         return Result(status, flows)
 
+    def iter_flows(self, tableid, operational=True):
+        """ Returns iterator over the flows (dictionaries) of the flow
+            table, flows are decoded one by one as they arrive off the
+            socket (memory usage does not depend on the table size).
+        """
+        status = OperStatus()
+        flows = None
+        templateUrlExt = "/flow-node-inventory:table/{}"
+        urlext = templateUrlExt.format(tableid)
+        ctrl = self.ctrl
+        url = ""
+        if (operational):
+            url = ctrl.get_node_operational_url(self.name)
+        else:
+            url = ctrl.get_node_config_url(self.name)
+        url += urlext
+        resp = ctrl.http_get_request(url, data=None, headers=None,
+                                     stream=True)
+        if(resp is None):
+            status.set_status(STATUS.CONN_ERROR)
+        elif (resp.status_code == 200):
+            p1 = 'flow-node-inventory:table'
+            p2 = 'flow'
+            flows = ctrl.iter_json_items(resp, (p1, p2))
+            status.set_status(STATUS.OK)
+        elif (resp.status_code == 404):
+            status.set_status(STATUS.DATA_NOT_FOUND)
+        else:
+            status.set_status(STATUS.HTTP_ERROR, resp)
+        return Result(status, flows)
+
+    def iter_FlowEntries(self, tableid, operational=True):
+        """ Returns iterator over the flows of the flow table as
+            'FlowEntry' objects (see 'iter_flows')
+        """
+        result = self.iter_flows(tableid, operational)
+        status = result.get_status()
+        flows = None
+        if(status.eq(STATUS.OK)):
+            flows = (FlowEntry(flow_dict=d) for d in result.get_data())
+        return Result(status, flows)
+
     def get_operational_flows(self, tableid):
         return self.get_flows(tableid, operational=True)
 
@@ -473,6 +770,96 @@ class OFSwitch(OpenflowNode):
                 flows.append(fe)
         return Result(status, flows)
 
+    def get_flow_table_index(self, tableids=(0,), operational=True):
+        """ Returns 'FlowTableIndex' of the flows of the given flow tables
+            (missing tables are treated as empty ones)
+        """
+        index = FlowTableIndex()
+        for tableid in tableids:
+            result = self.iter_FlowEntries(tableid, operational)
+            status = result.get_status()
+            if(status.eq(STATUS.OK)):
+                index.add_flows(result.get_data())
+            elif(not status.eq(STATUS.DATA_NOT_FOUND)):
+                return Result(status, None)
+        return Result(OperStatus(STATUS.OK), index)
+
+    def diff_flows(self, flow_entries, tableids=None, prune=True):
+        """ Compares desired flows with the flows configured on the
+            Controller (one HTTP request per flow table) and returns the
+            changes needed to reconcile them (nothing is modified).
+
+        :param flow_entries: Iterable of desired :class:`FlowEntry` objects.
+        :param tableids: Flow tables to compare (default is the tables of
+                         'flow_entries'), list it to prune a table that has
+                         no desired flows.
+        :param bool prune: If True then configured flows that are not
+                           desired are to be deleted.
+        :return: Status of the comparison and the changes.
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.openflowdev.reconcile.FlowsDiff` data
+        """
+        desired = list(flow_entries)
+        tables = set(int(fe.get_flow_table_id()) for fe in desired
+                     if fe.get_flow_table_id() is not None)
+        if tableids is not None:
+            tables.update(int(t) for t in tableids)
+        configured = []
+        for tableid in sorted(tables):
+            result = self.iter_FlowEntries(tableid, operational=False)
+            status = result.get_status()
+            if(status.eq(STATUS.OK)):
+                configured.extend(fe for fe in result.get_data()
+                                  if fe.get_flow_id() is not None)
+            elif(not status.eq(STATUS.DATA_NOT_FOUND)):
+                return Result(status, None)
+        try:
+            diff = diff_flows(desired, configured, prune)
+        except ValueError:
+            return Result(OperStatus(STATUS.MALFORM_DATA), None)
+        return Result(OperStatus(STATUS.OK), diff)
+
+    def reconcile_flows(self, flow_entries, tableids=None, prune=True,
+                        max_workers=10):
+        """ Brings flows configured on the Controller in line with the
+            desired flows. Flow tables are read once (see 'diff_flows') and
+            only the flows that are missing or differ from the desired ones
+            are sent, so a cycle with nothing to change costs one HTTP
+            request per flow table.
+
+        :param flow_entries: Iterable of desired :class:`FlowEntry` objects.
+        :param tableids: See 'diff_flows'.
+        :param bool prune: If True then configured flows that are not
+                           desired are deleted.
+        :param int max_workers: Maximum number of HTTP requests sent to the
+                                Controller simultaneously.
+        :return: Aggregate status of the applied changes and the changes
+                 (their per-flow results are in 'get_results()').
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.openflowdev.reconcile.FlowsDiff` data
+        """
+        result = self.diff_flows(flow_entries, tableids, prune)
+        if(not result.get_status().eq(STATUS.OK)):
+            return result
+        diff = result.get_data()
+        items = ([('add', fe) for fe in diff.get_added()] +
+                 [('modify', fe) for fe in diff.get_modified()] +
+                 [('delete', key) for key in diff.get_deleted()])
+        t0 = time.time()
+        results = concurrent_map(self._apply_flow_change, items, max_workers)
+        diff.results = BatchResult(items, results, time.time() - t0)
+        return Result(diff.results.get_status(), diff)
+
+    def _apply_flow_change(self, item):
+        op, data = item
+        if op == 'delete':
+            result = self.delete_flow(*data)
+            if(result.get_status().eq(STATUS.DATA_NOT_FOUND)):
+                # already removed, the desired state is reached anyway
+                result = Result(OperStatus(STATUS.OK), None)
+            return result
+        return self.add_modify_flow(data)
+
     def get_operational_FlowEntries(self, flow_table_id):
         return self.get_FlowEntries(flow_table_id, True)
 
@@ -491,14 +878,14 @@ class OFSwitch(OpenflowNode):
             url = ctrl.get_node_operational_url(self.name)
         else:
             url = ctrl.get_node_config_url(self.name)
-        resp = ctrl.http_get_request(url, data=None, headers=None)
+        resp = self._get_node_doc(url)
         if(resp is None):
             status.set_status(STATUS.CONN_ERROR)
         elif(resp.content is None):
             status.set_status(STATUS.CTRL_INTERNAL_ERROR)
         elif (resp.status_code == 200):
             p1 = 'node'
-            d = json.loads(resp.content)
+            d = self._decode_node_doc(resp)
             l1 = d.get(p1, None)
             if (isinstance(l1, list) and l1):
                 p2 = 'flow-node-inventory:group'
@@ -542,7 +929,7 @@ class OFSwitch(OpenflowNode):
             url = ctrl.get_node_config_url(self.name)
             urlext = templateUrlExt.format(group_entry.get_group_id())
             url += urlext
-            payload = group_entry.get_payload()
+            payload = group_entry.get_payload(indent=None)
             resp = ctrl.http_put_request(url, payload, headers)
             if(resp is None):
                 status.set_status(STATUS.CONN_ERROR)
@@ -610,6 +997,147 @@ class OFSwitch(OpenflowNode):
             status.set_status(STATUS.HTTP_ERROR, resp)
         return Result(status, None)
 
+    def add_modify_groups(self, group_entries, max_workers=10):
+        """ Create new or modify existing groups in the configuration
+            data store of the Controller (one group per HTTP request).
+            Groups referred to by other groups of the batch (see
+            'GroupEntry.get_referenced_group_ids') are created first,
+            groups that refer to a failed group are not sent.
+
+        :param group_entries: Iterable of :class:`GroupEntry` objects.
+        :param int max_workers: Maximum number of HTTP requests sent to the
+                                Controller simultaneously.
+        :return: Aggregate status of the batch and per-group results.
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.common.result.LayeredBatchResult` data
+        """
+        groups = list(group_entries)
+        batch = self._apply_ordered(groups,
+                                    self._entries_dependencies(groups),
+                                    self.add_modify_group, max_workers)
+        return Result(batch.get_status(), batch)
+
+    def delete_groups(self, group_ids, max_workers=10):
+        """ Remove given groups from the configuration data store of the
+            Controller (one group per HTTP request). Groups are deleted
+            after the groups of the batch referring to them (configured
+            groups are read once to find the references), groups that are
+            referred to by a group that failed to be deleted are kept.
+
+        :param group_ids: Iterable of group identifiers.
+        :param int max_workers: Maximum number of HTTP requests sent to the
+                                Controller simultaneously.
+        :return: Aggregate status of the batch and per-group results.
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.common.result.LayeredBatchResult` data
+        """
+        group_ids = list(group_ids)
+        index = dict((int(gid), i) for i, gid in enumerate(group_ids))
+        dependencies = {}
+        result = self.get_configured_GroupEntries()
+        status = result.get_status()
+        if(status.eq(STATUS.OK)):
+            for ge in result.get_data():
+                i = index.get(int(ge.get_group_id()))
+                if i is None:
+                    continue
+                # referred groups are deleted after the referring one
+                for gid in ge.get_referenced_group_ids():
+                    if gid in index:
+                        dependencies.setdefault(index[gid], []).append(i)
+        elif(not status.eq(STATUS.DATA_NOT_FOUND)):
+            return Result(status, None)
+        batch = self._apply_ordered(group_ids, dependencies,
+                                    self.delete_group, max_workers)
+        return Result(batch.get_status(), batch)
+
+    def plan_entries(self, entries):
+        """ Splits flows and groups into layers so that the groups referred
+            to by entries of a layer (see 'get_referenced_group_ids' of
+            :class:`FlowEntry` and :class:`GroupEntry`) are in the preceding
+            layers. Returns list of layers and list of the entries that can
+            not be ordered due to circular references.
+        """
+        entries = list(entries)
+        layers, cyclic = dependency_layers(range(len(entries)),
+                                           self._entries_dependencies(entries))
+        return ([[entries[i] for i in layer] for layer in layers],
+                [entries[i] for i in cyclic])
+
+    def apply_entries(self, entries, max_workers=10):
+        """ Create new or modify existing flows and groups in the
+            configuration data store of the Controller in the order of
+            their dependencies (see 'plan_entries'). Entries of a layer are
+            sent concurrently (one entry per HTTP request), entries that
+            refer to a group that failed are not sent.
+
+        :param entries: Iterable of :class:`FlowEntry` and
+                        :class:`GroupEntry` objects.
+        :param int max_workers: Maximum number of HTTP requests sent to the
+                                Controller simultaneously.
+        :return: Aggregate status of the batch, per-entry results and
+                 results (and throughput) of every layer.
+        :rtype: :class:`pybvc.common.result.Result` with
+                :class:`pybvc.common.result.LayeredBatchResult` data
+        """
+        entries = list(entries)
+        batch = self._apply_ordered(entries,
+                                    self._entries_dependencies(entries),
+                                    self._apply_entry, max_workers)
+        return Result(batch.get_status(), batch)
+
+    def _apply_entry(self, entry):
+        if isinstance(entry, GroupEntry):
+            return self.add_modify_group(entry)
+        return self.add_modify_flow(entry)
+
+    def _entries_dependencies(self, entries):
+        """ Maps index of every entry to the indexes of the groups it
+            refers to (the ones that are not in 'entries' are skipped)
+        """
+        index = {}
+        for i, e in enumerate(entries):
+            if isinstance(e, GroupEntry) and e.get_group_id() is not None:
+                index[int(e.get_group_id())] = i
+        dependencies = {}
+        for i, e in enumerate(entries):
+            if isinstance(e, (FlowEntry, GroupEntry)):
+                dependencies[i] = [index[gid] for gid
+                                   in e.get_referenced_group_ids()
+                                   if gid in index]
+        return dependencies
+
+    def _apply_ordered(self, items, dependencies, func, max_workers):
+        """ Applies function to the items in the order of dependencies
+            between them ('dependencies' maps item index to indexes of
+            the items it depends on), items of every dependency layer are
+            processed concurrently. Items depending on a failed item get
+            its result, items with circular dependencies are not processed.
+        """
+        layers, cyclic = dependency_layers(range(len(items)), dependencies)
+        results = [None] * len(items)
+        batches = []
+        t0 = time.time()
+        for layer in layers:
+            todo = []
+            for i in layer:
+                failed = [results[j] for j in dependencies.get(i, ())
+                          if not results[j].get_status().eq(STATUS.OK)]
+                if failed:
+                    results[i] = failed[0]
+                else:
+                    todo.append(i)
+            t1 = time.time()
+            done = concurrent_map(lambda i: func(items[i]), todo, max_workers)
+            batches.append(BatchResult([items[i] for i in todo], done,
+                                       time.time() - t1))
+            for i, r in zip(todo, done):
+                results[i] = r
+        for i in cyclic:
+            dbg_print("DEBUG: circular dependency of %s" % items[i])
+            results[i] = Result(OperStatus(STATUS.MALFORM_DATA), None)
+        return LayeredBatchResult(items, results, time.time() - t0, batches)
+
     def get_group(self, group_id, operational=True, decode_object=False):
         """ Retrieve group information from the Controller,
             (refer to operational or configuration data store)
@@ -763,10 +1291,24 @@ class OFSwitch(OpenflowNode):
             status.set_status(STATUS.HTTP_ERROR, resp)
         return Result(status, group)
 
-    def get_groups_statistics(self, decode_object=False):
+    def get_groups_statistics(self, decode_object=False, group_ids=None,
+                              max_workers=10):
         """  Retrieve statistics for all groups in the Controller's
-             operational data store
+             operational data store. If 'group_ids' are given then
+             statistics of these groups only are retrieved (one HTTP
+             request per group, up to 'max_workers' simultaneously) and
+             returned as :class:`pybvc.common.result.BatchResult` with
+             per-group results (see 'get_group_statistics').
         """
+        if group_ids is not None:
+            group_ids = list(group_ids)
+            t0 = time.time()
+            results = concurrent_map(
+                lambda gid: self.get_group_statistics(gid, decode_object),
+                group_ids, max_workers)
+            batch = BatchResult(group_ids, results, time.time() - t0)
+            return Result(batch.get_status(), batch)
+
         groups = []
         result = self.get_groups(operational=True)
         status = result.get_status()
@@ -830,14 +1372,14 @@ class OFSwitch(OpenflowNode):
         else:
             url = ctrl.get_node_config_url(self.name)
 
-        resp = ctrl.http_get_request(url, data=None, headers=None)
+        resp = self._get_node_doc(url)
         if(resp is None):
             status.set_status(STATUS.CONN_ERROR)
         elif(resp.content is None):
             status.set_status(STATUS.CTRL_INTERNAL_ERROR)
         elif (resp.status_code == 200):
             p1 = 'node'
-            d = json.loads(resp.content)
+            d = self._decode_node_doc(resp)
             l1 = d.get(p1, None)
             if (isinstance(l1, list) and l1):
                 p2 = 'flow-node-inventory:group'
@@ -854,6 +1396,36 @@ class OFSwitch(OpenflowNode):
 
         return Result(status, groups)
 
+    def iter_groups(self, operational=True):
+        """ Returns iterator over the groups (dictionaries) of this node,
+            groups are decoded one by one as they arrive off the socket.
+        """
+        status = OperStatus()
+        groups = None
+        ctrl = self.ctrl
+
+        url = ""
+        if (operational):
+            url = ctrl.get_node_operational_url(self.name)
+        else:
+            url = ctrl.get_node_config_url(self.name)
+
+        resp = ctrl.http_get_request(url, data=None, headers=None,
+                                     stream=True)
+        if(resp is None):
+            status.set_status(STATUS.CONN_ERROR)
+        elif (resp.status_code == 200):
+            p1 = 'node'
+            p2 = 'flow-node-inventory:group'
+            groups = ctrl.iter_json_items(resp, (p1, p2))
+            status.set_status(STATUS.OK)
+        elif (resp.status_code == 404):
+            status.set_status(STATUS.DATA_NOT_FOUND)
+        else:
+            status.set_status(STATUS.HTTP_ERROR, resp)
+
+        return Result(status, groups)
+
     def get_GroupEntry(self, group_id, operational=True):
         groupEntry = None
         result = self.get_group(group_id, operational)
@@ -962,6 +1534,72 @@ class OFSwitch(OpenflowNode):
 
         return Result(status, queue_stats)
 
+    def get_statistics_counters(self):
+        """ Retrieve from the Controller's operational data store the
+            statistics counters of this switch ports, port queues, flows
+            and groups (single HTTP request for the node's document).
+            Returns dictionary that maps 'port', 'queue', 'flow' and
+            'group' to the dictionaries of the per-object counters,
+            objects are keyed by port number, (port number, queue id),
+            (table id, flow id) and group id respectively. Counters of an
+            object are given as (duration, {counter name: value}), see
+            'PORT_COUNTERS', 'QUEUE_COUNTERS', 'FLOW_COUNTERS' and
+            'GROUP_COUNTERS' for the counter names.
+        """
+        status = OperStatus()
+        counters = {'port': {}, 'queue': {}, 'flow': {}, 'group': {}}
+        ctrl = self.ctrl
+        url = ctrl.get_node_operational_url(self.name)
+        resp = self._get_node_doc(url)
+        if(resp is None):
+            status.set_status(STATUS.CONN_ERROR)
+        elif(resp.content is None):
+            status.set_status(STATUS.CTRL_INTERNAL_ERROR)
+        elif (resp.status_code == 200):
+            l = self._decode_node_doc(resp).get('node')
+            node = l[0] if isinstance(l, list) and l else {}
+            p1 = 'flow-node-inventory:port-number'
+            p2 = ('opendaylight-port-statistics:'
+                  'flow-capable-node-connector-statistics')
+            p3 = 'flow-node-inventory:queue'
+            p4 = ('opendaylight-queue-statistics:'
+                  'flow-capable-node-connector-queue-statistics')
+            for item in node.get('node-connector', []):
+                port = item.get(p1)
+                if port is None:
+                    continue
+                stats = item.get(p2)
+                if isinstance(stats, dict):
+                    counters['port'][port] = \
+                        _stats_counters(stats, PORT_COUNTERS)
+                for q in item.get(p3, []):
+                    stats = q.get(p4)
+                    if isinstance(stats, dict):
+                        key = (port, q.get('queue-id'))
+                        counters['queue'][key] = \
+                            _stats_counters(stats, QUEUE_COUNTERS)
+            p5 = 'opendaylight-flow-statistics:flow-statistics'
+            for table in node.get('flow-node-inventory:table', []):
+                for flow in table.get('flow', []):
+                    stats = flow.get(p5)
+                    if isinstance(stats, dict):
+                        key = (table.get('id'), flow.get('id'))
+                        counters['flow'][key] = \
+                            _stats_counters(stats, FLOW_COUNTERS)
+            p6 = 'opendaylight-group-statistics:group-statistics'
+            for group in node.get('flow-node-inventory:group', []):
+                stats = group.get(p6)
+                if isinstance(stats, dict):
+                    counters['group'][group.get('group-id')] = \
+                        _stats_counters(stats, GROUP_COUNTERS)
+            status.set_status(STATUS.OK if node
+                              else STATUS.DATA_NOT_FOUND)
+        elif (resp.status_code == 404):
+            status.set_status(STATUS.DATA_NOT_FOUND)
+        else:
+            status.set_status(STATUS.HTTP_ERROR, resp)
+        return Result(status, counters)
+
     def get_meter_features(self, decode_object=False):
         """ Retrieve from the Controller's operational data store
             information about metering features supported by the
@@ -1001,11 +1639,24 @@ class OFSwitch(OpenflowNode):
         return Result(status, meter_features)
 
 
-class FlowEntry(object):
+class FlowEntry(CanonicalObject):
     """ Class for creating and interacting with OpenFlow flows """
 
+    __slots__ = ('id', 'cookie', 'cookie_mask', 'table_id', 'priority',
+                 'idle_timeout', 'hard_timeout', 'strict', 'out_port',
+                 'out_group', 'flags', 'flow_name', 'installHw', 'barrier',
+                 'buffer_id', 'match', 'instructions', 'flow_statistics')
+
     ''' Reference name in the YANG data tree on the Controller '''
     _mn = "flow-node-inventory:flow"
+    ''' Exceptions from the common ODL rules for having all multi-part
+        keywords in YANG models being dash separated
+    '''
+    _yang_keep = ('table_id', 'cookie_mask')
+    ''' Operational statistics are ignored in flows comparison '''
+    _canonical_skip = ('flow_statistics',)
+    ''' YANG name of the flow statistics (augmentation of the flow) '''
+    _statistics_mn = 'opendaylight-flow-statistics:flow-statistics'
 
     def __attrs__(self):
         ''' Unique identifier of this FlowEntry in the Controller's
@@ -1089,8 +1740,17 @@ class FlowEntry(object):
         if (s is not None and isinstance(s, basestring)):
             js = s.replace('opendaylight_flow_statistics:flow_statistics',
                            'flow_statistics')
-            obj = json.loads(js)
-            d = dict_keys_dashed_to_underscored(obj)
+            self.__init_from_dict__(json.loads(js))
+        else:
+            raise TypeError("[FlowEntry] wrong argument type '%s'"
+                            " (JSON 'string' is expected)" % type(s))
+
+    def __init_from_dict__(self, d):
+        if (d is not None and isinstance(d, dict)):
+            d = dict_keys_dashed_to_underscored(d)
+            p = 'opendaylight_flow_statistics:flow_statistics'
+            if p in d:
+                d['flow_statistics'] = d.pop(p)
             for k, v in d.items():
                 if (k == 'match'):
                     match = Match(v)
@@ -1099,55 +1759,38 @@ class FlowEntry(object):
                     instructions = Instructions(v)
                     self.add_instructions(instructions)
                 else:
-                    setattr(self, k, v)
-        else:
-            raise TypeError("[FlowEntry] wrong argument type '%s'"
-                            " (JSON 'string' is expected)" % type(s))
-
-    def __init_from_dict__(self, d):
-        if (d is not None and isinstance(d, dict)):
-            js = json.dumps(d)
-            self.__init_from_json__(js)
+                    self._setattr(k, v)
         else:
             raise TypeError("[FlowEntry] wrong argument type '%s'"
                             " ('dict' is expected)" % type(d))
 
     def to_json(self):
         """ Return FlowEntry as JSON """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=obj_vars,
                           sort_keys=True, indent=4)
 
+    def to_yang_dict(self, strip=True):
+        """ Return FlowEntry as a dictionary keyed by the YANG model
+            names (all 'underscored' names converted to 'dash-separated'
+            form used by ODL YANG models naming conventions)
+        """
+        d = obj_to_yang_dict(self, self._yang_keep, strip)
+        statistics = d.pop('flow-statistics', None)
+        if statistics is not None:
+            d[self._statistics_mn] = statistics
+        return d
+
     def to_yang_json(self, strip=False):
-        s = self.to_json()
-        # Convert all 'underscored' keywords to 'dash-separated' form used
-        # by ODL YANG models naming conventions
-        s = s.replace('_', '-')
-        # Following are exceptions from the common ODL rules for having all
-        # multi-part keywords in YANG models being hash separated
-        s = s.replace('table-id', 'table_id')
-        s = s.replace('cookie-mask', 'cookie_mask')
-        if strip:
-            # ignore unassigned ("empty") attributes
-            d1 = json.loads(s)
-            d2 = strip_none(d1)
-            s = json.dumps(d2, sort_keys=True, indent=4)
-        return s
+        return json.dumps(self.to_yang_dict(strip), sort_keys=True, indent=4)
 
-    def get_payload(self):
-        """ Return FlowEntry as a payload for the HTTP request body """
-        s = self.to_json()
-        # Convert all 'underscored' keywords to 'dash-separated' form used
-        # by ODL YANG models naming conventions
-        s = s.replace('_', '-')
-        # Following are exceptions from the common ODL rules for having all
-        # multi-part keywords in YANG models being hash separated
-        s = s.replace('table-id', 'table_id')
-        s = s.replace('cookie-mask', 'cookie_mask')
-        d1 = json.loads(s)
-        d2 = strip_none(d1)
-        payload = {self._mn: d2}
-        return json.dumps(payload, default=lambda o: o.__dict__,
-                          sort_keys=True, indent=4)
+    def get_payload(self, indent=4):
+        """ Return FlowEntry as a payload for the HTTP request body
+            (compact JSON with unsorted keys when 'indent' is None)
+        """
+        payload = {self._mn: self.to_yang_dict()}
+        if indent is None:
+            return json.dumps(payload)
+        return json.dumps(payload, sort_keys=True, indent=indent)
 
     def to_ofp_oxm_syntax(self):
         odc = OrderedDict()
@@ -1459,6 +2102,20 @@ class FlowEntry(object):
                 res = attr[p2]
         return res
 
+    def get_referenced_group_ids(self):
+        """ Returns set of identifiers of the groups this flow refers to
+            (by 'group' actions), these groups have to exist before this
+            flow is created
+        """
+        ids = set()
+        for instruction in self.get_instructions() or ():
+            for action in instruction.get_apply_actions() or ():
+                if isinstance(action, GroupAction):
+                    v = action.get_group_id()
+                    if v is not None:
+                        ids.add(int(v))
+        return ids
+
     def add_instructions(self, instructions):
         if isinstance(instructions, Instructions):
             l = instructions.get_instructions()
@@ -1486,9 +2143,11 @@ class FlowEntry(object):
         return res
 
 
-class Instructions():
+class Instructions(CompactObject):
     ''' 'Class representing OpenFlow flow instructions set '''
 
+    __slots__ = ('instructions',)
+
     def __attrs__(self):
         self.instructions = []
 
@@ -1528,9 +2187,11 @@ class Instructions():
         return res
 
 
-class Instruction():
+class Instruction(CanonicalObject):
     """ Class representing an OpenFlow flow instruction """
 
+    __slots__ = ('order', 'apply_actions')
+
     def __attrs__(self):
         self.order = None
         self.apply_actions = {'action': []}
@@ -1577,7 +2238,7 @@ class Instruction():
                 elif p3:
                     self.order = v
                 else:
-                    setattr(self, k, v)
+                    self._setattr(k, v)
         else:
             raise TypeError("[Instruction] wrong argument type '%s'"
                             " ('dict' is expected)" % type(d))
@@ -1605,106 +2266,15 @@ class Instruction():
 
     def create_action_from_dict(self, d):
         if isinstance(d, dict):
-            action = None
-
-            # OpenFlow 1.0 and 1.3 actions
-            p0 = 'output_action'        # OFPAT_OUTPUT (0)
-
-            # OpenFlow 1.0 actions
-            p1 = 'set_vlan_id_action'   # OFPAT_SET_VLAN_VID (1)
-            p2 = 'set_vlan_pcp_action'  # OFPAT_SET_VLAN_PCP (2)
-            p3 = 'strip_vlan_action'    # OFPAT_STRIP_VLAN (3)
-            p4 = 'set_dl_src_action'    # OFPAT_SET_DL_SRC (4)
-            p5 = 'set_dl_dst_action'    # OFPAT_SET_DL_DST (5)
-            p6 = 'set_nw_src_action'    # OFPAT_SET_NW_SRC (6)
-            p7 = 'set_nw_dst_action'    # OFPAT_SET_NW_DST (7)
-            p8 = 'set_nw_tos_action'    # OFPAT_SET_NW_TOS (8)
-            p9 = 'set_tp_src_action'    # OFPAT_SET_TP_SRC (9)
-            p10 = 'set_tp_dst_action'   # OFPAT_SET_TP_DST (10)
-
-            # OpenFlow 1.3 actions
-# TODO       p11 = 'copy_ttl_out'         # OFPAT_COPY_TTL_OUT (11)
-# TODO       p12 = 'copy_ttl_in'          # OFPAT_COPY_TTL_IN (12)
-            p15 = 'set_mpls_ttl_action'  # OFPAT_SET_MPLS_TTL (15)
-            p16 = 'dec_mpls_ttl'         # OFPAT_DEC_MPLS_TTL (16)
-            p17 = 'push_vlan_action'     # OFPAT_PUSH_VLAN (17)
-            p18 = 'pop_vlan_action'      # OFPAT_POP_VLAN (18)
-            p19 = 'push_mpls_action'     # OFPAT_PUSH_MPLS (19)
-            p20 = 'pop_mpls_action'      # OFPAT_POP_MPLS (20)
-            p21 = 'set_queue_action'     # OFPAT_SET_QUEUE (21)
-            p22 = 'group_action'         # OFPAT_GROUP (22)
-            p23 = 'set_nw_ttl_action'    # OFPAT_SET_NW_TTL (23)
-            p24 = 'dec_nw_ttl'           # OFPAT_DEC_NW_TTL (24)
-            p25 = 'set_field'            # OFPAT_SET_FIELD (25)
-            p26 = 'push_pbb_action'      # OFPAT_PUSH_PBB (26)
-            p27 = 'pop_pbb_action'       # OFPAT_POP_PBB (27)
-
-            action_order = d.get('order', None)
-            if (p0 in d):
-                action = OutputAction(order=action_order, d=d[p0])
-            elif (p1 in d):
-                action = SetVlanIdAction(order=action_order, d=d[p1])
-            elif (p2 in d):
-                action = SetVlanPCPAction(order=action_order, d=d[p2])
-            elif (p3 in d):
-                action = StripVlanAction(order=action_order)
-            elif (p4 in d):
-                action = SetDlSrcAction(order=action_order, d=d[p4])
-            elif (p5 in d):
-                action = SetDlDstAction(order=action_order, d=d[p5])
-            elif (p6 in d):
-                action = SetNwSrcAction(order=action_order, d=d[p6])
-            elif (p7 in d):
-                action = SetNwDstAction(order=action_order, d=d[p7])
-            elif (p8 in d):
-                action = SetNwTosAction(order=action_order, d=d[p8])
-            elif (p9 in d):
-                action = SetTpSrcAction(order=action_order, d=d[p9])
-            elif (p10 in d):
-                action = SetTpDstAction(order=action_order, d=d[p10])
-#  TODO      elif (p11 in d):
-#                action = CopyTtlOutAction(order=action_order, d=d[p11])
-#  TODO      elif (p12 in d):
-#                action = CopyTtlInAction(order=action_order, d=d[p12])
-            elif (p15 in d):
-                action = SetMplsTTLAction(order=action_order, d=d[p15])
-            elif (p16 in d):
-                action = DecMplsTTLAction(order=action_order)
-            elif (p17 in d):
-                action = PushVlanHeaderAction(order=action_order, d=d[p17])
-            elif (p18 in d):
-                action = PopVlanHeaderAction(order=action_order)
-            elif (p19 in d):
-                action = PushMplsHeaderAction(order=action_order, d=d[p19])
-            elif (p20 in d):
-                action = PopMplsHeaderAction(order=action_order, d=d[p20])
-            elif (p21 in d):
-                action = SetQueueAction(order=action_order, d=d[p21])
-            elif (p22 in d):
-                action = GroupAction(order=action_order, d=d[p22])
-            elif (p23 in d):
-                action = SetNwTTLAction(order=action_order, d=d[p23])
-            elif (p24 in d):
-                action = DecNwTTLAction(order=action_order)
-            elif (p25 in d):
-                action = SetFieldAction(order=action_order, d=d[p25])
-            elif (p26 in d):
-                action = PushPBBHeaderAction(order=action_order, d=d[p26])
-            elif (p27 in d):
-                action = PopPBBHeaderAction(order=action_order)
-            elif ('drop_action' in d):
-                action = DropAction(order=action_order)
-            else:
-                msg = "Found unsupported action in d='%s'" % d
-                dbg_print(msg)
-
-            return action
+            return decode_action(d)
         else:
             raise TypeError("[Instruction] wrong argument type '%s'"
                             " ('dict' is expected)" % type(d))
 
 
-class Action(object):
+class Action(CanonicalObject):
+
+    __slots__ = ('order',)
 
     def __init__(self, order=None):
         self.order = order
@@ -1720,6 +2290,8 @@ class OutputAction(Action):
         (OpenFlow Switch Specification Version 1.0 and 1.3)
     """
 
+    __slots__ = ('output_action',)
+
     def __attrs__(self):
         self.output_action = {'output_node_connector': None,
                               'max_length': None}
@@ -1792,6 +2364,8 @@ class DropAction(Action):
         (OpenFlow Switch Specification Version 1.0 and 1.3)
     """
 
+    __slots__ = ('drop_action',)
+
     def __attrs__(self):
         self.drop_action = {}
 
@@ -1815,6 +2389,8 @@ class SetVlanIdAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_vlan_id_action',)
+
     def __attrs__(self):
         self.set_vlan_id_action = {'vlan_id': None}
 
@@ -1860,6 +2436,8 @@ class SetVlanPCPAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_vlan_pcp_action',)
+
     def __attrs__(self):
         self.set_vlan_pcp_action = {'vlan_pcp': None}
 
@@ -1925,6 +2503,8 @@ class StripVlanAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('strip_vlan_action',)
+
     def __attrs__(self):
         self.strip_vlan_action = {}
 
@@ -1944,6 +2524,8 @@ class SetDlSrcAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_dl_src_action',)
+
     def __attrs__(self):
         self.set_dl_src_action = {'address': None}
 
@@ -1988,6 +2570,8 @@ class SetDlDstAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_dl_dst_action',)
+
     def __attrs__(self):
         self.set_dl_dst_action = {'address': None}
 
@@ -2033,6 +2617,8 @@ class SetNwSrcAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_nw_src_action',)
+
     def __attrs__(self):
         self.set_nw_src_action = {'ipv4_address': None}
 
@@ -2078,6 +2664,8 @@ class SetNwDstAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_nw_dst_action',)
+
     def __attrs__(self):
         self.set_nw_dst_action = {'ipv4_address': None}
 
@@ -2122,6 +2710,8 @@ class SetNwTosAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_nw_tos_action',)
+
     def __attrs__(self):
         ''' Value with which to replace existing IPv4 ToS field
             NOTE: The modern redefinition of the ToS field is a 6 bit
@@ -2173,6 +2763,8 @@ class SetTpSrcAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_tp_src_action',)
+
     def __attrs__(self):
         self.set_tp_src_action = {'port': None}
 
@@ -2218,6 +2810,8 @@ class SetTpDstAction(Action):
         (OpenFlow Switch Specification Version 1.0)
     """
 
+    __slots__ = ('set_tp_dst_action',)
+
     def __attrs__(self):
         self.set_tp_dst_action = {'port': None}
 
@@ -2262,6 +2856,8 @@ class PushVlanHeaderAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('push_vlan_action',)
+
     def __attrs__(self):
         self.push_vlan_action = {'ethernet_type': None, 'tag': None,
                                  'pcp': None, 'cfi': None, 'vlan_id': None}
@@ -2330,6 +2926,8 @@ class PopVlanHeaderAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('pop_vlan_action',)
+
     def __attrs__(self):
         self.pop_vlan_action = {}
 
@@ -2349,6 +2947,8 @@ class PushMplsHeaderAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('push_mpls_action',)
+
     def __attrs__(self):
         self.push_mpls_action = {'ethernet_type': None}
 
@@ -2398,6 +2998,8 @@ class PopMplsHeaderAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('pop_mpls_action',)
+
     def __attrs__(self):
         self.pop_mpls_action = {'ethernet_type': None}
 
@@ -2442,6 +3044,8 @@ class SetMplsTTLAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('set_mpls_ttl_action',)
+
     def __attrs__(self):
         self.set_mpls_ttl_action = {'mpls_ttl': None}
 
@@ -2486,6 +3090,8 @@ class DecMplsTTLAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('dec_mpls_ttl',)
+
     def __attrs__(self):
         self.dec_mpls_ttl = {}
 
@@ -2505,6 +3111,8 @@ class SetNwTTLAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('set_nw_ttl_action',)
+
     def __attrs__(self):
         self.set_nw_ttl_action = {'nw_ttl': None}
 
@@ -2549,6 +3157,8 @@ class DecNwTTLAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('dec_nw_ttl',)
+
     def __attrs__(self):
         self.dec_nw_ttl = {}
 
@@ -2567,6 +3177,8 @@ class CopyTTLOutwardsAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('copy_ttl_out',)
+
     def __attrs__(self):
         self.copy_ttl_out = {}
 
@@ -2585,6 +3197,8 @@ class CopyTTLInwardsAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('copy_ttl_in',)
+
     def __attrs__(self):
         self.copy_ttl_in = {}
 
@@ -2607,6 +3221,8 @@ class SetQueueAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('set_queue_action',)
+
     def __attrs__(self):
         self.set_queue_action = {'queue': None, 'queue_id': None}
 
@@ -2656,6 +3272,8 @@ class GroupAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('group_action',)
+
     def __attrs__(self):
         self.group_action = {'group': None, 'group_id': None}
 
@@ -2717,6 +3335,8 @@ class SetFieldAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('set_field',)
+
     def __attrs__(self):
         self.set_field = {'vlan_match': None,
                           'protocol_match_fields': None,
@@ -2976,6 +3596,8 @@ class PushPBBHeaderAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('push_pbb_action',)
+
     def __attrs__(self):
         self.push_pbb_action = {'ethernet_type': None}
 
@@ -3013,6 +3635,8 @@ class PopPBBHeaderAction(Action):
         (OpenFlow Switch Specification Version 1.3)
     """
 
+    __slots__ = ('pop_pbb_action',)
+
     def __attrs__(self):
         self.pop_pbb_action = {}
 
@@ -3071,9 +3695,114 @@ class LoopbackAction(Action):
 '''
 
 
-class Match(object):
+''' Registry of the action decoders keyed by the name of the action
+    container in the YANG data tree ('underscored' form), e.g.
+    'output_action' -> OutputAction. Shared by the flow instructions and
+    the group buckets, extended by means of 'register_action'.
+'''
+_action_decoders = {}
+
+
+def register_action(name, action_class, has_data=True):
+    """ Registers 'action_class' (subclass of Action) as a decoder of the
+        actions found under the 'name' key of the YANG action list entries.
+        Classes constructed from the 'order' argument only (no action
+        data) must be registered with 'has_data' set to False.
+        Vendor specific actions can be registered the same way.
+    """
+    _action_decoders[name.replace('-', '_')] = (action_class, has_data)
+
+
+def decode_action(d):
+    """ Returns Action object created from the YANG action list entry
+        (with 'underscored' keys), None for unsupported actions.
+    """
+    for k, v in d.iteritems():
+        decoder = _action_decoders.get(k)
+        if decoder is not None:
+            action_class, has_data = decoder
+            if has_data:
+                return action_class(order=d.get('order', None), d=v)
+            else:
+                return action_class(order=d.get('order', None))
+    msg = "Found unsupported action in d='%s'" % d
+    dbg_print(msg)
+    return None
+
+
+# OpenFlow 1.0 and 1.3 actions
+# OFPAT_OUTPUT (0)
+register_action('output_action', OutputAction)
+register_action('drop_action', DropAction, False)
+
+# OpenFlow 1.0 actions
+# OFPAT_SET_VLAN_VID (1)
+register_action('set_vlan_id_action', SetVlanIdAction)
+# OFPAT_SET_VLAN_PCP (2)
+register_action('set_vlan_pcp_action', SetVlanPCPAction)
+# OFPAT_STRIP_VLAN (3)
+register_action('strip_vlan_action', StripVlanAction, False)
+# OFPAT_SET_DL_SRC (4)
+register_action('set_dl_src_action', SetDlSrcAction)
+# OFPAT_SET_DL_DST (5)
+register_action('set_dl_dst_action', SetDlDstAction)
+# OFPAT_SET_NW_SRC (6)
+register_action('set_nw_src_action', SetNwSrcAction)
+# OFPAT_SET_NW_DST (7)
+register_action('set_nw_dst_action', SetNwDstAction)
+# OFPAT_SET_NW_TOS (8)
+register_action('set_nw_tos_action', SetNwTosAction)
+# OFPAT_SET_TP_SRC (9)
+register_action('set_tp_src_action', SetTpSrcAction)
+# OFPAT_SET_TP_DST (10)
+register_action('set_tp_dst_action', SetTpDstAction)
+
+# OpenFlow 1.3 actions
+# TODO  copy_ttl_out - OFPAT_COPY_TTL_OUT (11)
+# TODO  copy_ttl_in - OFPAT_COPY_TTL_IN (12)
+# OFPAT_SET_MPLS_TTL (15)
+register_action('set_mpls_ttl_action', SetMplsTTLAction)
+# OFPAT_DEC_MPLS_TTL (16)
+register_action('dec_mpls_ttl', DecMplsTTLAction, False)
+# OFPAT_PUSH_VLAN (17)
+register_action('push_vlan_action', PushVlanHeaderAction)
+# OFPAT_POP_VLAN (18)
+register_action('pop_vlan_action', PopVlanHeaderAction, False)
+# OFPAT_PUSH_MPLS (19)
+register_action('push_mpls_action', PushMplsHeaderAction)
+# OFPAT_POP_MPLS (20)
+register_action('pop_mpls_action', PopMplsHeaderAction)
+# OFPAT_SET_QUEUE (21)
+register_action('set_queue_action', SetQueueAction)
+# OFPAT_GROUP (22)
+register_action('group_action', GroupAction)
+# OFPAT_SET_NW_TTL (23)
+register_action('set_nw_ttl_action', SetNwTTLAction)
+# OFPAT_DEC_NW_TTL (24)
+register_action('dec_nw_ttl', DecNwTTLAction, False)
+# OFPAT_SET_FIELD (25)
+register_action('set_field', SetFieldAction)
+# OFPAT_PUSH_PBB (26)
+register_action('push_pbb_action', PushPBBHeaderAction)
+# OFPAT_POP_PBB (27)
+register_action('pop_pbb_action', PopPBBHeaderAction, False)
+
+
+class Match(CanonicalObject):
     """ Class that represents OpenFlow flow matching attributes """
 
+    __slots__ = ('in_port', 'in_phy_port', 'ethernet_match', 'ipv4_source',
+                 'ipv4_destination', 'ip_match', 'ipv6_source',
+                 'ipv6_destination', 'ipv6_nd_target', 'ipv6_nd_sll',
+                 'ipv6_nd_tll', 'ipv6_label', 'ipv6_ext_header',
+                 'protocol_match_fields', 'udp_source_port',
+                 'udp_destination_port', 'tcp_source_port',
+                 'tcp_destination_port', 'sctp_source_port',
+                 'sctp_destination_port', 'icmpv4_match', 'icmpv6_match',
+                 'vlan_match', 'arp_op', 'arp_source_transport_address',
+                 'arp_target_transport_address', 'arp_source_hardware_address',
+                 'arp_target_hardware_address', 'tunnel', 'metadata')
+
     def __attrs__(self):
         ''' Ingress port. Numerical representation of in-coming port,
             starting at 1 (may be a physical or switch-defined logical port)
@@ -3191,11 +3920,16 @@ class Match(object):
                 elif (k == 'vlan_match'):
                     self.vlan_match = VlanMatch(d[k])
                 else:
-                    setattr(self, k, v)
+                    self._setattr(k, v)
         else:
             raise TypeError("[Match] wrong argument type '%s'"
                             " ('dict is expected)" % type(d))
 
+    def to_dict(self):
+        """ Returns match fields that are set as a dictionary """
+        s = json.dumps(self, default=obj_vars)
+        return strip_none(json.loads(s))
+
     def set_eth_type(self, eth_type):
         if(self.ethernet_match is None):
             self.ethernet_match = EthernetMatch()
@@ -3649,9 +4383,11 @@ class Match(object):
         return res
 
 
-class EthernetMatch(Match):
+class EthernetMatch(CompactObject):
     """ Ethernet specific match fields """
 
+    __slots__ = ('ethernet_type', 'ethernet_source', 'ethernet_destination')
+
     def __attrs__(self):
         self.ethernet_type = None
         self.ethernet_source = None
@@ -3665,7 +4401,7 @@ class EthernetMatch(Match):
     def __init_from_dict__(self, d):
         if (d is not None and isinstance(d, dict)):
             for k, v in d.items():
-                setattr(self, k, v)
+                self._setattr(k, v)
         else:
             raise TypeError("[Match] wrong argument type '%s'"
                             " ('dict is expected)" % type(d))
@@ -3716,9 +4452,11 @@ class EthernetMatch(Match):
         return res
 
 
-class VlanMatch(Match):
+class VlanMatch(CompactObject):
     """ VLAN specific match fields """
 
+    __slots__ = ('vlan_id', 'vlan_pcp')
+
     def __attrs__(self):
         ''' VLAN-ID from 802.1Q header '''
         self.vlan_id = None
@@ -3736,7 +4474,7 @@ class VlanMatch(Match):
                 if (k == 'vlan_id'):
                     self.vlan_id = VlanId(v)
                 else:
-                    setattr(self, k, v)
+                    self._setattr(k, v)
         else:
             raise TypeError("!!!Error, argument '%s' is of a wrong type "
                             "('dict' is expected)" % d)
@@ -3770,6 +4508,8 @@ class VlanId(VlanMatch):
         of VLAN ID information encoded in match rules of a flow entry
     """
 
+    __slots__ = ('vlan_id_present',)
+
     def __attrs__(self):
         ''' VLAN-ID from 802.1Q header '''
         self.vlan_id = None
@@ -3786,7 +4526,7 @@ class VlanId(VlanMatch):
     def __init_from_dict__(self, d):
         if d is not None and isinstance(d, dict):
             for k, v in d.items():
-                setattr(self, k, v)
+                self._setattr(k, v)
         else:
             raise TypeError("!!!Error, argument '%s' is of a wrong type "
                             "('dict' is expected)" % d)
@@ -3803,9 +4543,11 @@ class VlanId(VlanMatch):
         return res
 
 
-class IcmpMatch(Match):
+class IcmpMatch(CompactObject):
     """ ICMPv4 specific match fields """
 
+    __slots__ = ('icmpv4_type', 'icmpv4_code')
+
     def __attrs__(self):
         ''' ICMP type '''
         self.icmpv4_type = None
@@ -3820,7 +4562,7 @@ class IcmpMatch(Match):
     def __init_from_dict__(self, d):
         if d is not None and isinstance(d, dict):
             for k, v in d.items():
-                setattr(self, k, v)
+                self._setattr(k, v)
         else:
             raise TypeError("!!!Error, argument '%s' is of a wrong type "
                             "('dict' is expected)" % d)
@@ -3846,9 +4588,11 @@ class IcmpMatch(Match):
         return res
 
 
-class IcmpV6Match(Match):
+class IcmpV6Match(CompactObject):
     """ ICMPv6 specific match fields """
 
+    __slots__ = ('icmpv6_type', 'icmpv6_code')
+
     def __attrs__(self):
         ''' ICMPv6 type '''
         self.icmpv6_type = None
@@ -3863,7 +4607,7 @@ class IcmpV6Match(Match):
     def __init_from_dict__(self, d):
         if (d is not None and isinstance(d, dict)):
             for k, v in d.items():
-                setattr(self, k, v)
+                self._setattr(k, v)
         else:
             raise TypeError("!!!Error, argument '%s' is of a wrong type "
                             "('dict' is expected)" % d)
@@ -3889,9 +4633,11 @@ class IcmpV6Match(Match):
         return res
 
 
-class IpMatch(Match):
+class IpMatch(CompactObject):
     """ IPv4 protocol specific match fields """
 
+    __slots__ = ('ip_dscp', 'ip_ecn', 'ip_protocol')
+
     def __attrs__(self):
         ''' "IP DSCP (6 bits in ToS field) '''
         self.ip_dscp = None
@@ -3908,7 +4654,7 @@ class IpMatch(Match):
     def __init_from_dict__(self, d):
         if (d is not None and isinstance(d, dict)):
             for k, v in d.items():
-                setattr(self, k, v)
+                self._setattr(k, v)
         else:
             raise TypeError("!!!Error, argument '%s' is of a wrong type "
                             "('dict' is expected)" % d)
@@ -3944,9 +4690,11 @@ class IpMatch(Match):
         return res
 
 
-class Ipv6Label(Match):
+class Ipv6Label(CompactObject):
     """ IPv6 Flow Label """
 
+    __slots__ = ('ipv6_flabel', 'flabel_mask')
+
     def __attrs__(self):
         self.ipv6_flabel = None
         self.flabel_mask = None
@@ -3978,9 +4726,11 @@ class Ipv6Label(Match):
         return res
 
 
-class Ipv6ExtHdr(Match):
+class Ipv6ExtHdr(CompactObject):
     """ IPv6 Extension Header pseudo-field """
 
+    __slots__ = ('ipv6_exthdr', 'ipv6_exthdr_mask')
+
     def __attrs__(self):
         self.ipv6_exthdr = None
         self.ipv6_exthdr_mask = None
@@ -4012,9 +4762,11 @@ class Ipv6ExtHdr(Match):
         return res
 
 
-class ProtocolMatchFields(Match):
+class ProtocolMatchFields(CompactObject):
     """ Protocol match fields """
 
+    __slots__ = ('mpls_label', 'mpls_tc', 'mpls_bos', 'pbb')
+
     def __attrs__(self):
         ''' The LABEL in the first MPLS shim header '''
         self.mpls_label = None
@@ -4033,7 +4785,7 @@ class ProtocolMatchFields(Match):
     def __init_from_dict__(self, d):
         if (d is not None and isinstance(d, dict)):
             for k, v in d.items():
-                setattr(self, k, v)
+                self._setattr(k, v)
         else:
             raise TypeError("!!!Error, argument '%s' is of a wrong type "
                             "('dict' is expected)" % d)
@@ -4072,6 +4824,8 @@ class ProtocolMatchFields(Match):
 class Pbb(ProtocolMatchFields):
     """ The I-SID in the first PBB service instance tag """
 
+    __slots__ = ('pbb_isid', 'pbb_mask')
+
     def __attrs__(self):
         self.pbb_isid = None
         self.pbb_mask = None
@@ -4086,9 +4840,11 @@ class Pbb(ProtocolMatchFields):
         self.pbb_mask = pbb_mask
 
 
-class ArpSrcHwAddrMatch(Match):
+class ArpSrcHwAddrMatch(CompactObject):
     """ ARP source hardware address """
 
+    __slots__ = ('address',)
+
     def __attrs__(self):
         self.address = None
 
@@ -4096,9 +4852,11 @@ class ArpSrcHwAddrMatch(Match):
         self.__attrs__()
 
 
-class ArpTgtHwAddrMatch(Match):
+class ArpTgtHwAddrMatch(CompactObject):
     ''' ARP target hardware address '''
 
+    __slots__ = ('address',)
+
     def __attrs__(self):
         self.address = None
 
@@ -4106,9 +4864,11 @@ class ArpTgtHwAddrMatch(Match):
         self.__attrs__()
 
 
-class Tunnel(Match):
+class Tunnel(CompactObject):
     """ Metadata associated with a logical port """
 
+    __slots__ = ('tunnel_id',)
+
     def __attrs__(self):
         self.tunnel_id = None
 
@@ -4126,9 +4886,11 @@ class Tunnel(Match):
         return res
 
 
-class Metadata(Match):
+class Metadata(CompactObject):
     """ Table metadata. Used to pass information between tables """
 
+    __slots__ = ('metadata', 'metadata_mask')
+
     def __attrs__(self):
         self.metadata = None
         self.metadata_mask = None
@@ -4157,11 +4919,18 @@ class Metadata(Match):
         return res
 
 
-class GroupEntry():
+class GroupEntry(CanonicalObject):
     """ Class that represents a group entry in the OpenFlow Group Table """
 
+    __slots__ = ('group_id', 'group_type', 'group_name', 'container_name',
+                 'barrier', 'buckets')
+
     ''' Reference name in the YANG data tree on the Controller '''
     _mn = "flow-node-inventory:group"
+    ''' Exceptions from the common ODL rules for having all multi-part
+        keywords in YANG models being dash separated
+    '''
+    _yang_keep = ('watch_group', 'watch_port')
 
     def __attrs__(self):
         ''' Uniquely identifies a group within a switch. '''
@@ -4200,8 +4969,14 @@ class GroupEntry():
 
     def __init_from_json__(self, js):
         if (js is not None and isinstance(js, basestring)):
-            obj = json.loads(js)
-            d = dict_keys_dashed_to_underscored(obj)
+            self.__init_from_dict__(json.loads(js))
+        else:
+            raise TypeError("[GroupEntry] wrong argument type '%s'"
+                            " (JSON 'string' is expected)" % type(js))
+
+    def __init_from_dict__(self, d):
+        if (d is not None and isinstance(d, dict)):
+            d = dict_keys_dashed_to_underscored(d)
             p1 = 'buckets'
             p2 = 'bucket'
             for k, v in d.items():
@@ -4213,60 +4988,38 @@ class GroupEntry():
                                 bucket = GroupBucket(bucket_dict=i)
                                 self.buckets[p2].append(bucket)
                 else:
-                    setattr(self, k, v)
-        else:
-            raise TypeError("[GroupEntry] wrong argument type '%s'"
-                            " (JSON 'string' is expected)" % type(js))
-
-    def __init_from_dict__(self, d):
-        if (d is not None and isinstance(d, dict)):
-            js = json.dumps(d)
-            self.__init_from_json__(js)
+                    self._setattr(k, v)
         else:
             raise TypeError("[GroupEntry] wrong argument type '%s'"
                             " ('dict' is expected)" % type(d))
 
     def to_string(self):
         """ Returns string representation of this object. """
-        return str(vars(self))
+        return str(obj_vars(self))
 
     def to_json(self):
         """ Return GroupEntry represented as JSON object """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=obj_vars,
                           sort_keys=True, indent=4)
 
-    def to_yang_json(self, strip=False):
-        s = self.to_json()
-        # Convert all 'underscored' keywords to 'dash-separated' form used
-        # by ODL YANG models naming conventions
-        s = s.replace('_', '-')
-        # Following are exceptions from the common ODL rules for having all
-        # multi-part keywords in YANG models being hash separated
-#        s = s.replace('table-id', 'table_id')
-#        s = s.replace('cookie-mask', 'cookie_mask')
-        if strip:
-            # ignore unassigned ("empty") attributes
-            d1 = json.loads(s)
-            d2 = strip_none(d1)
-            s = json.dumps(d2, sort_keys=True, indent=4)
+    def to_yang_dict(self, strip=True):
+        """ Return GroupEntry as a dictionary keyed by the YANG model
+            names (as used in the HTTP request body)
+        """
+        return obj_to_yang_dict(self, self._yang_keep, strip)
 
-        return s
+    def to_yang_json(self, strip=False):
+        d = obj_to_yang_dict(self, strip=strip)
+        return json.dumps(d, sort_keys=True, indent=4)
 
-    def get_payload(self):
-        """ Return GroupEntry as a payload for the HTTP request body """
-        s = self.to_json()
-        # Convert all 'underscored' keywords to 'dash-separated' form used
-        # by ODL YANG models naming conventions
-        s = s.replace('_', '-')
-        # Following are exceptions from the common ODL rules for having all
-        # multi-part keywords in YANG models being hash separated
-        s = s.replace('watch-group', 'watch_group')
-        s = s.replace('watch-port', 'watch_port')
-        d1 = json.loads(s)
-        d2 = strip_none(d1)
-        payload = {self._mn: d2}
-        return json.dumps(payload, default=lambda o: o.__dict__,
-                          sort_keys=True, indent=4)
+    def get_payload(self, indent=4):
+        """ Return GroupEntry as a payload for the HTTP request body
+            (compact JSON with unsorted keys when 'indent' is None)
+        """
+        payload = {self._mn: self.to_yang_dict()}
+        if indent is None:
+            return json.dumps(payload)
+        return json.dumps(payload, sort_keys=True, indent=indent)
 
     def to_ofp_oxm_syntax(self):
         gl = []
@@ -4326,12 +5079,29 @@ class GroupEntry():
         bl = self.buckets['bucket']
         return sorted(bl, key=self._sort_buckets)
 
-
-class GroupBucket():
+    def get_referenced_group_ids(self):
+        """ Returns set of identifiers of the groups this group refers to
+            (by 'group' actions and watch groups of its buckets), these
+            groups have to exist before this group is created
+        """
+        ids = set()
+        for bucket in self.buckets['bucket']:
+            refs = [a.get_group_id() for a in bucket.get_actions()
+                    if isinstance(a, GroupAction)]
+            refs.append(bucket.get_watch_group())
+            for v in refs:
+                if v is not None and int(v) != OFPG_ANY:
+                    ids.add(int(v))
+        return ids
+
+
+class GroupBucket(CanonicalObject):
     """ Helper class for representing 'buckets' property
         of the GroupEntry class
     """
 
+    __slots__ = ('bucket_id', 'weight', 'watch_port', 'watch_group', 'action')
+
     def __attrs__(self):
         ''' Identifier (index) of the bucket within the group '''
         self.bucket_id = None
@@ -4362,8 +5132,14 @@ class GroupBucket():
 
     def __init_from_json__(self, js):
         if (js is not None and isinstance(js, basestring)):
-            obj = json.loads(js)
-            d = dict_keys_dashed_to_underscored(obj)
+            self.__init_from_dict__(json.loads(js))
+        else:
+            raise TypeError("[GroupBucket] wrong argument type '%s'"
+                            " (JSON 'string' is expected)" % type(js))
+
+    def __init_from_dict__(self, d):
+        if (d is not None and isinstance(d, dict)):
+            d = dict_keys_dashed_to_underscored(d)
             p1 = 'action'
             for k, v in d.items():
                 if (k == p1):
@@ -4385,31 +5161,26 @@ class GroupBucket():
                         msg = ("TODO -> unsupported data type '%s'" % type(v))
                         dbg_print(msg)
                 else:
-                    setattr(self, k, v)
-        else:
-            raise TypeError("[GroupBucket] wrong argument type '%s'"
-                            " (JSON 'string' is expected)" % type(js))
-
-    def __init_from_dict__(self, d):
-        if (d is not None and isinstance(d, dict)):
-            js = json.dumps(d)
-            self.__init_from_json__(js)
+                    self._setattr(k, v)
         else:
             raise TypeError("[GroupBucket] wrong argument type '%s'"
                             " ('dict' is expected)" % type(d))
 
     def to_string(self):
         """ Returns string representation of this object. """
-        return str(vars(self))
+        return str(obj_vars(self))
 
     def to_json(self):
         """ Return this object represented as JSON """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=obj_vars,
                           sort_keys=True, indent=4)
 
     def create_action_from_dict(self, d):
-        action = Instruction().create_action_from_dict(d)
-        return action
+        if isinstance(d, dict):
+            return decode_action(d)
+        else:
+            raise TypeError("[GroupBucket] wrong argument type '%s'"
+                            " ('dict' is expected)" % type(d))
 
     def to_ofp_oxm_syntax(self, skip_garbage=False):
         """ Controller returns value of 2**32-1 (4294967295)
@@ -4713,21 +5484,12 @@ class GroupStatistics():
 
     def to_json(self):
         """ Return this object as JSON """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=obj_vars,
                           sort_keys=True, indent=4)
 
     def to_yang_json(self, strip=False):
-        s = self.to_json()
-        # Convert all 'underscored' keywords to 'dash-separated' form used
-        # by ODL YANG models naming conventions
-        s = s.replace('_', '-')
-        if strip:
-            # ignore unassigned ("empty") attributes
-            d1 = json.loads(s)
-            d2 = strip_none(d1)
-            s = json.dumps(d2, sort_keys=True, indent=4)
-
-        return s
+        d = obj_to_yang_dict(self, strip=strip)
+        return json.dumps(d, sort_keys=True, indent=4)
 
     def get_group_id(self):
         return self.group_id
@@ -4831,21 +5593,12 @@ class GroupDescription():
 
     def to_json(self):
         """ Return this object as JSON """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=obj_vars,
                           sort_keys=True, indent=4)
 
     def to_yang_json(self, strip=False):
-        s = self.to_json()
-        # Convert all 'underscored' keywords to 'dash-separated' form used
-        # by ODL YANG models naming conventions
-        s = s.replace('_', '-')
-        if strip:
-            # ignore unassigned ("empty") attributes
-            d1 = json.loads(s)
-            d2 = strip_none(d1)
-            s = json.dumps(d2, sort_keys=True, indent=4)
-
-        return s
+        d = obj_to_yang_dict(self, strip=strip)
+        return json.dumps(d, sort_keys=True, indent=4)
 
     def get_id(self):
         return self.group_id
@@ -4908,7 +5661,7 @@ class QueueStats():
 
     def to_json(self):
         """ Return this object as JSON """
-        return json.dumps(self, default=lambda o: o.__dict__,
+        return json.dumps(self, default=obj_vars,
                           sort_keys=True, indent=4)
 
     def queue_id(self):
@@ -0,0 +1,137 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+reconcile.py: Difference between the desired and the configured sets of
+              OpenFlow flow table entries
+
+
+"""
+
+import hashlib
+
+from collections import OrderedDict
+
+from pybvc.common.utils import canonical_form, obj_vars
+
+# FlowEntry properties defining the flow behavior
+fingerprint_fields = ('match', 'instructions', 'priority', 'idle_timeout',
+                      'hard_timeout', 'cookie', 'flags')
+
+
+def flow_fingerprint(flow):
+    """ Returns hash of the 'FlowEntry' properties that define the flow
+        behavior (see 'fingerprint_fields'). Two flows with the same
+        fingerprint are the same flow from the switch point of view.
+    """
+    d = obj_vars(flow)
+    s = canonical_form(dict((k, d.get(k)) for k in fingerprint_fields))
+    return hashlib.sha1(s or '').hexdigest()
+
+
+def _flow_key(flow):
+    return (int(flow.get_flow_table_id()), str(flow.get_flow_id()))
+
+
+class FlowsDiff(object):
+    """ Changes needed to turn the configured flows into the desired ones:
+        flows to add, flows to modify, (table_id, flow_id) pairs of the
+        flows to delete and flows that are already configured as desired.
+    """
+
+    def __init__(self):
+        self.added = []
+        self.modified = []
+        self.deleted = []
+        self.unchanged = []
+        self.results = None
+
+    def get_added(self):
+        return self.added
+
+    def get_modified(self):
+        return self.modified
+
+    def get_deleted(self):
+        return self.deleted
+
+    def get_unchanged(self):
+        return self.unchanged
+
+    def get_results(self):
+        """ Returns 'BatchResult' of the applied changes (None if the
+            changes have not been applied)
+        """
+        return self.results
+
+    def is_empty(self):
+        """ Returns True if configured flows already match desired ones """
+        return not (self.added or self.modified or self.deleted)
+
+    def get_changes_count(self):
+        return len(self.added) + len(self.modified) + len(self.deleted)
+
+
+def diff_flows(desired, configured, prune=True):
+    """ Compares desired and configured 'FlowEntry' objects (flows are
+        identified by (table_id, flow_id) pair) and returns 'FlowsDiff'.
+        Configured flows that are not desired are deleted only when
+        'prune' is True.
+    """
+    diff = FlowsDiff()
+    current = {}
+    for flow in configured:
+        current[_flow_key(flow)] = flow
+    wanted = OrderedDict()
+    for flow in desired:
+        if flow.get_flow_id() is None or flow.get_flow_table_id() is None:
+            raise ValueError("[FlowsDiff] flow entry without "
+                             "'table_id' or 'id' can not be reconciled")
+        wanted[_flow_key(flow)] = flow
+    # fingerprints are computed on every comparison (once per flow), so
+    # flows modified since the previous one are compared by their content
+    for key, flow in wanted.iteritems():
+        cur = current.get(key)
+        if cur is None:
+            diff.added.append(flow)
+        elif flow_fingerprint(cur) != flow_fingerprint(flow):
+            diff.modified.append(flow)
+        else:
+            diff.unchanged.append(flow)
+    if prune:
+        diff.deleted = sorted(k for k in current if k not in wanted)
+    return diff
@@ -0,0 +1,344 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+statspoller.py: Periodic polling of OpenFlow switches statistics and
+                per-second rates of the statistics counters
+
+
+"""
+
+import time
+import random
+import threading
+
+from array import array
+
+from pybvc.common.result import BatchResult
+from pybvc.common.status import STATUS
+from pybvc.common.utils import concurrent_map, dbg_print
+
+# Kinds of the statistics data (see 'OFSwitch.get_statistics_counters')
+STATS_KINDS = ('port', 'queue', 'flow', 'group')
+
+# Moduli of the counters, the counters of some switches are 32 bit wide
+_moduli = (1 << 32, 1 << 64)
+
+
+def counter_delta(old, new):
+    """ Returns increment of the counter between two of its readings
+        taking into account wrap of 32 and 64 bit wide counters. Returns
+        None if the counter has been reset, i.e. its value decreased and
+        the decrease can not be explained by a wrap (the increment across
+        a wrap would be more than half of the counter range).
+    """
+    if new >= old:
+        return new - old
+    for modulus in _moduli:
+        if old < modulus:
+            delta = modulus - old + new
+            return delta if delta <= modulus // 2 else None
+    return None
+
+
+class CounterSeries(object):
+    """ Time series of the per-second rate of a statistics counter kept
+        in a fixed size ring buffer (the oldest samples are overwritten).
+        Rate is computed from the difference of the counter values in two
+        subsequent readings, the interval between the readings is taken
+        from the statistics duration (time the port, queue, flow or group
+        is alive on the switch) when it is reported, otherwise the time
+        between the readings is used.
+    """
+
+    __slots__ = ('capacity', 'times', 'rates', 'next', 'value',
+                 'duration', 'timestamp', 'wraps', 'resets')
+
+    def __init__(self, capacity=360):
+        """Initializes this object properties.
+
+        :param int capacity: Maximum number of the rate samples kept.
+        """
+        assert(capacity > 0)
+        self.capacity = capacity
+        self.times = array('d')
+        self.rates = array('d')
+        self.next = 0
+        self.value = None
+        self.duration = None
+        self.timestamp = None
+        self.wraps = 0
+        self.resets = 0
+
+    def __len__(self):
+        return len(self.rates)
+
+    def update(self, timestamp, value, duration=None):
+        """ Records the counter value read at the given time (seconds
+            since the epoch) and returns the new rate sample (None if
+            there is no new sample, e.g. for the very first reading or
+            if the switch did not refresh the statistics since the
+            previous reading).
+            The counter is considered reset (e.g. after the switch
+            reconnected to the Controller or the flow was re-installed)
+            if the duration went back or the counter value decreased
+            and it is not a wrap, in that case the rate is averaged over
+            the duration since the reset (no sample if duration is not
+            reported).
+        """
+        rate = None
+        if self.value is not None:
+            if duration is not None and self.duration is not None:
+                if duration == self.duration:
+                    return None
+                reset = duration < self.duration
+                interval = duration - self.duration
+            else:
+                reset = False
+                interval = timestamp - self.timestamp
+            delta = None if reset else counter_delta(self.value, value)
+            if delta is None:
+                self.resets += 1
+                if duration is not None and duration > 0:
+                    rate = value / float(duration)
+            elif interval > 0:
+                if value < self.value:
+                    self.wraps += 1
+                rate = delta / float(interval)
+        self.value = value
+        self.duration = duration
+        self.timestamp = timestamp
+        if rate is not None:
+            self._append(timestamp, rate)
+        return rate
+
+    def _append(self, timestamp, rate):
+        if len(self.rates) < self.capacity:
+            self.times.append(timestamp)
+            self.rates.append(rate)
+        else:
+            self.times[self.next] = timestamp
+            self.rates[self.next] = rate
+        self.next = (self.next + 1) % self.capacity
+
+    def _ordered(self, a):
+        if len(a) < self.capacity or self.next == 0:
+            return a[:]
+        return a[self.next:] + a[:self.next]
+
+    def get_times(self):
+        """ Returns times of the rate samples (oldest first) as array """
+        return self._ordered(self.times)
+
+    def get_rates(self):
+        """ Returns rate samples (oldest first) as array """
+        return self._ordered(self.rates)
+
+    def get_last_rate(self):
+        """ Returns the most recent rate sample (None if there is none) """
+        if not self.rates:
+            return None
+        return self.rates[self.next - 1]
+
+    def get_wraps_cnt(self):
+        return self.wraps
+
+    def get_resets_cnt(self):
+        return self.resets
+
+
+class StatsPoller(object):
+    """ Polls statistics of a set of OpenFlow switches (one request per
+        switch, up to 'max_workers' switches simultaneously) and keeps
+        per-second rates of the port, queue, flow and group counters as
+        time series (see 'CounterSeries'). Polling is done either by
+        calling 'poll' or by a background thread ('start'/'stop') that
+        polls every 'interval' seconds randomly shifted by up to 'jitter'
+        fraction of the interval (so that several pollers do not query
+        the Controller at the same moments).
+        Series are identified by the switch name, statistics kind ('port',
+        'queue', 'flow' or 'group'), object key (as in 'OFSwitch.
+        get_statistics_counters') and counter name. Series of the objects
+        no longer reported by a switch are discarded.
+
+        Example::
+
+            poller = StatsPoller([switch], interval=5)
+            poller.start()
+            ...
+            times, rates = poller.get_time_series(switch.name, 'port',
+                                                  1, 'rx_bytes')
+            poller.stop()
+    """
+
+    def __init__(self, switches, interval=10.0, jitter=0.1, capacity=360,
+                 kinds=STATS_KINDS, max_workers=10):
+        """Initializes this object properties.
+
+        :param list switches: 'OFSwitch' objects to poll.
+        :param float interval: Polling interval (in seconds).
+        :param float jitter: Maximum deviation of the polling interval
+                             (fraction of the interval).
+        :param int capacity: Number of rate samples kept for a counter.
+        :param tuple kinds: Kinds of the statistics to keep series for.
+        :param int max_workers: Maximum number of switches polled
+                                simultaneously.
+        """
+        self.switches = list(switches)
+        self.interval = interval
+        self.jitter = jitter
+        self.capacity = capacity
+        self.kinds = tuple(kinds)
+        self.max_workers = max_workers
+        self.rounds = 0
+        self._series = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """ Polls all switches once. Returns
+            :class:`pybvc.common.result.BatchResult` with the results of
+            the statistics retrieval keyed by switch names.
+        """
+        t0 = time.time()
+        results = concurrent_map(self._poll_switch, self.switches,
+                                 self.max_workers)
+        self.rounds += 1
+        names = [switch.name for switch in self.switches]
+        return BatchResult(names, results, time.time() - t0)
+
+    def _poll_switch(self, switch):
+        result = switch.get_statistics_counters()
+        if result.get_status().eq(STATUS.OK):
+            self._update(switch.name, time.time(), result.get_data())
+        return result
+
+    def _update(self, name, timestamp, counters):
+        with self._lock:
+            old = self._series.get(name, {})
+            series = {}
+            for kind in self.kinds:
+                for key, (duration, values) in counters[kind].iteritems():
+                    for counter, value in values.iteritems():
+                        k = (kind, key, counter)
+                        s = old.get(k)
+                        if s is None:
+                            s = CounterSeries(self.capacity)
+                        s.update(timestamp, value, duration)
+                        series[k] = s
+            self._series[name] = series
+
+    def start(self):
+        """ Starts polling the switches in background thread """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='StatsPoller')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """ Stops background polling (waits up to 'timeout' seconds for
+            the ongoing poll to complete)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        self._stop.wait(random.uniform(0, self.jitter * self.interval))
+        while not self._stop.is_set():
+            t0 = time.time()
+            try:
+                self.poll()
+            except Exception as e:
+                dbg_print("StatsPoller: poll failed (%r)" % e)
+            delay = self.interval * random.uniform(1 - self.jitter,
+                                                   1 + self.jitter)
+            self._stop.wait(max(0, delay - (time.time() - t0)))
+
+    def get_series_keys(self, name, kind=None):
+        """ Returns list of (kind, key, counter) series identifiers of
+            the switch (of the given statistics kind only if specified)
+        """
+        with self._lock:
+            keys = self._series.get(name, {}).keys()
+        if kind is not None:
+            keys = [k for k in keys if k[0] == kind]
+        return sorted(keys)
+
+    def get_time_series(self, name, kind, key, counter):
+        """ Returns (times, rates) arrays of the counter rate samples
+            (oldest first), None if there is no such series
+        """
+        with self._lock:
+            s = self._series.get(name, {}).get((kind, key, counter))
+            if s is None:
+                return None
+            return s.get_times(), s.get_rates()
+
+    def get_last_rates(self, name, kind):
+        """ Returns dictionary mapping (key, counter) to the most recent
+            rate of the counter for statistics of the given kind
+        """
+        rates = {}
+        with self._lock:
+            for k, s in self._series.get(name, {}).iteritems():
+                if k[0] == kind:
+                    rate = s.get_last_rate()
+                    if rate is not None:
+                        rates[k[1:]] = rate
+        return rates
+
+    def get_counter_anomalies(self, name):
+        """ Returns dictionary mapping (kind, key, counter) to the number
+            of wraps and resets ('wraps', 'resets') detected for the
+            counters of the switch (the counters without ones are
+            omitted)
+        """
+        anomalies = {}
+        with self._lock:
+            for k, s in self._series.get(name, {}).iteritems():
+                if s.wraps or s.resets:
+                    anomalies[k] = {'wraps': s.wraps, 'resets': s.resets}
+        return anomalies
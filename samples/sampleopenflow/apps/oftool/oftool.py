@@ -42,6 +42,7 @@ oftool.py: OpenFlow tool command line utility (sample application)
 """
 
 import json
+import time
 import yaml
 import argparse
 
@@ -56,6 +57,7 @@ from pybvc.openflowdev.ofswitch import (OFSwitch,
                                         GroupDescription,
                                         GroupStatistics,
                                         MeterFeatures)
+from pybvc.openflowdev.flowanalyzer import analyze_flows
 from pybvc.controller.topology import Topology, Node
 from pybvc.controller.inventory import (Inventory,
                                         OpenFlowCapableNode,
@@ -672,6 +674,62 @@ class FlowInfo():
 
         print "\n".strip()
 
+    def analyze_table(self, table_id, oper):
+        flow_entries = []
+        ofswitch = OFSwitch(self.ctrl, self.switchid)
+        if oper:
+            result = ofswitch.get_operational_FlowEntries(table_id)
+        else:
+            result = ofswitch.get_configured_FlowEntries(table_id)
+        status = result.get_status()
+        if(status.eq(STATUS.OK)):
+            flow_entries = result.get_data()
+        elif(status.eq(STATUS.DATA_NOT_FOUND)):
+            print "\n".strip()
+            print " Requested data not found"
+            print "\n".strip()
+            exit(0)
+        else:
+            print ("\n")
+            print ("!!!Error, reason: %s" % status.brief().lower())
+            exit(0)
+
+        t0 = time.time()
+        analysis = analyze_flows(flow_entries)
+        elapsed = time.time() - t0
+
+        print "\n".strip()
+        s = "Device Operational" if oper else "Controller Cached"
+        print (" Switch '%s' - %s Flows Analysis" % (self.switchid, s))
+        print "\n".strip()
+        print ("   Analyzed %s flows of table %s in %.3f seconds"
+               % (len(flow_entries), table_id, elapsed))
+        print "\n".strip()
+
+        if analysis.is_empty():
+            print "   No shadowed, redundant or conflicting flows found"
+            print "\n".strip()
+            return
+
+        sections = ((analysis.get_shadowed(), "Shadowed flows",
+                     "is shadowed by", ""),
+                    (analysis.get_redundant(), "Redundant flows",
+                     "is covered by", " with the same instructions"),
+                    (analysis.get_conflicting(), "Conflicting flows",
+                     "overlaps", " with different instructions"))
+        for pairs, title, verb, suffix in sections:
+            if not pairs:
+                continue
+            print " %s (%s):" % (title, len(pairs))
+            for flow, other in pairs:
+                print ("   flow '%s' (priority %s) %s flow '%s' "
+                       "(priority %s)%s" % (flow.get_flow_id(),
+                                            flow.get_flow_priority(), verb,
+                                            other.get_flow_id(),
+                                            other.get_flow_priority(),
+                                            suffix))
+            print "\n".strip()
+
 
 class GroupInfo():
     """ Methods to retrieve and display OpenFlow groups information """
@@ -943,6 +1001,8 @@ class OFToolParser(object):
                    "\n   show-topo       Show network topology information"
                    "\n   show-inv        Show inventory nodes information"
                    "\n   show-flow       Show OpenFlow flows information"
+                   "\n   analyze-flow    Find shadowed, redundant and "
+                   "conflicting flows"
                    "\n   clear-flow      Delete OpenFlow flows"
                    "\n   add-flow        Add OpenFlow flows"
                    "\n   show-group      Show OpenFlow groups information"
@@ -1105,6 +1165,53 @@ class OFToolParser(object):
         else:
             flow.show_table(args.table, args.oper, args.ofp)
 
+    def analyze_flow(self, options):
+        parser = argparse.ArgumentParser(
+            prog=self.prog,
+            # description='Analyze OpenFlow flows',
+            usage=("%(prog)s analyze-flow -s=SWITCHID|--switch=SWITCHID\n"
+                   "                           -t=TABLEID|--table=TABLEID\n"
+                   "                            [--config|--operational]"
+                   "\n\n"
+                   "Find flows of the table that are shadowed by higher "
+                   "priority flows,\nredundant or conflicting with other "
+                   "flows of the same priority\n\n"
+                   "\n\n"
+                   "Options:\n"
+                   "  -s, --switch    switch identifier\n"
+                   "  -t, --table     flow table id\n"
+                   "  --config        controller cached flows (default)\n"
+                   "  --operational   device operational flows\n"))
+        parser.add_argument('-s', '--switch', metavar="SWITCHID")
+        parser.add_argument('-t', '--table', metavar="TABLEID",
+                            type=self.positive_int)
+        group1 = parser.add_mutually_exclusive_group()
+        group1.add_argument('--config', action='store_true', default=True)
+        group1.add_argument('--oper', '--operational',
+                            action='store_true', dest='oper')
+        parser.add_argument('-U', action="store_true", dest="usage",
+                            help=argparse.SUPPRESS)
+        args = parser.parse_args(options)
+        if(args.usage):
+            parser.print_usage()
+            print "\n".strip()
+            return
+
+        if (args.switch is None):
+            msg = "option -s (or --switch) is required"
+            parser.error(msg)
+
+        if (args.table is None):
+            msg = "option -t (or --table) is required"
+            parser.error(msg)
+
+        print "\n".strip()
+        print " [Controller '%s']" % self.ctrl_cfg.to_string()
+        ctrl = Controller(self.ctrl_cfg.ip_addr, self.ctrl_cfg.tcp_port,
+                          self.ctrl_cfg.admin_name, self.ctrl_cfg.admin_pswd)
+        flow = FlowInfo(ctrl, args.switch)
+        flow.analyze_table(args.table, args.oper)
+
     def clear_flow(self, options):
         parser = argparse.ArgumentParser(
             prog=self.prog,
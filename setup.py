@@ -19,7 +19,8 @@ setup(
               ],
     install_requires=['requests>=1.0.0',
                       'PyYAML',
-                      'xmltodict'],
+                      'xmltodict',
+                      'websocket-client'],
     zip_safe=False,
     include_package_data=True,
     platforms='any',
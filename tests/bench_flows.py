@@ -0,0 +1,178 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+bench_flows.py: Measures FlowEntry decoding and encoding throughput
+
+Builds a synthetic flow table with the shape returned by the controller
+('flow-node-inventory:table' operational data) and reports how many
+flows per second are decoded into FlowEntry objects and how many
+FlowEntry objects per second are encoded into HTTP request payloads.
+Also reports the decoding rate of instructions carrying a mix of all
+supported action types.
+
+Usage: python bench_flows.py [number_of_flows] [repeat]
+"""
+
+import sys
+import time
+
+from pybvc.common.utils import dict_keys_dashed_to_underscored
+from pybvc.openflowdev.ofswitch import FlowEntry, Instruction
+
+
+def make_flow(i):
+    return {
+        "id": "flow%d" % i,
+        "table_id": 0,
+        "priority": 1000 + (i % 100),
+        "cookie": i,
+        "idle-timeout": 0,
+        "hard-timeout": 0,
+        "opendaylight-flow-statistics:flow-statistics": {
+            "packet-count": i * 3,
+            "byte-count": i * 300,
+            "duration": {"second": i % 3600, "nanosecond": 0}
+        },
+        "match": {
+            "in-port": "openflow:1:%d" % (i % 48 + 1),
+            "ethernet-match": {
+                "ethernet-type": {"type": 2048}
+            },
+            "ipv4-destination": "10.%d.%d.0/24" % ((i >> 8) & 255, i & 255)
+        },
+        "instructions": {
+            "instruction": [
+                {
+                    "order": 0,
+                    "apply-actions": {
+                        "action": [
+                            {"order": 0,
+                             "set-field": {"vlan-match": {
+                                 "vlan-id": {"vlan-id": i % 4094 + 1,
+                                             "vlan-id-present": True}}}},
+                            {"order": 1,
+                             "output-action": {
+                                 "output-node-connector": "%d" % (i % 48 + 1),
+                                 "max-length": 65535}}
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+
+
+ACTIONS = [
+    {"output-action": {"output-node-connector": "1", "max-length": 0}},
+    {"set-vlan-id-action": {"vlan-id": 10}},
+    {"set-vlan-pcp-action": {"vlan-pcp": 3}},
+    {"strip-vlan-action": {}},
+    {"set-dl-src-action": {"address": "00:00:00:00:00:01"}},
+    {"set-dl-dst-action": {"address": "00:00:00:00:00:02"}},
+    {"set-nw-src-action": {"ipv4-address": "10.0.0.1/32"}},
+    {"set-nw-dst-action": {"ipv4-address": "10.0.0.2/32"}},
+    {"set-nw-tos-action": {"tos": 8}},
+    {"set-tp-src-action": {"port": 80}},
+    {"set-tp-dst-action": {"port": 8080}},
+    {"set-mpls-ttl-action": {"mpls-ttl": 64}},
+    {"dec-mpls-ttl": {}},
+    {"push-vlan-action": {"ethernet-type": 33024}},
+    {"pop-vlan-action": {}},
+    {"push-mpls-action": {"ethernet-type": 34887}},
+    {"pop-mpls-action": {"ethernet-type": 2048}},
+    {"set-queue-action": {"queue-id": 1}},
+    {"group-action": {"group-id": 7}},
+    {"set-nw-ttl-action": {"nw-ttl": 32}},
+    {"dec-nw-ttl": {}},
+    {"set-field": {"ipv4-source": "10.1.1.1/32"}},
+    {"push-pbb-action": {"ethernet-type": 35047}},
+    {"pop-pbb-action": {}},
+    {"drop-action": {}}
+]
+
+
+def make_instruction(i, nactions=8):
+    actions = []
+    for n in range(nactions):
+        a = dict(ACTIONS[(i + n) % len(ACTIONS)])
+        a["order"] = n
+        actions.append(a)
+    return {"order": 0, "apply_actions": {"action": actions}}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    flows = [make_flow(i) for i in range(n)]
+
+    entries, best = timeit(lambda: [FlowEntry(flow_dict=d) for d in flows],
+                           repeat)
+    assert(len(entries) == n)
+    print ("decoded %d flows in %.3f sec (%.0f flows/sec)"
+           % (n, best, n / best))
+
+    payloads, best = timeit(lambda: [fe.get_payload() for fe in entries],
+                            repeat)
+    assert(len(payloads) == n)
+    print ("encoded %d flows in %.3f sec (%.0f flows/sec)"
+           % (n, best, n / best))
+
+    payloads, best = timeit(lambda: [fe.get_payload(indent=None)
+                                     for fe in entries], repeat)
+    print ("encoded %d flows (compact) in %.3f sec (%.0f flows/sec)"
+           % (n, best, n / best))
+
+    dl = [dict_keys_dashed_to_underscored(make_instruction(i))
+          for i in range(n)]
+    nactions = sum(len(d['apply_actions']['action']) for d in dl)
+    _, best = timeit(lambda: [Instruction(d=d) for d in dl], repeat)
+    print ("decoded %d actions in %.3f sec (%.0f actions/sec)"
+           % (nactions, best, nactions / best))
+
+
+def timeit(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.time()
+        res = func()
+        elapsed = time.time() - t0
+        if best is None or elapsed < best:
+            best = elapsed
+    return res, best
+
+
+if __name__ == "__main__":
+    main()
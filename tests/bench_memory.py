@@ -0,0 +1,108 @@
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+bench_memory.py: Measures memory footprint of FlowEntry objects
+
+Decodes a synthetic flow table (see 'bench_flows.py') into FlowEntry
+objects and reports memory used per flow, both as the growth of the
+process resident set size and as the deep size of the object tree.
+
+Usage: python bench_memory.py [number_of_flows]
+"""
+
+import gc
+import sys
+
+from bench_flows import make_flow
+from pybvc.openflowdev.ofswitch import FlowEntry
+
+
+def rss_bytes():
+    """ Current resident set size of this process (Linux only) """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * 4096
+    except IOError:
+        return None
+
+
+def deep_sizeof(obj, seen=None):
+    """ Total size of the object and everything reachable from it """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for k, v in obj.iteritems():
+            size += deep_sizeof(k, seen) + deep_sizeof(v, seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for i in obj:
+            size += deep_sizeof(i, seen)
+    else:
+        if hasattr(obj, '__dict__'):
+            size += deep_sizeof(obj.__dict__, seen)
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name not in ('__dict__', '__weakref__'):
+                    size += deep_sizeof(getattr(obj, name, None), seen)
+    return size
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    gc.collect()
+    rss0 = rss_bytes()
+    flows = [FlowEntry(flow_dict=make_flow(i)) for i in range(n)]
+    gc.collect()
+    rss1 = rss_bytes()
+
+    if rss0 is not None:
+        print ("process memory growth: %d bytes per flow"
+               % ((rss1 - rss0) / n))
+    # objects shared between flows (e.g. interned names) are counted once
+    sample = flows[:1000]
+    seen = set()
+    size = sum(deep_sizeof(fe, seen) for fe in sample) / len(sample)
+    print ("object tree size:      %d bytes per flow" % size)
+    print ("estimated for 500k flows: %.2f GB"
+           % (size * 500000 / float(1 << 30)))
+
+
+if __name__ == "__main__":
+    main()
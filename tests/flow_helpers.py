@@ -0,0 +1,75 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+@version: 1.1.0
+
+flow_helpers.py: FlowEntry factory shared by the unit tests
+
+"""
+
+from pybvc.openflowdev.ofswitch import (FlowEntry, Match, Instruction,
+                                        OutputAction)
+
+
+def make_flow(table_id, flow_id, priority, ipv4_dst=None, in_port=None,
+              cookie=None, out_port=None, pre_action=None):
+    """ Returns IPv4 'FlowEntry' matching the destination address and the
+        ingress port (when given). Apply actions instruction is added when
+        'out_port' is given (preceded by the data-less action of the
+        'pre_action' class, e.g. 'PopVlanHeaderAction', if given).
+    """
+    flow = FlowEntry()
+    flow.set_flow_table_id(table_id)
+    flow.set_flow_id(flow_id)
+    flow.set_flow_priority(priority)
+    flow.set_flow_cookie(cookie)
+    if out_port is not None:
+        instruction = Instruction(instruction_order=0)
+        actions = [OutputAction(port=out_port)]
+        if pre_action is not None:
+            actions.insert(0, pre_action())
+        for order, action in enumerate(actions):
+            action.set_order(order)
+            instruction.add_apply_action(action)
+        flow.add_instruction(instruction)
+    match = Match()
+    match.set_eth_type(2048)
+    if ipv4_dst:
+        match.set_ipv4_dst(ipv4_dst)
+    if in_port:
+        match.set_in_port(in_port)
+    flow.add_match(match)
+    return flow
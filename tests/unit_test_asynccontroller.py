@@ -0,0 +1,140 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import threading
+import time
+import unittest
+
+from pybvc.controller.asynccontroller import AsyncController
+from pybvc.common.status import STATUS
+
+
+def delayed(value, delay):
+    time.sleep(delay)
+    return value
+
+
+def failing():
+    raise ValueError("operation failed")
+
+
+class Recorder(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def record(self, value, delay=0):
+        time.sleep(delay)
+        self.calls.append(value)
+        return value
+
+
+class AsyncControllerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.actrl = AsyncController('127.0.0.1', '8181', 'admin', 'admin',
+                                     max_workers=4)
+
+    def tearDown(self):
+        self.actrl.close()
+
+    def test_AsyncControllerOptions(self):
+        actrl = AsyncController('127.0.0.1', '8181', 'admin', 'admin',
+                                max_workers=20, pool_connections=3,
+                                pool_block=True, validators_max_entries=16)
+        self.assertEqual(actrl.max_workers, 20)
+        self.assertEqual(actrl.pool_maxsize, 20)
+        self.assertEqual(actrl.pool_connections, 3)
+        self.assertTrue(actrl.pool_block)
+        self.assertIsNotNone(actrl._validators)
+        adapter = actrl._session.get_adapter('http://127.0.0.1:8181')
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertTrue(adapter._pool_block)
+        self.assertIsNone(self.actrl._validators)
+
+    def test_SubmitWaitAllOrder(self):
+        # Operations started first complete last, results are still
+        # reported in the order of the pending handles
+        pending = [self.actrl.submit(delayed, i, 0.05 * (4 - i))
+                   for i in range(4)]
+        self.assertEqual(self.actrl.wait_all(pending), [0, 1, 2, 3])
+
+    def test_AsyncProxy(self):
+        recorder = Recorder()
+        proxy = self.actrl.async_ops(recorder)
+        pending = [proxy.record(i, delay=0.01) for i in range(8)]
+        self.assertEqual(self.actrl.wait_all(pending), range(8))
+        self.assertEqual(sorted(recorder.calls), range(8))
+        self.assertIs(proxy.calls, recorder.calls)
+
+    def test_WaitAllReraise(self):
+        pending = [self.actrl.submit(delayed, 1, 0),
+                   self.actrl.submit(failing)]
+        self.assertRaises(ValueError, self.actrl.wait_all, pending)
+
+    def test_WaitAllTimeout(self):
+        event = threading.Event()
+        try:
+            pending = [self.actrl.submit(delayed, 1, 0),
+                       self.actrl.submit(event.wait)]
+            results = self.actrl.wait_all(pending, timeout=0.05)
+        finally:
+            event.set()
+        self.assertEqual(results[0], 1)
+        self.assertTrue(results[1].get_status().eq(STATUS.CONN_ERROR))
+
+    def test_Close(self):
+        recorder = Recorder()
+        for i in range(4):
+            self.actrl.submit(recorder.record, i, 0.05)
+        session = self.actrl._session
+        self.actrl.close()
+        # Started operations are completed before 'close' returns
+        self.assertEqual(sorted(recorder.calls), range(4))
+        self.assertIsNone(self.actrl._workers)
+        self.assertIsNot(self.actrl._session, session)
+        # Workers are restarted on demand
+        pending = self.actrl.submit(delayed, 5, 0)
+        self.assertEqual(self.actrl.wait_all([pending]), [5])
+
+
+if __name__ == '__main__':
+    unittest.main()
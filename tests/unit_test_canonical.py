@@ -0,0 +1,152 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import json
+import unittest
+
+from pybvc.openflowdev.ofswitch import (FlowEntry, Match, Instruction,
+                                        OutputAction, DropAction,
+                                        PopVlanHeaderAction, DecNwTTLAction,
+                                        StripVlanAction, SetVlanIdAction,
+                                        GroupEntry, GroupBucket)
+
+
+def make_group(group_id, ports):
+    group = GroupEntry(group_id, 'group-all')
+    for i, port in enumerate(ports):
+        bucket = GroupBucket(i)
+        bucket.add_action(OutputAction(order=0, port=port))
+        group.add_bucket(bucket)
+    return group
+
+
+def reload_group(group):
+    """ Same group as read back from the Controller (buckets in reverse
+        order, numbers encoded as strings)
+    """
+    d = json.loads(json.dumps(group.to_yang_dict()))
+    d['group-id'] = str(d['group-id'])
+    d['buckets']['bucket'].reverse()
+    return GroupEntry(group_dict=d)
+
+
+class CanonicalEqualityTests(unittest.TestCase):
+
+    def test_ActionEquality(self):
+        self.assertEqual(OutputAction(order=0, port=1),
+                         OutputAction(order='0', port='1'))
+        self.assertEqual(hash(PopVlanHeaderAction(order=0)),
+                         hash(PopVlanHeaderAction(order=0)))
+        self.assertNotEqual(OutputAction(order=0, port=1),
+                            OutputAction(order=0, port=2))
+        self.assertNotEqual(SetVlanIdAction(order=0, vid=10),
+                            SetVlanIdAction(order=0, vid=20))
+        # data-less actions of different types are never equal
+        actions = [DropAction(order=0), PopVlanHeaderAction(order=0),
+                   DecNwTTLAction(order=0), StripVlanAction(order=0)]
+        self.assertEqual(len(set(actions)), len(actions))
+        self.assertEqual(len(set(hash(a) for a in actions)), len(actions))
+
+    def test_NestedActionEquality(self):
+        instructions = []
+        for action_class in (DropAction, PopVlanHeaderAction,
+                             DecNwTTLAction, StripVlanAction):
+            instruction = Instruction(instruction_order=0)
+            instruction.add_apply_action(action_class(order=0))
+            instruction.add_apply_action(OutputAction(order=1, port=1))
+            instructions.append(instruction)
+        self.assertEqual(len(set(instructions)), len(instructions))
+        self.assertEqual(len(set(hash(i) for i in instructions)),
+                         len(instructions))
+        buckets = []
+        for action_class in (DropAction, PopVlanHeaderAction):
+            bucket = GroupBucket(0)
+            bucket.add_action(action_class(order=0))
+            buckets.append(bucket)
+        self.assertNotEqual(buckets[0], buckets[1])
+
+    def test_MatchEquality(self):
+        match = Match()
+        match.set_eth_type(2048)
+        match.set_ipv4_dst('10.0.0.0/8')
+        same = Match()
+        same.set_ipv4_dst('10.0.0.0/8')
+        same.set_eth_type('2048')
+        self.assertEqual(match, same)
+        self.assertEqual(hash(match), hash(same))
+        other = Match()
+        other.set_eth_type(2048)
+        other.set_ipv4_dst('10.1.0.0/16')
+        self.assertNotEqual(match, other)
+        self.assertEqual(len(set([match, same, other])), 2)
+
+    def test_GroupEntryEquality(self):
+        group = make_group(1, [1, 2])
+        same = reload_group(group)
+        self.assertEqual(group, same)
+        self.assertEqual(hash(group), hash(same))
+        self.assertNotEqual(group, make_group(1, [1, 3]))
+        self.assertNotEqual(group, make_group(2, [1, 2]))
+        self.assertEqual(len(set([group, same, make_group(2, [1, 2])])), 2)
+
+    def test_CanonicalCacheInvalidation(self):
+        match = Match()
+        match.set_eth_type(2048)
+        match.set_ipv4_dst('10.0.0.0/8')
+        flow = FlowEntry()
+        flow.set_flow_id('1')
+        flow.add_match(match)
+        same = FlowEntry(flow_dict=flow.to_yang_dict())
+        self.assertEqual(flow, same)
+        self.assertEqual(hash(flow), hash(same))
+        # nested object changed through its setter
+        match.set_ipv4_dst('10.1.0.0/16')
+        self.assertNotEqual(flow, same)
+        match.set_ipv4_dst('10.0.0.0/8')
+        self.assertEqual(flow, same)
+        # attribute assigned directly
+        same.priority = 100
+        same.reset_canonical()
+        self.assertNotEqual(flow, same)
+        self.assertNotEqual(hash(flow), hash(same))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -92,7 +92,7 @@ class ControllerTests(unittest.TestCase):
 
         return MockResponse({"key2": "value2"}, 200)
 
-    @mock.patch('requests.get', side_effect=mocked_requests_http_error)
+    @mock.patch('requests.Session.get', side_effect=mocked_requests_http_error)
     def test_ControllerGetSchemas_404(self, controller):
 
         print ("--------------------------------------------------------- ")
@@ -112,7 +112,8 @@ class ControllerTests(unittest.TestCase):
         # and verify the results: STATUS.HTTP_ERROR
         self.assertEquals(10, status.status_code)
 
-    @mock.patch('requests.get', side_effect=mocked_requests_empty_content)
+    @mock.patch('requests.Session.get',
+                side_effect=mocked_requests_empty_content)
     def test_ControllerGetSchemas_no_content(self, controller):
 
         print ("--------------------------------------------------------- ")
@@ -149,7 +150,8 @@ class ControllerTests(unittest.TestCase):
 
         return MockResponse({"key1": "value1"}, 200)
 
-    @mock.patch('requests.get', side_effect=mocked_requests_get_schemas)
+    @mock.patch('requests.Session.get',
+                side_effect=mocked_requests_get_schemas)
     def test_ControllerGetSchemas(self, controller):
 
         print ("--------------------------------------------------------- ")
@@ -195,7 +197,8 @@ class ControllerTests(unittest.TestCase):
 
         return MockResponse({"key1": "value1"}, 200)
 
-    @mock.patch('requests.get', side_effect=mocked_requests_get_nodes_list)
+    @mock.patch('requests.Session.get',
+                side_effect=mocked_requests_get_nodes_list)
     def test_ControllerGetNodeList(self, controller):
 
         print ("--------------------------------------------------------- ")
@@ -222,6 +225,173 @@ class ControllerTests(unittest.TestCase):
         # and verify the results
         self.assertEquals(3, len(nlist))
 
+    @mock.patch('requests.Session.put',
+                side_effect=mocked_requests_get_nodes_list)
+    @mock.patch('requests.Session.get',
+                side_effect=mocked_requests_get_nodes_list)
+    def test_ControllerResponseCache(self, mock_get, mock_put):
+
+        print ("--------------------------------------------------------- ")
+        print ("<< Test ControllerResponseCache Start")
+        print ("--------------------------------------------------------- ")
+
+        ctrl = Controller(self.ctrlIpAddr, self.ctrlPortNum, self.ctrlUname,
+                          self.ctrlPswd)
+        ctrl.enable_cache(ttl=60)
+        for i in range(3):
+            result = ctrl.get_nodes_operational_list()
+            self.assertEquals(3, len(result.get_data()))
+        self.assertEquals(1, mock_get.call_count)
+        self.assertEquals(2, ctrl.get_cache_stats()['hits'])
+
+        # write to a child of the cached path invalidates cached response
+        url = ctrl.get_node_config_url("vRouter") + "/table/0"
+        ctrl.http_put_request(url, data=None, headers=None)
+        ctrl.get_nodes_operational_list()
+        self.assertEquals(2, mock_get.call_count)
+
+    def mocked_requests_conditional_get(*args, **kwargs):
+        class MockResponse:
+            def __init__(self, status_code, content, headers):
+                self.status_code = status_code
+                self.reason = "_NoRealReason_"
+                self.content = content
+                self.headers = headers
+
+        etag = '"v1"'
+        if kwargs.get('headers') and \
+           kwargs['headers'].get('If-None-Match') == etag:
+            return MockResponse(304, '', {'ETag': etag})
+        return MockResponse(200, '{"nodes":{"node":[{"id":"vRouter"}]}}',
+                            {'ETag': etag})
+
+    @mock.patch('requests.Session.get',
+                side_effect=mocked_requests_conditional_get)
+    def test_ControllerConditionalGet(self, mock_get):
+
+        print ("--------------------------------------------------------- ")
+        print ("<< Test ControllerConditionalGet Start")
+        print ("--------------------------------------------------------- ")
+
+        ctrl = Controller(self.ctrlIpAddr, self.ctrlPortNum, self.ctrlUname,
+                          self.ctrlPswd, validators_max_entries=128)
+        for i in range(2):
+            result = ctrl.get_nodes_operational_list()
+            self.assertEquals(STATUS.OK, result.get_status().get_status_code())
+            self.assertEquals(['vRouter'], result.get_data())
+        self.assertEquals(2, mock_get.call_count)
+        headers = mock_get.call_args[1]['headers']
+        self.assertEquals('"v1"', headers['If-None-Match'])
+
+    @mock.patch('pybvc.controller.cache.json.loads', side_effect=json.loads)
+    @mock.patch('requests.Session.get',
+                side_effect=mocked_requests_conditional_get)
+    def test_ControllerConditionalGetDecoded(self, mock_get, mock_loads):
+
+        print ("--------------------------------------------------------- ")
+        print ("<< Test ControllerConditionalGetDecoded Start")
+        print ("--------------------------------------------------------- ")
+
+        ctrl = Controller(self.ctrlIpAddr, self.ctrlPortNum, self.ctrlUname,
+                          self.ctrlPswd)
+        ctrl.enable_conditional_get()
+        for i in range(3):
+            result = ctrl.build_inventory_object()
+            self.assertEquals(STATUS.OK, result.get_status().get_status_code())
+        self.assertEquals(3, mock_get.call_count)
+        self.assertEquals(1, mock_loads.call_count)
+
+        # Conditional requests are disabled by default
+        for ctrl in (Controller(self.ctrlIpAddr, self.ctrlPortNum,
+                                self.ctrlUname, self.ctrlPswd),
+                     Controller(self.ctrlIpAddr, self.ctrlPortNum,
+                                self.ctrlUname, self.ctrlPswd,
+                                validators_max_entries=0)):
+            for i in range(2):
+                result = ctrl.build_inventory_object()
+                self.assertEquals(STATUS.OK,
+                                  result.get_status().get_status_code())
+            self.assertFalse('If-None-Match' in
+                             (mock_get.call_args[1]['headers'] or {}))
+        self.assertEquals(3 + 4, mock_get.call_count)
+        self.assertEquals(1 + 4, mock_loads.call_count)
+
+    def mocked_requests_get_flows(*args, **kwargs):
+        class MockResponse:
+            def __init__(self, status_code, content):
+                self.status_code = status_code
+                self.reason = "_NoRealReason_"
+                self.content = content
+
+        # flow table 0 of 'openflow:2' is missing
+        if '/node/openflow:2/' in args[0]:
+            return MockResponse(404, '')
+        return MockResponse(200, '{"flow-node-inventory:table":'
+                                 '[{"id":0,"flow":[{"id":"f1"}]}]}')
+
+    @mock.patch('requests.Session.get', side_effect=mocked_requests_get_flows)
+    def test_ControllerFanOut(self, mock_get):
+
+        print ("--------------------------------------------------------- ")
+        print ("<< Test ControllerFanOut Start")
+        print ("--------------------------------------------------------- ")
+
+        ctrl = Controller(self.ctrlIpAddr, self.ctrlPortNum, self.ctrlUname,
+                          self.ctrlPswd)
+        nodes = ['openflow:3', 'openflow:1', 'openflow:2']
+        result = ctrl.fan_out(nodes, 'get_flows', args=(0,),
+                              kwargs={'operational': False}, max_workers=2)
+        self.assertEquals(STATUS.DATA_NOT_FOUND,
+                          result.get_status().get_status_code())
+        batch = result.get_data()
+        rmap = batch.get_results_map()
+        self.assertEquals(nodes, rmap.keys())
+        self.assertEquals([STATUS.OK, STATUS.OK, STATUS.DATA_NOT_FOUND],
+                          [r.get_status().get_status_code()
+                           for r in rmap.values()])
+        self.assertEquals([{'id': 'f1'}], rmap['openflow:1'].get_data())
+        self.assertEquals(3, mock_get.call_count)
+        for url in [args[0] for args, kw in mock_get.call_args_list]:
+            self.assertTrue('/restconf/config/' in url)
+        self.assertEquals(['openflow:3', 'openflow:1'],
+                          batch.get_succeeded())
+        stats = batch.get_latency_stats()
+        self.assertEquals(['avg', 'max', 'min', 'p50', 'p95'],
+                          sorted(stats.keys()))
+        self.assertTrue(stats['min'] <= stats['p50'] <= stats['max'])
+
+    def test_ControllerFanOutErrors(self):
+
+        print ("--------------------------------------------------------- ")
+        print ("<< Test ControllerFanOutErrors Start")
+        print ("--------------------------------------------------------- ")
+
+        def operation(device, delay):
+            if device.name == 'openflow:2':
+                raise ValueError(device.name)
+            if device.name == 'openflow:3':
+                time.sleep(delay)
+            return device.name.upper()
+
+        ctrl = Controller(self.ctrlIpAddr, self.ctrlPortNum, self.ctrlUname,
+                          self.ctrlPswd)
+        nodes = ['openflow:1', 'openflow:2', 'openflow:3']
+        result = ctrl.fan_out(nodes, operation, args=(1.0,), timeout=0.2)
+        rmap = result.get_data().get_results_map()
+        # value returned by the operation is wrapped into a 'Result'
+        self.assertEquals(STATUS.OK,
+                          rmap['openflow:1'].get_status().get_status_code())
+        self.assertEquals('OPENFLOW:1', rmap['openflow:1'].get_data())
+        # exception raised on a node is reported as its result
+        self.assertEquals(STATUS.UNKNOWN,
+                          rmap['openflow:2'].get_status().get_status_code())
+        self.assertTrue(isinstance(rmap['openflow:2'].get_data(),
+                                   ValueError))
+        # node that did not complete in time
+        self.assertEquals(STATUS.CONN_ERROR,
+                          rmap['openflow:3'].get_status().get_status_code())
+        self.assertTrue(result.get_data().get_elapsed_time() < 1.0)
+
 
 if __name__ == '__main__':
     # unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import unittest
+
+from pybvc.openflowdev.flowanalyzer import analyze_flows
+from pybvc.openflowdev.ofswitch import (DropAction, PopVlanHeaderAction,
+                                        DecNwTTLAction)
+from flow_helpers import make_flow
+
+
+def flow_ids(pairs):
+    return [(f.get_flow_id(), o.get_flow_id()) for f, o in pairs]
+
+
+class FlowAnalyzerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.analysis = analyze_flows([
+            make_flow(0, 'a', 300, '10.0.0.0/8', out_port=1),
+            make_flow(0, 'b', 200, '10.1.0.0/16', out_port=2),
+            make_flow(0, 'c', 200, '10.2.0.0/16', out_port=1),
+            make_flow(0, 'd', 100, '192.168.0.0/16', out_port=3),
+            make_flow(0, 'e', 150, '192.168.1.0/24', out_port=3),
+            make_flow(0, 'f', 150, '172.16.0.0/12', out_port=4),
+            make_flow(0, 'g', 150, '172.16.0.0/16', 'openflow:1:2',
+                      out_port=5),
+            make_flow(0, 'h', 150, '172.16.0.0/12', out_port=4),
+            make_flow(0, 'i', 120, '192.168.2.0/24', out_port=3),
+            make_flow(0, 'j', 110, '192.168.2.0/25', out_port=6),
+            make_flow(0, 'k', 130, '192.168.2.0/26', out_port=3),
+            make_flow(1, 'l', 50, '10.0.0.0/8', out_port=7)])
+
+    def test_FlowAnalyzerShadowed(self):
+        self.assertEqual(flow_ids(self.analysis.get_shadowed()),
+                         [('b', 'a'), ('j', 'i')])
+
+    def test_FlowAnalyzerRedundant(self):
+        # 'k' is covered by 'd' as well, but 'j' is in between
+        self.assertEqual(flow_ids(self.analysis.get_redundant()),
+                         [('c', 'a'), ('e', 'd'), ('h', 'f'), ('k', 'i')])
+
+    def test_FlowAnalyzerConflicting(self):
+        self.assertEqual(flow_ids(self.analysis.get_conflicting()),
+                         [('f', 'g'), ('g', 'h')])
+
+    def test_FlowAnalyzerActionType(self):
+        # flows differing only in a data-less action have different actions
+        analysis = analyze_flows([
+            make_flow(0, 'a', 200, '10.0.0.0/8', out_port=1,
+                      pre_action=DropAction),
+            make_flow(0, 'b', 100, '10.1.0.0/16', out_port=1,
+                      pre_action=PopVlanHeaderAction),
+            make_flow(0, 'c', 150, '172.16.0.0/12', out_port=1,
+                      pre_action=DecNwTTLAction),
+            make_flow(0, 'd', 150, '172.16.0.0/16', 'openflow:1:2',
+                      out_port=1, pre_action=PopVlanHeaderAction)])
+        self.assertEqual(flow_ids(analysis.get_shadowed()), [('b', 'a')])
+        self.assertEqual(analysis.get_redundant(), [])
+        self.assertEqual(flow_ids(analysis.get_conflicting()), [('c', 'd')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import unittest
+
+from pybvc.openflowdev.flowindex import FlowTableIndex
+from flow_helpers import make_flow
+
+
+class FlowTableIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FlowTableIndex([
+            make_flow(0, '1', 100, '10.0.0.0/8', 'openflow:1:1', 7),
+            make_flow(0, '2', 200, '10.1.0.0/16', 'openflow:1:1'),
+            make_flow(0, '3', 300, '10.1.2.3/32', 'openflow:1:2', 7),
+            make_flow(1, '4', 400, '10.1.2.0/24')])
+
+    def test_FlowTableIndexFind(self):
+        index = self.index
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.get_flow(0, '2').get_flow_priority(), 200)
+        self.assertIsNone(index.get_flow(1, '2'))
+        ids = [f.get_flow_id() for f in index.get_flows_by_cookie(7)]
+        self.assertEqual(ids, ['3', '1'])
+        ids = [f.get_flow_id() for f in index.find_flows(0, in_port=1)]
+        self.assertEqual(ids, ['2', '1'])
+        ids = [f.get_flow_id()
+               for f in index.find_flows(ipv4_dst='10.1.0.5/16')]
+        self.assertEqual(ids, ['2'])
+        self.assertEqual(index.find_flows(0, eth_type=0x86dd), [])
+
+    def test_FlowTableIndexLookupPrefix(self):
+        index = self.index
+        ids = [f.get_flow_id() for f in index.lookup_ipv4_dst('10.1.2.3')]
+        self.assertEqual(ids, ['3', '4', '2', '1'])
+        ids = [f.get_flow_id()
+               for f in index.lookup_ipv4_dst('10.1.9.9', table_id=0,
+                                              in_port='1')]
+        self.assertEqual(ids, ['2', '1'])
+        self.assertEqual(index.lookup_ipv4_dst('11.0.0.1'), [])
+
+    def test_FlowTableIndexUpdate(self):
+        index = self.index
+        index.add_flow(make_flow(0, '2', 250, '10.2.0.0/16', 'openflow:1:3'))
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.find_flows(in_port=1)[0].get_flow_id(), '1')
+        ids = [f.get_flow_id() for f in index.lookup_ipv4_dst('10.2.0.1')]
+        self.assertEqual(ids, ['2', '1'])
+        self.assertIsNotNone(index.remove_flow(0, '1'))
+        self.assertIsNone(index.remove_flow(0, '1'))
+        self.assertEqual(index.find_flows(in_port=1), [])
+        ids = [f.get_flow_id() for f in index.lookup_ipv4_dst('10.2.0.1')]
+        self.assertEqual(ids, ['2'])
+        self.assertNotIn((0, '1'), index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import json
+import threading
+import unittest
+
+import mock
+
+from pybvc.controller.controller import Controller
+from pybvc.controller.inventory import InventoryMirror
+from pybvc.common.status import STATUS
+
+NODES_URL = ('http://127.0.0.1:8181/restconf/operational/'
+             'opendaylight-inventory:nodes')
+
+
+class MockResponse(object):
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+def node_dict(node_id, tables):
+    return {'id': node_id,
+            'flow-node-inventory:table': [
+                {'id': t, 'flow': [{'id': f} for f in flows]}
+                for t, flows in tables.iteritems()]}
+
+
+def notification(*events):
+    """ Inventory change notification, events are (operation, node id,
+        table id, flow id) tuples (table and flow ids are None for node
+        events)
+    """
+    s = ''
+    for op, node_id, table_id, flow_id in events:
+        path = "/inv:nodes/inv:node[inv:id='%s']" % node_id
+        if flow_id is not None:
+            path += ("/flownode:table[flownode:id='%s']"
+                     "/flownode:flow[flownode:id='%s']" % (table_id, flow_id))
+        s += ('<data-change-event><path '
+              'xmlns:inv="urn:opendaylight:inventory" '
+              'xmlns:flownode="urn:opendaylight:flow:inventory">%s</path>'
+              '<operation>%s</operation></data-change-event>' % (path, op))
+    return ('<notification xmlns="urn:ietf:params:xml:ns:netconf:'
+            'notification:1.0"><eventTime>2015-01-01T00:00:00Z</eventTime>'
+            '<data-changed-notification xmlns="urn:opendaylight:params:xml:'
+            'ns:yang:controller:md:sal:remote">%s</data-changed-notification>'
+            '</notification>' % s)
+
+
+class InventoryMirrorTests(unittest.TestCase):
+
+    def setUp(self):
+        # node id -> {table id -> flow ids}, the Controller's inventory
+        self.nodes = {'openflow:1': {0: ['a', 'b'], 1: ['c']},
+                      'openflow:2': {0: ['x']}}
+        self.on_get = None
+        self.ctrl = Controller('127.0.0.1', '8181', 'admin', 'admin')
+        self.ctrl.http_get_request = mock.Mock(side_effect=self.get)
+        self.mirror = InventoryMirror(self.ctrl)
+
+    def get(self, url, data=None, headers=None, **kwargs):
+        if self.on_get is not None:
+            self.on_get(url)
+        if url == NODES_URL:
+            nodes = [node_dict(k, v) for k, v in self.nodes.iteritems()]
+            return MockResponse(200, json.dumps({'nodes': {'node': nodes}}))
+        node_id = url.split('/')[-1]
+        if node_id in self.nodes:
+            d = node_dict(node_id, self.nodes[node_id])
+            return MockResponse(200, json.dumps({'node': [d]}))
+        return MockResponse(404, '')
+
+    def test_Resync(self):
+        result = self.mirror.resync()
+        self.assertEqual(STATUS.OK, result.get_status().get_status_code())
+        view = self.mirror.get_view()
+        self.assertEqual(['openflow:1', 'openflow:2'],
+                         sorted(view.get_openflow_node_ids()))
+        self.assertEqual(4, view.get_flows_cnt())
+        self.assertEqual(['a', 'b'],
+                         sorted(view.get_flow_ids('openflow:1', 0)))
+        self.assertEqual(1, self.mirror.get_resyncs_cnt())
+
+    def test_ApplyFlowChanges(self):
+        self.mirror.resync()
+        old = self.mirror.get_view()
+        calls = self.ctrl.http_get_request.call_count
+        result = self.mirror.apply_notification(notification(
+            ('created', 'openflow:1', 0, 'd'),
+            ('deleted', 'openflow:1', 1, 'c')))
+        self.assertEqual(STATUS.OK, result.get_status().get_status_code())
+        self.assertEqual(calls, self.ctrl.http_get_request.call_count)
+        view = self.mirror.get_view()
+        self.assertEqual(3, view.get_flows_cnt('openflow:1'))
+        self.assertTrue(view.has_flow('openflow:1', 0, 'd'))
+        self.assertFalse(view.has_flow('openflow:1', 1, 'c'))
+        # the old view is not changed
+        self.assertEqual(3, old.get_flows_cnt('openflow:1'))
+        self.assertFalse(old.has_flow('openflow:1', 0, 'd'))
+
+    def test_ApplyNodeChanges(self):
+        self.mirror.resync()
+        self.nodes['openflow:3'] = {0: ['q']}
+        locked = []
+
+        def try_lock():
+            if self.mirror._lock.acquire(False):
+                self.mirror._lock.release()
+                locked.append(False)
+            else:
+                locked.append(True)
+
+        def check_lock(url):
+            # the node is retrieved without the mirror's lock held
+            t = threading.Thread(target=try_lock)
+            t.start()
+            t.join()
+
+        self.on_get = check_lock
+        self.mirror.apply_notification(notification(
+            ('created', 'openflow:3', None, None),
+            ('deleted', 'openflow:2', None, None)))
+        self.assertEqual([False], locked)
+        view = self.mirror.get_view()
+        self.assertEqual(['openflow:1', 'openflow:3'],
+                         sorted(view.get_openflow_node_ids()))
+        self.assertEqual(1, view.get_flows_cnt('openflow:3'))
+        self.assertEqual(1, self.mirror.get_resyncs_cnt())
+
+    def test_GapResync(self):
+        self.mirror.resync()
+        self.nodes['openflow:4'] = {0: ['z']}
+        # flow of a node the mirror does not know about
+        self.mirror.apply_notification(notification(
+            ('created', 'openflow:4', 0, 'z')))
+        self.assertEqual(2, self.mirror.get_resyncs_cnt())
+        self.assertEqual(1, self.mirror.get_divergence())
+        self.assertTrue(self.mirror.get_view().has_flow('openflow:4', 0,
+                                                        'z'))
+
+    def test_ReplayDuringResync(self):
+        self.mirror.resync()
+        entered = threading.Event()
+        release = threading.Event()
+
+        def block(url):
+            if url == NODES_URL:
+                entered.set()
+                release.wait()
+
+        self.on_get = block
+        t = threading.Thread(target=self.mirror.resync)
+        t.start()
+        entered.wait()
+        self.on_get = None
+        self.mirror.apply_notification(notification(
+            ('created', 'openflow:1', 5, 'late')))
+        release.set()
+        t.join()
+        self.assertEqual(2, self.mirror.get_resyncs_cnt())
+        self.assertFalse(self.mirror.is_stale())
+        self.assertTrue(self.mirror.get_view().has_flow('openflow:1', 5,
+                                                        'late'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import sys
+import time
+import types
+import unittest
+
+import mock
+
+try:
+    import websocket  # noqa
+except ImportError:
+    # the listener is tested with a fake websocket connection
+    websocket = types.ModuleType('websocket')
+    websocket.create_connection = None
+    websocket.WebSocketTimeoutException = type('WebSocketTimeoutException',
+                                               (Exception,), {})
+    sys.modules['websocket'] = websocket
+
+from pybvc.controller import listener
+from pybvc.controller.controller import Controller
+from pybvc.controller.listener import NotificationListener
+from pybvc.common.result import Result
+from pybvc.common.status import OperStatus, STATUS
+
+
+def notification(i):
+    """ Topology change notification reporting added switch 'openflow:i' """
+    path = ("/nt:network-topology/nt:topology[nt:topology-id='flow:1']"
+            "/nt:node[nt:node-id='openflow:%d']/nt:node-id" % i)
+    return ('<notification xmlns="urn:ietf:params:xml:ns:netconf:'
+            'notification:1.0"><eventTime>2015-01-01T00:00:00Z</eventTime>'
+            '<data-changed-notification xmlns="urn:opendaylight:params:xml:'
+            'ns:yang:controller:md:sal:remote"><data-change-event>'
+            '<path xmlns:nt="urn:TBD:params:xml:ns:yang:network-topology">'
+            '%s</path><operation>created</operation></data-change-event>'
+            '</data-changed-notification></notification>' % path)
+
+
+class MockWebSocket(object):
+    """ Connection returning the given messages, then timing out
+        ('None' message stands for a lost connection)
+    """
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    def recv(self):
+        if self.messages:
+            message = self.messages.pop(0)
+            if message is None:
+                raise IOError('connection lost')
+            return message
+        time.sleep(0.01)
+        raise listener.WebSocketTimeoutException()
+
+    def close(self):
+        pass
+
+
+def switch_ids(notifications):
+    return [n.switches_added()[0] for n in notifications]
+
+
+class NotificationListenerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.ctrl = Controller('127.0.0.1', '8181', 'admin', 'admin')
+        self.ctrl.create_data_change_event_subscription = mock.Mock(
+            return_value=Result(OperStatus(STATUS.OK), 'stream1'))
+        self.ctrl.subscribe_to_stream = mock.Mock(
+            return_value=Result(OperStatus(STATUS.OK), 'ws://stream1'))
+        # messages of the consecutive connections
+        self.connections = []
+        self.gaps = []
+        patcher = mock.patch.object(listener, 'create_connection',
+                                    side_effect=self.create_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_connection(self, url, timeout=None):
+        if self.connections:
+            return MockWebSocket(self.connections.pop(0))
+        return MockWebSocket([])
+
+    def start_listener(self, **kwargs):
+        nl = NotificationListener.for_topology(self.ctrl, recv_timeout=0.05,
+                                               reconnect_delay=0.01,
+                                               **kwargs)
+        nl.add_gap_handler(lambda: self.gaps.append(1))
+        nl.start()
+        self.addCleanup(nl.stop)
+        return nl
+
+    def wait_for(self, condition, timeout=5.0):
+        t0 = time.time()
+        while not condition():
+            self.assertTrue(time.time() - t0 < timeout)
+            time.sleep(0.01)
+
+    def test_Reconnect(self):
+        self.connections = [[notification(i) for i in range(3)] + [None],
+                            [notification(i) for i in range(3, 5)]]
+        nl = self.start_listener(workers=2)
+        got = [nl.get(timeout=5.0) for i in range(5)]
+        self.assertEqual(['openflow:%d' % i for i in range(5)],
+                         switch_ids(got))
+        stats = nl.get_stats()
+        self.assertEqual(2, stats['connects'])
+        self.assertEqual(5, stats['received'])
+        self.assertEqual(5, stats['enqueued'])
+        self.assertEqual(0, stats['queued'])
+        # notifications may have been missed while reconnecting
+        self.assertEqual([1], self.gaps)
+        self.assertEqual('ws://stream1', nl.get_stream_location())
+
+    def test_OverflowBlock(self):
+        self.connections = [[notification(i) for i in range(5)]]
+        nl = self.start_listener(queue_size=2)
+        self.wait_for(lambda: nl.get_stats()['queued'] == 2)
+        time.sleep(0.1)
+        # the listener waits for the consumer
+        self.assertEqual(2, nl.get_stats()['enqueued'])
+        got = [nl.get(timeout=5.0) for i in range(5)]
+        self.assertEqual(['openflow:%d' % i for i in range(5)],
+                         switch_ids(got))
+        self.assertEqual(0, nl.get_stats()['dropped'])
+        self.assertEqual([], self.gaps)
+
+    def test_OverflowDropNewest(self):
+        self.connections = [[notification(i) for i in range(5)]]
+        nl = self.start_listener(queue_size=2, overflow='drop_newest')
+        self.wait_for(lambda: nl.get_stats()['dropped'] == 3)
+        nl.stop()
+        self.assertEqual(['openflow:0', 'openflow:1'], switch_ids(nl))
+        self.assertEqual(2, nl.get_stats()['enqueued'])
+        self.assertEqual(3, len(self.gaps))
+
+    def test_OverflowDropOldest(self):
+        self.connections = [[notification(i) for i in range(5)]]
+        nl = self.start_listener(queue_size=2, overflow='drop_oldest')
+        self.wait_for(lambda: nl.get_stats()['dropped'] == 3)
+        nl.stop()
+        self.assertEqual(['openflow:3', 'openflow:4'], switch_ids(nl))
+        self.assertEqual(5, nl.get_stats()['enqueued'])
+        self.assertEqual(3, len(self.gaps))
+
+
+if __name__ == '__main__':
+    unittest.main()
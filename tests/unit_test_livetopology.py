@@ -0,0 +1,178 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import json
+import urllib
+import unittest
+
+import mock
+
+from pybvc.controller.controller import Controller
+from pybvc.controller.topology import LiveTopology
+from pybvc.common.status import STATUS
+
+TOPOLOGY_URL = ('http://127.0.0.1:8181/restconf/operational/'
+                'network-topology:network-topology/topology/flow:1')
+
+
+class MockResponse(object):
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+def switch_link(a, a_port, b, b_port):
+    return {'link-id': '%s:%s' % (a, a_port),
+            'source': {'source-node': a,
+                       'source-tp': '%s:%s' % (a, a_port)},
+            'destination': {'dest-node': b,
+                            'dest-tp': '%s:%s' % (b, b_port)}}
+
+
+def notification(*events):
+    """ Topology change notification, events are (operation, element
+        kind ('node' or 'link'), element id) tuples
+    """
+    s = ''
+    for op, kind, element_id in events:
+        path = ("/nt:network-topology/nt:topology[nt:topology-id='flow:1']"
+                "/nt:%s[nt:%s-id='%s']/nt:%s-id" %
+                (kind, kind, element_id, kind))
+        s += ('<data-change-event><path xmlns:nt="urn:TBD:params:xml:ns:'
+              'yang:network-topology">%s</path><operation>%s</operation>'
+              '</data-change-event>' % (path, op))
+    return ('<notification xmlns="urn:ietf:params:xml:ns:netconf:'
+            'notification:1.0"><eventTime>2015-01-01T00:00:00Z</eventTime>'
+            '<data-changed-notification xmlns="urn:opendaylight:params:xml:'
+            'ns:yang:controller:md:sal:remote">%s</data-changed-notification>'
+            '</notification>' % s)
+
+
+class LiveTopologyTests(unittest.TestCase):
+
+    def setUp(self):
+        # the Controller's topology
+        self.nodes = {}
+        self.links = {}
+        self.add_switch(1)
+        self.add_switch(2)
+        self.add_links(1, 1, 2, 1)
+        self.ctrl = Controller('127.0.0.1', '8181', 'admin', 'admin')
+        self.ctrl.http_get_request = mock.Mock(side_effect=self.get)
+        self.live = LiveTopology(self.ctrl)
+
+    def add_switch(self, i):
+        node_id = 'openflow:%d' % i
+        self.nodes[node_id] = {'node-id': node_id}
+
+    def add_links(self, a, a_port, b, b_port):
+        a, b = 'openflow:%d' % a, 'openflow:%d' % b
+        for d in (switch_link(a, a_port, b, b_port),
+                  switch_link(b, b_port, a, a_port)):
+            self.links[d['link-id']] = d
+
+    def get(self, url, data=None, headers=None, **kwargs):
+        if url == TOPOLOGY_URL:
+            d = {'topology': [{'topology-id': 'flow:1',
+                               'node': self.nodes.values(),
+                               'link': self.links.values()}]}
+            return MockResponse(200, json.dumps(d))
+        kind, element_id = url[len(TOPOLOGY_URL) + 1:].split('/', 1)
+        d = (self.nodes if kind == 'node' else self.links).get(
+            urllib.unquote(element_id))
+        if d is None:
+            return MockResponse(404, '')
+        return MockResponse(200, json.dumps({kind: [d]}))
+
+    def test_Resync(self):
+        result = self.live.resync()
+        self.assertEqual(STATUS.OK, result.get_status().get_status_code())
+        topo = self.live.get_topology()
+        self.assertEqual(2, topo.get_switches_cnt())
+        self.assertEqual(1, topo.get_inter_switch_links_cnt())
+        self.assertFalse(self.live.is_stale())
+
+    def test_ApplyChanges(self):
+        self.live.resync()
+        self.add_switch(3)
+        self.add_links(2, 2, 3, 1)
+        calls = self.ctrl.http_get_request.call_count
+        result = self.live.apply_notification(notification(
+            ('created', 'node', 'openflow:3'),
+            ('created', 'link', 'openflow:2:2'),
+            ('created', 'link', 'openflow:3:1')))
+        self.assertEqual(STATUS.OK, result.get_status().get_status_code())
+        # one request per added element
+        self.assertEqual(calls + 3, self.ctrl.http_get_request.call_count)
+        topo = self.live.get_topology()
+        self.assertEqual(3, topo.get_switches_cnt())
+        self.assertEqual(2, topo.get_inter_switch_links_cnt())
+        path = topo.get_shortest_path('openflow:1', 'openflow:3')
+        self.assertEqual(['openflow:1', 'openflow:2', 'openflow:3'],
+                         path.get_node_ids())
+
+        self.live.apply_notification(notification(
+            ('deleted', 'link', 'openflow:2:2'),
+            ('deleted', 'link', 'openflow:3:1'),
+            ('deleted', 'node', 'openflow:3')))
+        self.assertEqual(2, topo.get_switches_cnt())
+        self.assertEqual(1, topo.get_inter_switch_links_cnt())
+        self.assertEqual(2, self.live.get_updates_cnt())
+        self.assertEqual(1, self.live.get_resyncs_cnt())
+
+    def test_GapResync(self):
+        self.live.resync()
+        self.add_switch(4)
+        self.add_links(1, 4, 4, 1)
+        # link to a node the topology does not know about
+        self.live.apply_notification(notification(
+            ('created', 'link', 'openflow:1:4')))
+        self.assertEqual(2, self.live.get_resyncs_cnt())
+        self.assertEqual(3, self.live.get_topology().get_switches_cnt())
+
+        self.live.invalidate()
+        self.assertTrue(self.live.is_stale())
+        self.live.apply_notification(notification())
+        self.assertEqual(3, self.live.get_resyncs_cnt())
+        self.assertFalse(self.live.is_stale())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,437 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import json
+import unittest
+
+import mock
+
+from pybvc.controller.controller import Controller
+from pybvc.openflowdev.ofswitch import (OFSwitch, FlowEntry, GroupEntry,
+                                        GroupBucket, GroupAction,
+                                        OutputAction, Instruction, Match)
+from pybvc.common.status import STATUS
+
+from flow_helpers import make_flow
+
+# Flow as returned by the Controller (operational data store)
+FLOW = {
+    'id': 'flow1', 'table_id': 0, 'priority': 100, 'cookie': 7,
+    'hard-timeout': 0, 'idle-timeout': 0, 'flags': '',
+    'match': {'ethernet-match': {'ethernet-type': {'type': 2048}},
+              'ipv4-destination': '10.0.0.1/32',
+              'in-port': 'openflow:1:1'},
+    'instructions': {'instruction': [
+        {'order': 0,
+         'apply-actions': {'action': [
+             {'order': 0, 'pop-vlan-action': {}},
+             {'order': 1,
+              'output-action': {'output-node-connector': '1',
+                                'max-length': 65535}}]}}]},
+    'opendaylight-flow-statistics:flow-statistics': {
+        'packet-count': 10, 'byte-count': 1000,
+        'duration': {'second': 5, 'nanosecond': 0}}}
+
+
+class FlowEntryTests(unittest.TestCase):
+
+    def test_FlowEntryRoundTrip(self):
+        flow = FlowEntry(flow_dict=FLOW)
+        self.assertEqual(flow.get_pkts_cnt(), 10)
+        self.assertEqual(flow.get_bytes_cnt(), 1000)
+        self.assertEqual(flow.to_yang_dict(), FLOW)
+        self.assertEqual(flow.get_payload(),
+                         json.dumps({'flow-node-inventory:flow': FLOW},
+                                    sort_keys=True, indent=4))
+        self.assertEqual(json.loads(flow.get_payload(indent=None)),
+                         {'flow-node-inventory:flow': FLOW})
+
+
+def make_group(group_id, refs=(), watch_group=None):
+    """ Returns 'all' group with a bucket sending packets to each of the
+        'refs' groups (single output bucket if there are no references)
+    """
+    group = GroupEntry(group_id, 'group-all')
+    for i, ref in enumerate(refs or [None]):
+        bucket = GroupBucket(i)
+        if ref is None:
+            bucket.add_action(OutputAction(order=0, port=1))
+        else:
+            bucket.add_action(GroupAction(order=0, group_id=ref))
+        bucket.set_watch_group(watch_group)
+        group.add_bucket(bucket)
+    return group
+
+
+def group_flow(flow_id, group_id):
+    """ Returns flow sending packets to the group """
+    flow = make_flow(0, flow_id, 100, '10.0.0.%d/32' % group_id)
+    instruction = Instruction(instruction_order=0)
+    instruction.add_apply_action(GroupAction(order=0, group_id=group_id))
+    flow.add_instruction(instruction)
+    return flow
+
+
+class MockResponse(object):
+
+    def __init__(self, status_code, content=''):
+        self.status_code = status_code
+        self.content = content
+
+
+class OFSwitchBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.ctrl = Controller('127.0.0.1', '8181', 'admin', 'admin')
+        self.ctrl.http_put_request = mock.Mock(side_effect=self.put)
+        self.ofswitch = OFSwitch(self.ctrl, 'openflow:1')
+        self.failing = ()
+        self.rejected = ()
+
+    def put(self, url, data, headers):
+        # Requests to the URLs ending with one of the 'failing' suffixes
+        # raise (as the requests Session does on connection errors), the
+        # ones ending with a 'rejected' suffix are refused by the Controller
+        if url.endswith(self.failing):
+            raise IOError("connection reset")
+        if url.endswith(self.rejected):
+            return MockResponse(400)
+        return MockResponse(200)
+
+    def put_urls(self):
+        return [args[0] for args, kwargs
+                in self.ctrl.http_put_request.call_args_list]
+
+    def flows(self):
+        return [make_flow(0, 'f1', 100, '10.0.0.1/32'),
+                make_flow(0, 'f2', 100, '10.0.0.2/32'),
+                make_flow(1, 'f3', 100, '10.0.0.3/32'),
+                make_flow(1, 'f4', 100, '10.0.0.4/32')]
+
+    def test_AddModifyFlowsPartialFailure(self):
+        flows = self.flows()
+        self.failing = ('/flow/f2',)
+        result = self.ofswitch.add_modify_flows(flows, max_workers=2)
+        batch = result.get_data()
+        self.assertFalse(result.get_status().eq(STATUS.OK))
+        self.assertEqual(self.ctrl.http_put_request.call_count, 4)
+        self.assertEqual(batch.get_succeeded(),
+                         [flows[0], flows[2], flows[3]])
+        failed = batch.get_failed()
+        self.assertEqual([fe for fe, r in failed], [flows[1]])
+        self.assertTrue(failed[0][1].get_status().eq(STATUS.UNKNOWN))
+        self.assertIsInstance(failed[0][1].get_data(), IOError)
+
+    def test_ReplaceTableFlowsPartialFailure(self):
+        flows = self.flows()
+        self.failing = ('/table/1',)
+        result = self.ofswitch.replace_table_flows(flows, max_workers=2)
+        batch = result.get_data()
+        self.assertFalse(result.get_status().eq(STATUS.OK))
+        self.assertEqual(self.ctrl.http_put_request.call_count, 2)
+        self.assertEqual(batch.get_succeeded(), flows[:2])
+        failed = batch.get_failed()
+        self.assertEqual([fe for fe, r in failed], flows[2:])
+        for fe, r in failed:
+            self.assertTrue(r.get_status().eq(STATUS.UNKNOWN))
+            self.assertIsInstance(r.get_data(), IOError)
+
+    def test_AddModifyFlowsSuccess(self):
+        flows = self.flows()
+        result = self.ofswitch.add_modify_flows(flows, max_workers=2)
+        self.assertTrue(result.get_status().eq(STATUS.OK))
+        self.assertEqual(result.get_data().get_succeeded(), flows)
+        self.assertEqual(result.get_data().get_failed(), [])
+
+    def test_PlanEntriesLayers(self):
+        g1 = make_group(1)
+        g2 = make_group(2, refs=[1])
+        g3 = make_group(3, watch_group=2)
+        f1 = group_flow('f1', 3)
+        f2 = make_flow(0, 'f2', 100, '10.0.0.2/32')
+        # group 9 is not part of the batch (configured already)
+        f9 = group_flow('f9', 9)
+        layers, cyclic = self.ofswitch.plan_entries([f1, g3, f2, g2, g1, f9])
+        self.assertEqual(layers, [[f2, g1, f9], [g2], [g3], [f1]])
+        self.assertEqual(cyclic, [])
+
+    def test_PlanEntriesCycle(self):
+        g1 = make_group(1)
+        g2 = make_group(2, refs=[3])
+        g3 = make_group(3, refs=[1], watch_group=2)
+        f1 = group_flow('f1', 1)
+        f2 = group_flow('f2', 2)
+        layers, cyclic = self.ofswitch.plan_entries([f2, g3, f1, g2, g1])
+        self.assertEqual(layers, [[g1], [f1]])
+        # entries depending on the groups of the cycle can not be ordered
+        # either
+        self.assertEqual(cyclic, [f2, g3, g2])
+
+        result = self.ofswitch.apply_entries([f2, g3, f1, g2, g1])
+        batch = result.get_data()
+        self.assertEqual(batch.get_succeeded(), [f1, g1])
+        for entry, r in batch.get_failed():
+            self.assertTrue(r.get_status().eq(STATUS.MALFORM_DATA))
+        self.assertEqual(self.put_urls()[0],
+                         self.ctrl.get_node_config_url('openflow:1') +
+                         '/flow-node-inventory:group/1')
+        self.assertEqual(len(self.put_urls()), 2)
+
+    def test_ApplyEntriesFailedGroup(self):
+        g1 = make_group(1)
+        g2 = make_group(2, refs=[1])
+        g3 = make_group(3)
+        f1 = group_flow('f1', 2)
+        f2 = group_flow('f2', 3)
+        f3 = make_flow(0, 'f3', 100, '10.0.0.3/32')
+        self.rejected = (':group/1',)
+        entries = [f1, f2, f3, g1, g2, g3]
+        result = self.ofswitch.apply_entries(entries)
+        batch = result.get_data()
+        self.assertTrue(result.get_status().eq(STATUS.HTTP_ERROR))
+        self.assertEqual(batch.get_succeeded(), [f2, f3, g3])
+        failed = batch.get_failed()
+        self.assertEqual([e for e, r in failed], [f1, g1, g2])
+        # entries referring (directly or not) to the failed group are not
+        # sent and get its result
+        results = dict((e.get_flow_id() if isinstance(e, FlowEntry)
+                        else e.get_group_id(), r) for e, r in failed)
+        self.assertIs(results['f1'], results[1])
+        self.assertIs(results[2], results[1])
+        urls = self.put_urls()
+        self.assertEqual(len(urls), 4)
+        self.assertFalse([u for u in urls
+                          if u.endswith((':group/2', '/flow/f1'))])
+        self.assertEqual([len(layer.get_items())
+                          for layer in batch.get_layers()], [3, 1, 0])
+
+
+class OFSwitchSessionTests(unittest.TestCase):
+    """ OFSwitch operations over the Controller's mocked HTTP session """
+
+    def setUp(self):
+        self.ctrl = Controller('127.0.0.1', '8181', 'admin', 'admin')
+        self.ofswitch = OFSwitch(self.ctrl, 'openflow:1')
+        self.url = self.ctrl.get_node_config_url('openflow:1')
+        # URL -> (status code, JSON data) of the GET responses, URLs of
+        # the PUT/DELETE requests to be refused
+        self.documents = {}
+        self.rejected = set()
+        self.session_get = mock.patch('requests.Session.get',
+                                      side_effect=self.get).start()
+        self.session_put = mock.patch('requests.Session.put',
+                                      side_effect=self.change).start()
+        self.session_delete = mock.patch('requests.Session.delete',
+                                         side_effect=self.change).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def get(self, url, **kwargs):
+        status_code, data = self.documents.get(url, (404, {}))
+        return MockResponse(status_code, json.dumps(data))
+
+    def change(self, url, **kwargs):
+        return MockResponse(500 if url in self.rejected else 200)
+
+    def urls(self, session_mock):
+        """ URLs of the requests in the order they were sent """
+        return [args[0] for args, kwargs in session_mock.call_args_list]
+
+    def deleted(self):
+        return sorted(self.urls(self.session_delete))
+
+    def group_url(self, group_id):
+        return self.url + '/flow-node-inventory:group/%s' % group_id
+
+    def flow_url(self, flow_id, table_id=0):
+        return self.url + '/table/%s/flow/%s' % (table_id, flow_id)
+
+    def set_table(self, flows, table_id=0):
+        url = self.url + '/flow-node-inventory:table/%s' % table_id
+        table = {'id': table_id, 'flow': [fe.to_yang_dict() for fe in flows]}
+        self.documents[url] = (200, {'flow-node-inventory:table': [table]})
+
+    def set_flows(self):
+        self.set_table([
+            make_flow(0, 'f1', 100, '10.0.0.1/32', 'openflow:1:1', 0x100),
+            make_flow(0, 'f2', 200, '10.0.0.2/32', 'openflow:1:2', 0x101),
+            make_flow(0, 'f3', 300, '10.0.0.1/32', None, 0x200),
+            make_flow(0, 'f4', 50, '10.0.0.4/32')])
+
+    def delete_flows_where(self, **kwargs):
+        result = self.ofswitch.delete_flows_where(0, **kwargs)
+        batch = result.get_data()
+        return (result.get_status(),
+                sorted(fe.get_flow_id() for fe in batch.get_items()))
+
+    def test_DeleteFlowsWhere(self):
+        self.set_flows()
+        status, ids = self.delete_flows_where(cookie=0x100,
+                                              cookie_mask=0xf00)
+        self.assertTrue(status.eq(STATUS.OK))
+        self.assertEqual(ids, ['f1', 'f2'])
+        self.assertEqual(self.deleted(),
+                         [self.flow_url('f1'), self.flow_url('f2')])
+
+        status, ids = self.delete_flows_where(cookie=0x100)
+        self.assertEqual(ids, ['f1'])
+        status, ids = self.delete_flows_where(priority_min=100,
+                                              priority_max=200)
+        self.assertEqual(ids, ['f1', 'f2'])
+        status, ids = self.delete_flows_where(priority_min=250)
+        self.assertEqual(ids, ['f3'])
+
+        match = Match()
+        match.set_ipv4_dst('10.0.0.1/32')
+        status, ids = self.delete_flows_where(match=match)
+        self.assertEqual(ids, ['f1', 'f3'])
+        match.set_in_port('openflow:1:1')
+        status, ids = self.delete_flows_where(match=match)
+        self.assertEqual(ids, ['f1'])
+        # criteria are combined
+        status, ids = self.delete_flows_where(match=match, priority_min=150)
+        self.assertTrue(status.eq(STATUS.OK))
+        self.assertEqual(ids, [])
+        # flows are read once per call
+        self.assertEqual(self.session_get.call_count, 7)
+
+    def test_DeleteFlowsWhereFailure(self):
+        self.set_flows()
+        self.rejected.add(self.flow_url('f2'))
+        result = self.ofswitch.delete_flows_where(0, priority_max=200)
+        batch = result.get_data()
+        self.assertTrue(result.get_status().eq(STATUS.HTTP_ERROR))
+        self.assertEqual([fe.get_flow_id() for fe in batch.get_succeeded()],
+                         ['f1', 'f4'])
+        self.assertEqual([fe.get_flow_id() for fe, r in batch.get_failed()],
+                         ['f2'])
+
+        # nothing is deleted if the flow table can not be read
+        self.session_delete.reset_mock()
+        result = self.ofswitch.delete_flows_where(1, priority_max=200)
+        self.assertTrue(result.get_status().eq(STATUS.DATA_NOT_FOUND))
+        self.assertEqual(result.get_data().get_items(), [])
+        self.assertEqual(self.deleted(), [])
+
+    def test_AddModifyGroups(self):
+        g1 = make_group(1)
+        g2 = make_group(2, refs=[1])
+        g3 = make_group(3, watch_group=2)
+        g4 = make_group(4)
+        result = self.ofswitch.add_modify_groups([g3, g1, g4, g2])
+        self.assertTrue(result.get_status().eq(STATUS.OK))
+        # referred groups are created first
+        urls = self.urls(self.session_put)
+        self.assertEqual(sorted(urls[:2]),
+                         [self.group_url(1), self.group_url(4)])
+        self.assertEqual(urls[2:], [self.group_url(2), self.group_url(3)])
+        self.assertEqual(json.loads(self.session_put.call_args[1]['data']),
+                         json.loads(g3.get_payload()))
+
+        self.session_put.reset_mock()
+        self.rejected.add(self.group_url(2))
+        result = self.ofswitch.add_modify_groups([g3, g1, g4, g2])
+        batch = result.get_data()
+        self.assertTrue(result.get_status().eq(STATUS.HTTP_ERROR))
+        self.assertEqual(batch.get_succeeded(), [g1, g4])
+        self.assertEqual([g for g, r in batch.get_failed()], [g3, g2])
+        # group referring to the failed one is not sent
+        self.assertEqual(len(self.urls(self.session_put)), 3)
+        self.assertEqual([len(layer.get_items())
+                          for layer in batch.get_layers()], [2, 1, 0])
+
+    def test_DeleteGroups(self):
+        groups = [make_group(1), make_group(2, refs=[1]),
+                  make_group(3, refs=[2]), make_group(4)]
+        self.documents[self.url] = (200, {'node': [{
+            'id': 'openflow:1',
+            'flow-node-inventory:group': [g.to_yang_dict() for g in groups]
+        }]})
+        result = self.ofswitch.delete_groups([1, 2, 3])
+        self.assertTrue(result.get_status().eq(STATUS.OK))
+        # groups are deleted after the groups referring to them
+        self.assertEqual(self.urls(self.session_delete),
+                         [self.group_url(3), self.group_url(2),
+                          self.group_url(1)])
+        self.assertEqual(self.session_get.call_count, 1)
+
+        self.session_delete.reset_mock()
+        self.rejected.add(self.group_url(3))
+        result = self.ofswitch.delete_groups([1, 2, 3, 4])
+        batch = result.get_data()
+        self.assertTrue(result.get_status().eq(STATUS.HTTP_ERROR))
+        self.assertEqual(batch.get_succeeded(), [4])
+        self.assertEqual([gid for gid, r in batch.get_failed()], [1, 2, 3])
+        # groups referred to by the group that was not deleted are kept
+        self.assertEqual(sorted(self.urls(self.session_delete)),
+                         [self.group_url(3), self.group_url(4)])
+
+    def test_DeleteGroupsNoConfig(self):
+        # no configured groups to read the references from
+        result = self.ofswitch.delete_groups([1, 2])
+        self.assertTrue(result.get_status().eq(STATUS.OK))
+        self.assertEqual(self.deleted(),
+                         [self.group_url(1), self.group_url(2)])
+        self.assertEqual(len(result.get_data().get_layers()), 1)
+
+        self.session_delete.reset_mock()
+        self.documents[self.url] = (500, {})
+        result = self.ofswitch.delete_groups([1, 2])
+        self.assertTrue(result.get_status().eq(STATUS.HTTP_ERROR))
+        self.assertIsNone(result.get_data())
+        self.assertEqual(self.deleted(), [])
+
+    def test_GroupsStatistics(self):
+        stats = {'group-id': 1, 'packet-count': 10, 'byte-count': 1000}
+        url = self.ctrl.get_node_operational_url('openflow:1')
+        self.documents[url + '/flow-node-inventory:group/1/'
+                       'opendaylight-group-statistics:group-statistics/'] = \
+            (200, {'opendaylight-group-statistics:group-statistics': stats})
+        result = self.ofswitch.get_groups_statistics(group_ids=[1, 2])
+        self.assertTrue(result.get_status().eq(STATUS.DATA_NOT_FOUND))
+        rmap = result.get_data().get_results_map()
+        self.assertEqual(rmap.keys(), [1, 2])
+        self.assertTrue(rmap[1].get_status().eq(STATUS.OK))
+        self.assertEqual(rmap[1].get_data(), stats)
+        self.assertTrue(rmap[2].get_status().eq(STATUS.DATA_NOT_FOUND))
+        self.assertEqual(self.session_get.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import unittest
+
+from pybvc.controller.topology import Topology
+from pybvc.controller.pathfinder import Path
+
+
+def switch_link(a, a_port, b, b_port):
+    return {'link-id': '%s:%s' % (a, a_port),
+            'source': {'source-node': a,
+                       'source-tp': '%s:%s' % (a, a_port)},
+            'destination': {'dest-node': b,
+                            'dest-tp': '%s:%s' % (b, b_port)}}
+
+
+def host_links(host, switch, port):
+    tp = '%s:%s' % (switch, port)
+    return [{'link-id': '%s/%s' % (host, tp),
+             'source': {'source-node': host, 'source-tp': host},
+             'destination': {'dest-node': switch, 'dest-tp': tp}},
+            {'link-id': '%s/%s' % (tp, host),
+             'source': {'source-node': switch, 'source-tp': tp},
+             'destination': {'dest-node': host, 'dest-tp': host}}]
+
+
+def make_topology():
+    """ Two equal-cost paths (via s2 and s3) and a longer one (via s5, s6)
+        between switches s1 and s4, host 'h1' on s1 and 'h4' on s4
+    """
+    s = ['openflow:%d' % i for i in range(7)]
+    links = []
+    for a, a_port, b, b_port in ((1, 2, 2, 1), (2, 2, 4, 1), (1, 3, 3, 1),
+                                 (3, 2, 4, 2), (1, 4, 5, 1), (5, 2, 6, 1),
+                                 (6, 2, 4, 3)):
+        links.append(switch_link(s[a], a_port, s[b], b_port))
+        links.append(switch_link(s[b], b_port, s[a], a_port))
+    links += host_links('host:h1', s[1], 1)
+    links += host_links('host:h4', s[4], 9)
+    nodes = [{'node-id': node_id} for node_id in s[1:]]
+    nodes += [{'node-id': 'host:h1'}, {'node-id': 'host:h4'}]
+    return Topology(topo_dict={'topology-id': 'flow:1', 'node': nodes,
+                               'link': links})
+
+
+class PathFinderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.topo = make_topology()
+        self.graph = self.topo.get_path_graph()
+
+    def test_shortest_path_hops(self):
+        path = self.graph.bfs_path('host:h1', 'host:h4')
+        self.assertEqual(path.get_cost(), 4)
+        hops = [(h.get_node_id(), h.get_in_port(), h.get_out_port())
+                for h in path.get_hops()]
+        self.assertEqual(hops, [('openflow:1', '1', '2'),
+                                ('openflow:2', '1', '2'),
+                                ('openflow:4', '1', '9')])
+        self.assertEqual(path.get_switch_ids(),
+                         ['openflow:1', 'openflow:2', 'openflow:4'])
+
+    def test_path_host_flags(self):
+        path = self.graph.bfs_path('host:h1', 'host:h4')
+        self.assertEqual(list(path.is_host), [1, 0, 0, 0, 1])
+        # Switches and hosts are told apart by the graph's node flags,
+        # not by the node id
+        path = Path(['a', 'b', 'c'], path.get_links()[1:3], 2,
+                    bytearray([1, 0, 0]))
+        self.assertEqual(path.get_switch_ids(), ['b', 'c'])
+        self.assertEqual([h.get_node_id() for h in path.get_hops()],
+                         ['b', 'c'])
+
+    def test_weighted_path(self):
+        path = self.topo.get_shortest_path(
+            'openflow:1', 'openflow:4',
+            weight=lambda l: 5 if l.get_id() == 'openflow:1:2' else 1)
+        self.assertEqual(path.get_node_ids(),
+                         ['openflow:1', 'openflow:3', 'openflow:4'])
+
+    def test_ecmp_and_k_shortest_paths(self):
+        ecmp = self.graph.ecmp_paths('host:h1', 'host:h4')
+        self.assertEqual(sorted(p.get_node_ids()[2] for p in ecmp),
+                         ['openflow:2', 'openflow:3'])
+        paths = self.graph.k_shortest_paths('host:h1', 'host:h4', 5)
+        self.assertEqual([p.get_cost() for p in paths], [4, 4, 5])
+
+    def test_path_tree(self):
+        tree = self.graph.shortest_path_tree('openflow:2', weighted=False)
+        self.assertEqual(tree.get_distance('openflow:6'), 2)
+        self.assertEqual(tree.get_distance('host:h1'), 2)
+        self.topo.remove_link('openflow:2:1')
+        self.topo.remove_link('openflow:2:2')
+        graph = self.topo.get_path_graph()
+        self.assertIsNone(graph.shortest_path('openflow:2', 'host:h4'))
+
+
+if __name__ == '__main__':
+    unittest.main()
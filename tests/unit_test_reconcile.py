@@ -0,0 +1,128 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import json
+import unittest
+
+from pybvc.openflowdev.ofswitch import (FlowEntry, PopVlanHeaderAction,
+                                        DropAction)
+from pybvc.openflowdev.reconcile import diff_flows, flow_fingerprint
+from flow_helpers import make_flow
+
+
+def vlan_flow(table_id, flow_id, priority, out_port=1,
+              pre_action=PopVlanHeaderAction):
+    return make_flow(table_id, flow_id, priority, out_port=out_port,
+                     pre_action=pre_action)
+
+
+def reload_flow(flow):
+    """ Same flow as read back from the Controller: list items may come
+        in a different order and numbers may be encoded as strings
+    """
+    d = json.loads(json.dumps(flow.to_yang_dict()))
+    d['priority'] = str(d['priority'])
+    for instruction in d['instructions']['instruction']:
+        instruction['apply-actions']['action'].reverse()
+    return FlowEntry(flow_dict=d)
+
+
+class FlowsDiffTests(unittest.TestCase):
+
+    def test_FlowFingerprint(self):
+        flow = vlan_flow(0, '1', 100)
+        self.assertEqual(flow_fingerprint(flow),
+                         flow_fingerprint(reload_flow(flow)))
+        self.assertNotEqual(flow_fingerprint(flow),
+                            flow_fingerprint(vlan_flow(0, '1', 100, 3)))
+        self.assertNotEqual(flow_fingerprint(flow),
+                            flow_fingerprint(vlan_flow(0, '1', 200)))
+
+    def test_FlowsDiff(self):
+        configured = [reload_flow(vlan_flow(0, '1', 100)),
+                      reload_flow(vlan_flow(0, '2', 100)),
+                      reload_flow(vlan_flow(1, '3', 100))]
+        desired = [vlan_flow(0, '1', 100), vlan_flow(0, '2', 100, 3),
+                   vlan_flow(0, '4', 100)]
+        diff = diff_flows(desired, configured)
+        self.assertEqual([f.get_flow_id() for f in diff.get_unchanged()],
+                         ['1'])
+        self.assertEqual([f.get_flow_id() for f in diff.get_modified()],
+                         ['2'])
+        self.assertEqual([f.get_flow_id() for f in diff.get_added()], ['4'])
+        self.assertEqual(diff.get_deleted(), [(1, '3')])
+        diff = diff_flows(desired, configured, prune=False)
+        self.assertEqual(diff.get_deleted(), [])
+        self.assertEqual(diff.get_changes_count(), 2)
+        self.assertTrue(diff_flows(desired[:1], configured[:1]).is_empty())
+
+    def test_FlowsDiffActionType(self):
+        # flows differing only in a data-less action are different flows
+        configured = [reload_flow(vlan_flow(0, '1', 100,
+                                            pre_action=DropAction))]
+        desired = [vlan_flow(0, '1', 100)]
+        self.assertNotEqual(flow_fingerprint(configured[0]),
+                            flow_fingerprint(desired[0]))
+        diff = diff_flows(desired, configured)
+        self.assertEqual([f.get_flow_id() for f in diff.get_modified()],
+                         ['1'])
+        self.assertEqual(diff.get_unchanged(), [])
+
+
+class FlowEqualityTests(unittest.TestCase):
+
+    def test_FlowEntryEquality(self):
+        flow = vlan_flow(0, '1', 100)
+        same = reload_flow(flow)
+        self.assertEqual(flow, same)
+        self.assertEqual(hash(flow), hash(same))
+        self.assertEqual(flow.get_match_fields(), same.get_match_fields())
+        self.assertNotEqual(flow, vlan_flow(0, '1', 100, 3))
+        flows = set([flow, same, vlan_flow(0, '2', 100)])
+        self.assertEqual(len(flows), 2)
+        same.set_flow_priority(200)
+        self.assertNotEqual(flow, same)
+        same.set_flow_priority(100)
+        self.assertEqual(flow, same)
+        self.assertEqual(hash(flow), hash(same))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import unittest
+
+from pybvc.openflowdev.statspoller import CounterSeries, counter_delta
+
+
+class CounterSeriesTests(unittest.TestCase):
+
+    def test_counter_delta(self):
+        self.assertEqual(counter_delta(100, 150), 50)
+        self.assertEqual(counter_delta((1 << 32) - 10, 5), 15)
+        self.assertEqual(counter_delta((1 << 64) - 10, 5), 15)
+        self.assertIsNone(counter_delta(1000, 10))
+
+    def test_rates(self):
+        series = CounterSeries(capacity=3)
+        self.assertIsNone(series.update(100.0, 0, duration=10))
+        self.assertEqual(series.update(110.0, 1000, duration=20), 100.0)
+        # statistics not refreshed by the switch, no new sample
+        self.assertIsNone(series.update(115.0, 1000, duration=20))
+        self.assertEqual(series.update(120.0, 3000, duration=30), 200.0)
+        self.assertEqual(len(series), 2)
+
+    def test_wrap_and_reset(self):
+        series = CounterSeries(capacity=4)
+        series.update(0.0, (1 << 32) - 100, duration=10)
+        self.assertEqual(series.update(10.0, 900, duration=20), 100.0)
+        self.assertEqual(series.get_wraps_cnt(), 1)
+        # switch reconnected, duration and counters started over
+        self.assertEqual(series.update(20.0, 50, duration=5), 10.0)
+        self.assertEqual(series.get_resets_cnt(), 1)
+        self.assertEqual(series.update(30.0, 150, duration=15), 10.0)
+
+    def test_ring_buffer(self):
+        series = CounterSeries(capacity=3)
+        for i in range(6):
+            series.update(float(i), i * i)
+        self.assertEqual(list(series.get_times()), [3.0, 4.0, 5.0])
+        self.assertEqual(list(series.get_rates()), [5.0, 7.0, 9.0])
+        self.assertEqual(series.get_last_rate(), 9.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import json
+import unittest
+
+import mock
+
+from pybvc.controller.controller import Controller
+from pybvc.controller.topology import Node, Link
+from pybvc.common.status import STATUS
+from pybvc.common.utils import dict_keys_dashed_to_underscored
+
+
+class MockResponse(object):
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+def link(a, a_port, b, b_port):
+    src = '%s:%s' % (a, a_port) if a_port is not None else a
+    dst = '%s:%s' % (b, b_port) if b_port is not None else b
+    return {'link-id': '%s/%s' % (src, dst),
+            'source': {'source-node': a, 'source-tp': src},
+            'destination': {'dest-node': b, 'dest-tp': dst}}
+
+
+def topology_doc():
+    """ Switches s1 - s2 - s3 in a line, host 'h1' on port 3 of s1 """
+    links = []
+    for a, a_port, b, b_port in (('openflow:1', 1, 'openflow:2', 1),
+                                 ('openflow:2', 2, 'openflow:3', 1)):
+        links.append(link(a, a_port, b, b_port))
+        links.append(link(b, b_port, a, a_port))
+    links.append(link('host:h1', None, 'openflow:1', 3))
+    links.append(link('openflow:1', 3, 'host:h1', None))
+    nodes = [{'node-id': n} for n in ('openflow:3', 'openflow:1',
+                                      'openflow:2', 'host:h1')]
+    return {'topology': [{'topology-id': 'flow:1', 'node': nodes,
+                          'link': links}]}
+
+
+class TopologyTests(unittest.TestCase):
+
+    @mock.patch('requests.Session.get',
+                return_value=MockResponse(200, json.dumps(topology_doc())))
+    def setUp(self, mock_get):
+        ctrl = Controller('127.0.0.1', '8181', 'admin', 'admin')
+        result = ctrl.build_topology_object('flow:1')
+        self.assertEqual(STATUS.OK, result.get_status().get_status_code())
+        self.topo = result.get_data()
+
+    def link_ids(self, links):
+        return sorted(lnk.get_id() for lnk in links)
+
+    def test_NodeLookups(self):
+        topo = self.topo
+        self.assertEqual(topo.get_switch_ids(),
+                         ['openflow:1', 'openflow:2', 'openflow:3'])
+        self.assertEqual(topo.get_host_ids(), ['host:h1'])
+        self.assertEqual(topo.get_node_by_id('host:h1').get_id(), 'host:h1')
+        self.assertIsNone(topo.get_node_by_id('openflow:9'))
+        self.assertEqual(topo.get_switch('openflow:2').get_id(),
+                         'openflow:2')
+        self.assertIsNone(topo.get_switch('host:h1'))
+        self.assertEqual(topo.get_inter_switch_links_cnt(), 2)
+
+    def test_LinkLookups(self):
+        topo = self.topo
+        l12 = topo.get_link_by_id('openflow:1:1/openflow:2:1')
+        self.assertEqual(l12.get_dst_node_id(), 'openflow:2')
+        self.assertEqual(l12.get_src_tp_id(), 'openflow:1:1')
+        self.assertEqual(l12.get_dst_tp_id(), 'openflow:2:1')
+        self.assertIsNone(topo.get_link_by_id('openflow:9:1'))
+        self.assertEqual(self.link_ids(topo.get_links_from_node('openflow:1')),
+                         ['openflow:1:1/openflow:2:1',
+                          'openflow:1:3/host:h1'])
+        self.assertEqual(self.link_ids(topo.get_links_to_node('openflow:2')),
+                         ['openflow:1:1/openflow:2:1',
+                          'openflow:3:1/openflow:2:2'])
+        self.assertEqual(topo.get_neighbor_ids('openflow:1'),
+                         ['host:h1', 'openflow:2'])
+        self.assertEqual(topo.get_neighbor_ids('openflow:9'), [])
+
+        s1 = topo.get_node_by_id('openflow:1')
+        self.assertEqual(self.link_ids(topo.get_peer_list_for_node(s1)),
+                         ['host:h1/openflow:1:3',
+                          'openflow:2:1/openflow:1:1'])
+        peers = topo.get_peer_list_for_node_port_(s1, '3')
+        self.assertEqual([n.get_id() for n in peers], ['host:h1'])
+        self.assertEqual(topo.get_peer_list_for_node_port_(s1, '2'), [])
+
+    def test_RemoveAndReplace(self):
+        topo = self.topo
+        graph = topo.get_path_graph()
+        self.assertIs(topo.get_path_graph(), graph)
+
+        removed = topo.remove_link('openflow:2:2/openflow:3:1')
+        self.assertEqual(removed.get_id(), 'openflow:2:2/openflow:3:1')
+        self.assertIsNone(topo.remove_link('openflow:2:2/openflow:3:1'))
+        topo.remove_link('openflow:3:1/openflow:2:2')
+        self.assertEqual(topo.get_neighbor_ids('openflow:2'), ['openflow:1'])
+        self.assertEqual(topo.get_links_to_node('openflow:3'), [])
+        self.assertEqual(topo.get_links_from_node('openflow:3'), [])
+        self.assertEqual(topo.get_inter_switch_links_cnt(), 1)
+        # graph of the changed topology is rebuilt
+        self.assertIsNot(topo.get_path_graph(), graph)
+
+        self.assertEqual(topo.remove_node('openflow:1').get_id(),
+                         'openflow:1')
+        self.assertIsNone(topo.get_node_by_id('openflow:1'))
+        self.assertEqual(topo.get_switch_ids(), ['openflow:2', 'openflow:3'])
+        # links attached to the removed node are removed too
+        self.assertEqual(topo.get_links(), [])
+        self.assertEqual(topo.get_neighbor_ids('host:h1'), [])
+        self.assertEqual(topo.get_inter_switch_links_cnt(), 0)
+
+        # node and link with the same id replace the existing ones
+        topo.add_node(Node({'node_id': 'openflow:2'}))
+        self.assertEqual(topo.get_switch_ids(), ['openflow:2', 'openflow:3'])
+        self.assertEqual(len(topo.get_nodes()), 3)
+        for d in (link('openflow:3', 1, 'openflow:2', 2),
+                  link('openflow:2', 2, 'openflow:3', 1),
+                  link('openflow:3', 1, 'openflow:2', 2)):
+            topo.add_link(Link(dict_keys_dashed_to_underscored(d)))
+        self.assertEqual(len(topo.get_links()), 2)
+        self.assertEqual(len(topo.get_links_from_node('openflow:3')), 1)
+        self.assertEqual(topo.get_neighbor_ids('openflow:2'), ['openflow:3'])
+        self.assertEqual(topo.get_inter_switch_links_cnt(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
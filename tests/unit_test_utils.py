@@ -0,0 +1,104 @@
+#!/usr/bin/python
+
+# Copyright (c) 2015,  BROCADE COMMUNICATIONS SYSTEMS, INC
+
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from this
+# software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+@authors: Sergei Garbuzov
+@status: Development
+
+
+"""
+
+import json
+import unittest
+
+from pybvc.common.utils import iter_json_array
+
+
+def chunked(s, size):
+    return [s[i:i + size] for i in range(0, len(s), size)]
+
+
+class IterJsonArrayTests(unittest.TestCase):
+
+    def decode(self, doc, path):
+        """ Returns elements decoded from the document split into chunks
+            of every size, which have to be the same for all sizes
+        """
+        res = list(iter_json_array([doc], path))
+        for size in range(1, len(doc)):
+            self.assertEqual(list(iter_json_array(chunked(doc, size),
+                                                  path)), res)
+        return res
+
+    def test_ChunkBoundaries(self):
+        nodes = [{'id': 'openflow:%d' % i, 'ports': [1, 2.5, None, True],
+                  'name': 'switch %d' % i} for i in range(3)]
+        doc = json.dumps({'nodes': {'node': nodes}}, indent=1)
+        self.assertEqual(self.decode(doc, ('nodes', 'node')), nodes)
+
+    def test_EscapedStrings(self):
+        items = ['a "quoted" word', 'back\\slash\\', '\\"', u'caf\xe9',
+                 {'k"ey': '[{]}', 'x': '\\'}]
+        doc = json.dumps({'items': items, 'other': 'x\\"y'})
+        self.assertEqual(self.decode(doc, ('items',)), items)
+
+    def test_NestedPath(self):
+        doc = json.dumps({'table': [{'id': 0, 'flow': [{'id': 'a'}]},
+                                    {'id': 1, 'flow': [{'id': 'b'},
+                                                       {'id': 'c'}]}],
+                          'flow': [{'id': 'not in a table'}]})
+        self.assertEqual(self.decode(doc, ('table', 'flow')),
+                         [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}])
+
+    def test_EmptyArray(self):
+        self.assertEqual(self.decode('{"nodes": {"node": []}}',
+                                     ('nodes', 'node')), [])
+
+    def test_MissingPath(self):
+        self.assertEqual(self.decode('{"nodes": {"other": [1, 2]}}',
+                                     ('nodes', 'node')), [])
+
+    def test_TruncatedInput(self):
+        doc = json.dumps({'nodes': {'node': [{'id': 1}, {'id': 2}]}})
+        for end in (len(doc) - 1, doc.index('{"id": 2') + 3,
+                    doc.index('"node"') + 3, 0):
+            with self.assertRaises(ValueError):
+                list(iter_json_array(chunked(doc[:end], 4),
+                                     ('nodes', 'node')))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['{"nodes": {"node": [1, 2]}}}'],
+                                 ('nodes', 'node')))
+
+
+if __name__ == '__main__':
+    unittest.main()